@@ -4,9 +4,8 @@ from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, require_active_tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.store_config import StoreConfig
-from app.models.tenant import Tenant
 from app.services.estrategas import get_gemini_key
 
 router = APIRouter(prefix="/api/admin/ai", tags=["admin-ai"])
@@ -41,7 +40,7 @@ class GenerateTextResponse(BaseModel):
     text: str
 
 
-async def _resolve_gemini_key(tenant: Tenant, db: AsyncSession) -> str:
+async def _resolve_gemini_key(tenant: AuthTenant, db: AsyncSession) -> str:
     """Try estrategas.com first, then fall back to local store config."""
     # 1. Try Estrategas IA (shared Supabase)
     key = await get_gemini_key(tenant.email)
@@ -65,7 +64,7 @@ async def _resolve_gemini_key(tenant: Tenant, db: AsyncSession) -> str:
 @router.get("/status")
 async def ai_status(
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     """Check if Gemini API key is available (from estrategas or local)."""
     # 1. Try Estrategas
@@ -88,7 +87,7 @@ async def ai_status(
 async def generate_upsell_text(
     data: GenerateTextRequest,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     api_key = await _resolve_gemini_key(tenant, db)
 
@@ -4,10 +4,9 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, require_active_tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.abandoned_cart import AbandonedCart
 from app.models.order import Order
-from app.models.tenant import Tenant
 from app.schemas.store import DashboardResponse
 
 router = APIRouter(prefix="/api/admin/analytics", tags=["admin-analytics"])
@@ -16,7 +15,7 @@ router = APIRouter(prefix="/api/admin/analytics", tags=["admin-analytics"])
 @router.get("/dashboard", response_model=DashboardResponse)
 async def dashboard(
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     now = datetime.now(timezone.utc)
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -2,9 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, require_active_tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.store_app import StoreApp
-from app.models.tenant import Tenant
 from app.schemas.store import StoreAppResponse, StoreAppUpdate
 
 router = APIRouter(prefix="/api/admin/apps", tags=["admin-apps"])
@@ -21,7 +20,7 @@ AVAILABLE_APPS = [
 @router.get("", response_model=list[StoreAppResponse])
 async def list_apps(
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(select(StoreApp).where(StoreApp.tenant_id == tenant.id))
     existing = {app.app_slug: app for app in result.scalars().all()}
@@ -45,7 +44,7 @@ async def update_app(
     app_slug: str,
     data: StoreAppUpdate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(StoreApp).where(StoreApp.app_slug == app_slug, StoreApp.tenant_id == tenant.id)
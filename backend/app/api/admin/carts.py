@@ -5,9 +5,8 @@ from pydantic import BaseModel
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, require_active_tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.abandoned_cart import AbandonedCart
-from app.models.tenant import Tenant
 
 router = APIRouter(prefix="/api/admin/carts", tags=["admin-carts"])
 
@@ -45,7 +44,7 @@ async def list_carts(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     query = select(AbandonedCart).where(AbandonedCart.tenant_id == tenant.id)
     count_query = select(func.count()).select_from(AbandonedCart).where(AbandonedCart.tenant_id == tenant.id)
@@ -67,7 +66,7 @@ async def update_cart_status(
     cart_id: uuid.UUID,
     data: CartStatusUpdate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(AbandonedCart).where(AbandonedCart.id == cart_id, AbandonedCart.tenant_id == tenant.id)
@@ -5,10 +5,11 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import get_db, require_active_tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.checkout_offer import QuantityOffer, QuantityOfferTier
-from app.models.tenant import Tenant
 from app.schemas.store import QuantityOfferCreate, QuantityOfferResponse
+from app.services.offer_index import invalidate_offer_index
+from app.services.store_version import bump_store_version
 
 router = APIRouter(prefix="/api/admin/checkout", tags=["admin-checkout"])
 
@@ -16,7 +17,7 @@ router = APIRouter(prefix="/api/admin/checkout", tags=["admin-checkout"])
 @router.get("/offers", response_model=list[QuantityOfferResponse])
 async def list_offers(
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(QuantityOffer)
@@ -31,7 +32,7 @@ async def list_offers(
 async def get_offer(
     offer_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(QuantityOffer)
@@ -48,12 +49,14 @@ async def get_offer(
 async def create_offer(
     data: QuantityOfferCreate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     offer_data = data.model_dump(exclude={"tiers"})
     offer = QuantityOffer(tenant_id=tenant.id, **offer_data)
     db.add(offer)
     await db.flush()
+    invalidate_offer_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
 
     for tier_data in data.tiers:
         tier = QuantityOfferTier(offer_id=offer.id, **tier_data.model_dump())
@@ -74,7 +77,7 @@ async def update_offer(
     offer_id: uuid.UUID,
     data: QuantityOfferCreate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(QuantityOffer)
@@ -85,6 +88,9 @@ async def update_offer(
     if not offer:
         raise HTTPException(status_code=404, detail="Offer not found")
 
+    invalidate_offer_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
+
     # Update offer fields
     offer_data = data.model_dump(exclude={"tiers"})
     for key, value in offer_data.items():
@@ -113,7 +119,7 @@ async def update_offer(
 async def toggle_offer(
     offer_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(QuantityOffer)
@@ -125,6 +131,8 @@ async def toggle_offer(
         raise HTTPException(status_code=404, detail="Offer not found")
 
     offer.is_active = not offer.is_active
+    invalidate_offer_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(offer)
     return offer
@@ -135,7 +143,7 @@ async def change_priority(
     offer_id: uuid.UUID,
     direction: str,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     if direction not in ("up", "down"):
         raise HTTPException(status_code=400, detail="Direction must be 'up' or 'down'")
@@ -153,6 +161,8 @@ async def change_priority(
     else:
         offer.priority = max(0, offer.priority - 1)
 
+    invalidate_offer_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
     await db.flush()
     return {"status": "ok", "priority": offer.priority}
 
@@ -161,7 +171,7 @@ async def change_priority(
 async def duplicate_offer(
     offer_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(QuantityOffer)
@@ -190,6 +200,8 @@ async def duplicate_offer(
     )
     db.add(new_offer)
     await db.flush()
+    invalidate_offer_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
 
     for tier in offer.tiers:
         new_tier = QuantityOfferTier(
@@ -221,7 +233,7 @@ async def duplicate_offer(
 async def delete_offer(
     offer_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(QuantityOffer).where(QuantityOffer.id == offer_id, QuantityOffer.tenant_id == tenant.id)
@@ -230,3 +242,5 @@ async def delete_offer(
     if not offer:
         raise HTTPException(status_code=404, detail="Offer not found")
     await db.delete(offer)
+    invalidate_offer_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
@@ -1,15 +1,22 @@
+import uuid
+
 from fastapi import APIRouter, Depends, UploadFile
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, require_active_tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.checkout_config import CheckoutConfig
-from app.models.tenant import Tenant
 from app.schemas.checkout_config import CheckoutConfigResponse, CheckoutConfigUpdate
 from app.services.image_upload import validate_and_save_image
+from app.services.media_library import media_urls, release_replaced
+from app.services.store_version import bump_store_version
 
 router = APIRouter(prefix="/api/admin/checkout-config", tags=["admin-checkout-config"])
 
+def _config_media(tenant_id: uuid.UUID, config: CheckoutConfig) -> set[str]:
+    return media_urls(tenant_id, config.form_blocks, config.custom_fields)
+
+
 DEFAULT_BLOCKS = [
     {"type": "product_card", "position": 0, "enabled": True},
     {"type": "variants", "position": 1, "enabled": True},
@@ -31,7 +38,7 @@ DEFAULT_BLOCKS = [
 @router.get("", response_model=CheckoutConfigResponse)
 async def get_checkout_config(
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(CheckoutConfig).where(CheckoutConfig.tenant_id == tenant.id)
@@ -40,6 +47,7 @@ async def get_checkout_config(
     if not config:
         config = CheckoutConfig(tenant_id=tenant.id, form_blocks=DEFAULT_BLOCKS)
         db.add(config)
+        await bump_store_version(db, tenant.id)
         await db.flush()
         await db.refresh(config)
     return config
@@ -49,7 +57,7 @@ async def get_checkout_config(
 async def update_checkout_config(
     data: CheckoutConfigUpdate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(CheckoutConfig).where(CheckoutConfig.tenant_id == tenant.id)
@@ -60,9 +68,12 @@ async def update_checkout_config(
         db.add(config)
         await db.flush()
 
+    before = _config_media(tenant.id, config)
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(config, key, value)
+    await release_replaced(db, tenant.id, before, _config_media(tenant.id, config))
 
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(config)
     return config
@@ -71,7 +82,7 @@ async def update_checkout_config(
 @router.post("/reset", response_model=CheckoutConfigResponse)
 async def reset_checkout_config(
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(CheckoutConfig).where(CheckoutConfig.tenant_id == tenant.id)
@@ -81,6 +92,7 @@ async def reset_checkout_config(
         config = CheckoutConfig(tenant_id=tenant.id, form_blocks=DEFAULT_BLOCKS)
         db.add(config)
     else:
+        await release_replaced(db, tenant.id, _config_media(tenant.id, config))
         config.form_blocks = DEFAULT_BLOCKS
         config.cta_text = "Completar pedido - {order_total}"
         config.cta_subtitle = None
@@ -118,6 +130,7 @@ async def reset_checkout_config(
         config.show_shipping_method = False
         config.country = "CO"
 
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(config)
     return config
@@ -127,7 +140,7 @@ async def reset_checkout_config(
 async def upload_checkout_image(
     file: UploadFile,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
-    image_url = await validate_and_save_image(file, tenant.id, subfolder="checkout")
+    image_url = await validate_and_save_image(file, tenant.id, db)
     return {"url": image_url}
@@ -1,20 +1,27 @@
+import uuid
+
 from fastapi import APIRouter, Depends, HTTPException, UploadFile
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, require_active_tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.store_config import StoreConfig
-from app.models.tenant import Tenant
 from app.schemas.store import StoreConfigResponse, StoreConfigUpdate
 from app.services.image_upload import validate_and_save_image
+from app.services.media_library import media_urls, release_replaced
+from app.services.store_version import bump_store_version
 
 router = APIRouter(prefix="/api/admin/config", tags=["admin-config"])
 
 
+def _config_media(tenant_id: uuid.UUID, config: StoreConfig) -> set[str]:
+    return media_urls(tenant_id, config.logo_url, config.banner_image_url, config.checkout_fields)
+
+
 @router.get("", response_model=StoreConfigResponse)
 async def get_config(
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(select(StoreConfig).where(StoreConfig.tenant_id == tenant.id))
     config = result.scalar_one_or_none()
@@ -27,16 +34,19 @@ async def get_config(
 async def update_config(
     data: StoreConfigUpdate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(select(StoreConfig).where(StoreConfig.tenant_id == tenant.id))
     config = result.scalar_one_or_none()
     if not config:
         raise HTTPException(status_code=404, detail="Store config not found")
 
+    before = _config_media(tenant.id, config)
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(config, key, value)
+    await release_replaced(db, tenant.id, before, _config_media(tenant.id, config))
 
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(config)
     return config
@@ -46,16 +56,19 @@ async def update_config(
 async def upload_logo(
     file: UploadFile,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(select(StoreConfig).where(StoreConfig.tenant_id == tenant.id))
     config = result.scalar_one_or_none()
     if not config:
         raise HTTPException(status_code=404, detail="Store config not found")
 
-    logo_url = await validate_and_save_image(file, tenant.id, subfolder="logos")
+    logo_url = await validate_and_save_image(file, tenant.id, db)
 
+    before = _config_media(tenant.id, config)
     config.logo_url = logo_url
+    await release_replaced(db, tenant.id, before, _config_media(tenant.id, config))
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(config)
     return config
@@ -1,11 +1,11 @@
 import os
-import uuid
 
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_tenant
-from app.models.tenant import Tenant
-from app.services.storage import upload_file
+from app.api.deps import AuthTenant, get_db, get_token_tenant
+from app.services.image_upload import UploadStream
+from app.services.media_library import store_media
 
 router = APIRouter(prefix="/api/admin/media", tags=["admin-media"])
 
@@ -25,7 +25,8 @@ CONTENT_TYPE_MAP = {
 @router.post("/upload")
 async def upload_media(
     file: UploadFile = File(...),
-    current_tenant: Tenant = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_db),
+    current_tenant: AuthTenant = Depends(get_token_tenant),
 ):
     ext = os.path.splitext(file.filename or "")[1].lower()
     if ext not in ALLOWED_EXTENSIONS:
@@ -34,14 +35,11 @@ async def upload_media(
             f"Tipo de archivo no permitido. Usa: {', '.join(ALLOWED_EXTENSIONS)}",
         )
 
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(400, "Archivo demasiado grande (maximo 10MB)")
+    stream = UploadStream(file, MAX_FILE_SIZE, too_large="Archivo demasiado grande (maximo 10MB)")
+    content_type = await stream.open()
+    if content_type not in CONTENT_TYPE_MAP.values():
+        raise HTTPException(400, "El contenido del archivo no es una imagen valida")
 
-    filename = f"{uuid.uuid4().hex}{ext}"
-    key = f"media/{current_tenant.id}/{filename}"
-    content_type = CONTENT_TYPE_MAP.get(ext, "application/octet-stream")
+    media = await store_media(db, current_tenant.id, stream, content_type)
 
-    url = upload_file(contents, key, content_type)
-
-    return {"url": url, "filename": filename, "size": len(contents)}
+    return {"url": media.url, "filename": media.key.rsplit("/", 1)[-1], "size": media.size}
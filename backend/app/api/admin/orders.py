@@ -7,9 +7,8 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import get_db, require_active_tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.order import Order, OrderItem
-from app.models.tenant import Tenant
 from app.schemas.order import OrderDetailResponse, OrderListResponse, OrderResponse, OrderUpdateNotes, OrderUpdateStatus
 from app.services.dropi_export import generate_dropi_excel
 
@@ -25,7 +24,7 @@ async def list_orders(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     query = select(Order).where(Order.tenant_id == tenant.id)
     count_query = select(func.count()).select_from(Order).where(Order.tenant_id == tenant.id)
@@ -62,7 +61,7 @@ async def export_orders(
     date_from: datetime | None = None,
     date_to: datetime | None = None,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     query = select(Order).where(Order.tenant_id == tenant.id).options(selectinload(Order.items))
     if status:
@@ -88,7 +87,7 @@ async def export_orders(
 async def get_order(
     order_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Order)
@@ -106,7 +105,7 @@ async def update_order_status(
     order_id: uuid.UUID,
     data: OrderUpdateStatus,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Order)
@@ -131,7 +130,7 @@ async def update_order_notes(
     order_id: uuid.UUID,
     data: OrderUpdateNotes,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Order)
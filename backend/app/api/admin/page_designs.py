@@ -8,10 +8,11 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import get_db, require_active_tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.page_design import PageDesign
 from app.models.product import Product
-from app.models.tenant import Tenant
+from app.services.media_library import media_urls, release_replaced
+from app.services.store_version import bump_store_version
 
 router = APIRouter(prefix="/api/admin/page-designs", tags=["page-designs"])
 
@@ -53,6 +54,10 @@ class PageDesignResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+def _design_media(tenant_id: uuid.UUID, design: PageDesign) -> set[str]:
+    return media_urls(tenant_id, design.grapesjs_data, design.html_content, design.css_content)
+
+
 def _to_response(design: PageDesign) -> dict:
     return {
         "id": design.id,
@@ -73,7 +78,7 @@ def _to_response(design: PageDesign) -> dict:
 async def list_page_designs(
     page_type: str | None = None,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     query = (
         select(PageDesign)
@@ -92,7 +97,7 @@ async def list_page_designs(
 async def create_page_design(
     data: PageDesignCreate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     # Only one home page allowed
     if data.page_type == "home":
@@ -147,6 +152,7 @@ async def create_page_design(
         product_id=data.product_id,
     )
     db.add(design)
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(design, attribute_names=["product"])
     return _to_response(design)
@@ -156,7 +162,7 @@ async def create_page_design(
 async def get_page_design(
     design_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(PageDesign)
@@ -174,7 +180,7 @@ async def update_page_design(
     design_id: uuid.UUID,
     data: PageDesignUpdate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(PageDesign)
@@ -185,9 +191,12 @@ async def update_page_design(
     if not design:
         raise HTTPException(404, "Page design not found")
 
+    before = _design_media(tenant.id, design)
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(design, key, value)
+    await release_replaced(db, tenant.id, before, _design_media(tenant.id, design))
 
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(design, attribute_names=["product"])
     return _to_response(design)
@@ -197,7 +206,7 @@ async def update_page_design(
 async def delete_page_design(
     design_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(PageDesign).where(PageDesign.id == design_id, PageDesign.tenant_id == tenant.id)
@@ -205,4 +214,6 @@ async def delete_page_design(
     design = result.scalar_one_or_none()
     if not design:
         raise HTTPException(404, "Page design not found")
+    await release_replaced(db, tenant.id, _design_media(tenant.id, design))
+    await bump_store_version(db, tenant.id)
     await db.delete(design)
@@ -4,10 +4,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, require_active_tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.store_page import StorePage
-from app.models.tenant import Tenant
 from app.schemas.store import StorePageCreate, StorePageResponse, StorePageUpdate
+from app.services.store_version import bump_store_version
 from app.utils.slugify import generate_unique_slug
 
 router = APIRouter(prefix="/api/admin/pages", tags=["admin-pages"])
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/api/admin/pages", tags=["admin-pages"])
 @router.get("", response_model=list[StorePageResponse])
 async def list_pages(
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(StorePage)
@@ -30,11 +30,12 @@ async def list_pages(
 async def create_page(
     data: StorePageCreate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     slug = data.slug or await generate_unique_slug(data.title, StorePage, db, tenant_id=tenant.id)
     page = StorePage(tenant_id=tenant.id, slug=slug, **data.model_dump(exclude={"slug"}))
     db.add(page)
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(page)
     return page
@@ -45,7 +46,7 @@ async def update_page(
     page_id: uuid.UUID,
     data: StorePageUpdate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(StorePage).where(StorePage.id == page_id, StorePage.tenant_id == tenant.id)
@@ -57,6 +58,7 @@ async def update_page(
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(page, key, value)
 
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(page)
     return page
@@ -66,7 +68,7 @@ async def update_page(
 async def delete_page(
     page_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(StorePage).where(StorePage.id == page_id, StorePage.tenant_id == tenant.id)
@@ -74,4 +76,5 @@ async def delete_page(
     page = result.scalar_one_or_none()
     if not page:
         raise HTTPException(status_code=404, detail="Page not found")
+    await bump_store_version(db, tenant.id)
     await db.delete(page)
@@ -5,9 +5,8 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import get_db, require_active_tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.product import Product, ProductImage, ProductVariant
-from app.models.tenant import Tenant
 from app.schemas.product import (
     ProductCreate,
     ProductImageResponse,
@@ -17,8 +16,9 @@ from app.schemas.product import (
     ProductVariantCreate,
     ProductVariantResponse,
 )
-from app.services.image_upload import validate_and_save_image
-from app.services.storage import delete_by_url
+from app.services.image_upload import save_product_image
+from app.services.media_library import release_media
+from app.services.store_version import bump_store_version
 from app.utils.slugify import generate_unique_slug
 
 router = APIRouter(prefix="/api/admin/products", tags=["admin-products"])
@@ -31,7 +31,7 @@ async def list_products(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=500),
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     query = select(Product).where(Product.tenant_id == tenant.id).options(
         selectinload(Product.images), selectinload(Product.variants)
@@ -58,11 +58,12 @@ async def list_products(
 async def create_product(
     data: ProductCreate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     slug = await generate_unique_slug(data.name, Product, db, tenant_id=tenant.id)
     product = Product(tenant_id=tenant.id, slug=slug, **data.model_dump())
     db.add(product)
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(product, attribute_names=["images", "variants"])
     return product
@@ -72,7 +73,7 @@ async def create_product(
 async def get_product(
     product_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Product)
@@ -90,7 +91,7 @@ async def update_product(
     product_id: uuid.UUID,
     data: ProductUpdate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Product)
@@ -108,6 +109,7 @@ async def update_product(
     for key, value in update_data.items():
         setattr(product, key, value)
 
+    await bump_store_version(db, tenant.id)
     await db.flush()
 
     result2 = await db.execute(
@@ -122,7 +124,7 @@ async def update_product(
 async def delete_product(
     product_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Product).where(Product.id == product_id, Product.tenant_id == tenant.id)
@@ -130,6 +132,11 @@ async def delete_product(
     product = result.scalar_one_or_none()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    # The images go with the product (cascade); drop their media references first
+    image_urls = await db.scalars(select(ProductImage.image_url).where(ProductImage.product_id == product.id))
+    for image_url in image_urls.all():
+        await release_media(db, tenant.id, image_url)
+    await bump_store_version(db, tenant.id)
     await db.delete(product)
 
 
@@ -138,7 +145,7 @@ async def upload_image(
     product_id: uuid.UUID,
     file: UploadFile,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Product).where(Product.id == product_id, Product.tenant_id == tenant.id)
@@ -147,15 +154,17 @@ async def upload_image(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    image_url = await validate_and_save_image(file, tenant.id, subfolder="products")
+    image_url, variants = await save_product_image(file, tenant.id, db)
 
     image = ProductImage(
         product_id=product.id,
         tenant_id=tenant.id,
         image_url=image_url,
         alt_text=file.filename,
+        variants=variants or None,
     )
     db.add(image)
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(image)
     return image
@@ -166,7 +175,7 @@ async def delete_image(
     product_id: uuid.UUID,
     image_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(ProductImage).where(
@@ -179,8 +188,10 @@ async def delete_image(
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
 
-    delete_by_url(image.image_url)
+    # Derivatives belong to the media object and go with its last reference
+    await release_media(db, tenant.id, image.image_url)
 
+    await bump_store_version(db, tenant.id)
     await db.delete(image)
 
 
@@ -189,7 +200,7 @@ async def create_variant(
     product_id: uuid.UUID,
     data: ProductVariantCreate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Product).where(Product.id == product_id, Product.tenant_id == tenant.id)
@@ -199,6 +210,7 @@ async def create_variant(
 
     variant = ProductVariant(product_id=product_id, tenant_id=tenant.id, **data.model_dump())
     db.add(variant)
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(variant)
     return variant
@@ -210,7 +222,7 @@ async def update_variant(
     variant_id: uuid.UUID,
     data: ProductVariantCreate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(ProductVariant).where(
@@ -226,6 +238,7 @@ async def update_variant(
     for key, value in data.model_dump().items():
         setattr(variant, key, value)
 
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(variant)
     return variant
@@ -236,7 +249,7 @@ async def delete_variant(
     product_id: uuid.UUID,
     variant_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(ProductVariant).where(
@@ -248,4 +261,5 @@ async def delete_variant(
     variant = result.scalar_one_or_none()
     if not variant:
         raise HTTPException(status_code=404, detail="Variant not found")
+    await bump_store_version(db, tenant.id)
     await db.delete(variant)
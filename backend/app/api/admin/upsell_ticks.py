@@ -3,46 +3,27 @@ import uuid
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.api.deps import get_db, require_active_tenant
-from app.models.product import Product, ProductImage
-from app.models.tenant import Tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.upsell_tick import UpsellTick
 from app.schemas.store import UpsellTickCreate, UpsellTickResponse
+from app.services.store_version import bump_store_version
+from app.services.upsell_enrichment import enrich_ticks
+from app.services.upsell_index import invalidate_tick_index
 
 router = APIRouter(prefix="/api/admin/upsell-ticks", tags=["admin-upsell-ticks"])
 
 
 async def _enrich_tick_product_info(tick: UpsellTick, db: AsyncSession) -> dict:
     """Convert UpsellTick ORM to dict with linked_product info."""
-    data = {c.name: getattr(tick, c.name) for c in tick.__table__.columns}
-    data["linked_product"] = None
-
-    if tick.link_product and tick.linked_product_id:
-        result = await db.execute(
-            select(Product)
-            .where(Product.id == tick.linked_product_id)
-            .options(selectinload(Product.images))
-        )
-        product = result.scalar_one_or_none()
-        if product:
-            img = None
-            if product.images:
-                img = product.images[0].image_url
-            data["linked_product"] = {
-                "id": product.id,
-                "name": product.name,
-                "price": float(product.price),
-                "image_url": img,
-            }
-    return data
+    enriched = await enrich_ticks(db, tick.tenant_id, [tick])
+    return enriched[0]
 
 
 @router.get("", response_model=list[UpsellTickResponse])
 async def list_upsell_ticks(
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(UpsellTick)
@@ -50,14 +31,14 @@ async def list_upsell_ticks(
         .order_by(UpsellTick.priority.desc(), UpsellTick.created_at.desc())
     )
     ticks = result.scalars().all()
-    return [await _enrich_tick_product_info(t, db) for t in ticks]
+    return await enrich_ticks(db, tenant.id, ticks)
 
 
 @router.get("/{tick_id}", response_model=UpsellTickResponse)
 async def get_upsell_tick(
     tick_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(UpsellTick).where(UpsellTick.id == tick_id, UpsellTick.tenant_id == tenant.id)
@@ -72,7 +53,7 @@ async def get_upsell_tick(
 async def create_upsell_tick(
     data: UpsellTickCreate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     tick_data = data.model_dump()
     pid = tick_data.pop("linked_product_id", None)
@@ -83,6 +64,8 @@ async def create_upsell_tick(
     )
     db.add(tick)
     await db.flush()
+    invalidate_tick_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
     await db.refresh(tick)
     return await _enrich_tick_product_info(tick, db)
 
@@ -92,7 +75,7 @@ async def update_upsell_tick(
     tick_id: uuid.UUID,
     data: UpsellTickCreate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(UpsellTick).where(UpsellTick.id == tick_id, UpsellTick.tenant_id == tenant.id)
@@ -108,6 +91,8 @@ async def update_upsell_tick(
     for key, value in update_data.items():
         setattr(tick, key, value)
 
+    invalidate_tick_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(tick)
     return await _enrich_tick_product_info(tick, db)
@@ -117,7 +102,7 @@ async def update_upsell_tick(
 async def toggle_upsell_tick(
     tick_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(UpsellTick).where(UpsellTick.id == tick_id, UpsellTick.tenant_id == tenant.id)
@@ -126,6 +111,8 @@ async def toggle_upsell_tick(
     if not tick:
         raise HTTPException(status_code=404, detail="Upsell tick not found")
     tick.is_active = not tick.is_active
+    invalidate_tick_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(tick)
     return await _enrich_tick_product_info(tick, db)
@@ -135,7 +122,7 @@ async def toggle_upsell_tick(
 async def duplicate_upsell_tick(
     tick_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(UpsellTick).where(UpsellTick.id == tick_id, UpsellTick.tenant_id == tenant.id)
@@ -152,6 +139,8 @@ async def duplicate_upsell_tick(
     new_tick = UpsellTick(**new_data)
     db.add(new_tick)
     await db.flush()
+    invalidate_tick_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
     await db.refresh(new_tick)
     return await _enrich_tick_product_info(new_tick, db)
 
@@ -160,7 +149,7 @@ async def duplicate_upsell_tick(
 async def delete_upsell_tick(
     tick_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(UpsellTick).where(UpsellTick.id == tick_id, UpsellTick.tenant_id == tenant.id)
@@ -169,3 +158,5 @@ async def delete_upsell_tick(
     if not tick:
         raise HTTPException(status_code=404, detail="Upsell tick not found")
     await db.delete(tick)
+    invalidate_tick_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
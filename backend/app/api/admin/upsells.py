@@ -3,11 +3,8 @@ import uuid
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.api.deps import get_db, require_active_tenant
-from app.models.product import Product, ProductImage
-from app.models.tenant import Tenant
+from app.api.deps import AuthTenant, get_db, require_active_tenant
 from app.models.upsell import Upsell, UpsellConfig
 from app.schemas.store import (
     UpsellConfigResponse,
@@ -15,6 +12,9 @@ from app.schemas.store import (
     UpsellCreate,
     UpsellResponse,
 )
+from app.services.store_version import bump_store_version
+from app.services.upsell_enrichment import enrich_upsells
+from app.services.upsell_index import invalidate_upsell_index
 
 router = APIRouter(prefix="/api/admin/upsells", tags=["admin-upsells"])
 
@@ -24,7 +24,7 @@ router = APIRouter(prefix="/api/admin/upsells", tags=["admin-upsells"])
 @router.get("/config", response_model=UpsellConfigResponse)
 async def get_upsell_config(
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(UpsellConfig).where(UpsellConfig.tenant_id == tenant.id)
@@ -33,6 +33,7 @@ async def get_upsell_config(
     if not config:
         config = UpsellConfig(tenant_id=tenant.id)
         db.add(config)
+        await bump_store_version(db, tenant.id)
         await db.flush()
         await db.refresh(config)
     return config
@@ -42,7 +43,7 @@ async def get_upsell_config(
 async def update_upsell_config(
     data: UpsellConfigUpdate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(UpsellConfig).where(UpsellConfig.tenant_id == tenant.id)
@@ -56,6 +57,7 @@ async def update_upsell_config(
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(config, key, value)
 
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(config)
     return config
@@ -65,27 +67,8 @@ async def update_upsell_config(
 
 async def _enrich_product_info(upsell: Upsell, db: AsyncSession) -> dict:
     """Convert Upsell ORM to dict with upsell_product info."""
-    data = {c.name: getattr(upsell, c.name) for c in upsell.__table__.columns}
-    data["upsell_product"] = None
-
-    if upsell.upsell_product_id:
-        result = await db.execute(
-            select(Product)
-            .where(Product.id == upsell.upsell_product_id)
-            .options(selectinload(Product.images))
-        )
-        product = result.scalar_one_or_none()
-        if product:
-            img = None
-            if product.images:
-                img = product.images[0].image_url
-            data["upsell_product"] = {
-                "id": product.id,
-                "name": product.name,
-                "price": float(product.price),
-                "image_url": img,
-            }
-    return data
+    enriched = await enrich_upsells(db, upsell.tenant_id, [upsell])
+    return enriched[0]
 
 
 # ── CRUD endpoints ──────────────────────────────────────────────────
@@ -93,7 +76,7 @@ async def _enrich_product_info(upsell: Upsell, db: AsyncSession) -> dict:
 @router.get("", response_model=list[UpsellResponse])
 async def list_upsells(
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Upsell)
@@ -101,14 +84,14 @@ async def list_upsells(
         .order_by(Upsell.priority.desc(), Upsell.created_at.desc())
     )
     upsells = result.scalars().all()
-    return [await _enrich_product_info(u, db) for u in upsells]
+    return await enrich_upsells(db, tenant.id, upsells)
 
 
 @router.get("/{upsell_id}", response_model=UpsellResponse)
 async def get_upsell(
     upsell_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Upsell).where(Upsell.id == upsell_id, Upsell.tenant_id == tenant.id)
@@ -123,7 +106,7 @@ async def get_upsell(
 async def create_upsell(
     data: UpsellCreate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     upsell_data = data.model_dump()
     # Convert string product_id to UUID if present
@@ -135,6 +118,8 @@ async def create_upsell(
     )
     db.add(upsell)
     await db.flush()
+    invalidate_upsell_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
     await db.refresh(upsell)
     return await _enrich_product_info(upsell, db)
 
@@ -144,7 +129,7 @@ async def update_upsell(
     upsell_id: uuid.UUID,
     data: UpsellCreate,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Upsell).where(Upsell.id == upsell_id, Upsell.tenant_id == tenant.id)
@@ -160,6 +145,8 @@ async def update_upsell(
     for key, value in update_data.items():
         setattr(upsell, key, value)
 
+    invalidate_upsell_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(upsell)
     return await _enrich_product_info(upsell, db)
@@ -169,7 +156,7 @@ async def update_upsell(
 async def toggle_upsell(
     upsell_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Upsell).where(Upsell.id == upsell_id, Upsell.tenant_id == tenant.id)
@@ -178,6 +165,8 @@ async def toggle_upsell(
     if not upsell:
         raise HTTPException(status_code=404, detail="Upsell not found")
     upsell.is_active = not upsell.is_active
+    invalidate_upsell_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
     await db.flush()
     await db.refresh(upsell)
     return await _enrich_product_info(upsell, db)
@@ -187,7 +176,7 @@ async def toggle_upsell(
 async def duplicate_upsell(
     upsell_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Upsell).where(Upsell.id == upsell_id, Upsell.tenant_id == tenant.id)
@@ -205,6 +194,8 @@ async def duplicate_upsell(
     new_upsell = Upsell(**new_data)
     db.add(new_upsell)
     await db.flush()
+    invalidate_upsell_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
     await db.refresh(new_upsell)
     return await _enrich_product_info(new_upsell, db)
 
@@ -213,7 +204,7 @@ async def duplicate_upsell(
 async def delete_upsell(
     upsell_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    tenant: Tenant = Depends(require_active_tenant),
+    tenant: AuthTenant = Depends(require_active_tenant),
 ):
     result = await db.execute(
         select(Upsell).where(Upsell.id == upsell_id, Upsell.tenant_id == tenant.id)
@@ -222,3 +213,5 @@ async def delete_upsell(
     if not upsell:
         raise HTTPException(status_code=404, detail="Upsell not found")
     await db.delete(upsell)
+    invalidate_upsell_index(db, tenant.id)
+    await bump_store_version(db, tenant.id)
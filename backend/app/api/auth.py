@@ -9,7 +9,16 @@ from app.models.store_config import StoreConfig
 from app.models.store_page import StorePage
 from app.models.tenant import Tenant
 from app.schemas.tenant import TenantLogin, TenantRegister, TenantResponse, TokenRefresh, TokenResponse
-from app.utils.security import create_access_token, create_refresh_token, decode_token, hash_password, verify_password
+from app.utils.security import (
+    PasswordHashBusy,
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    hash_password,
+    hash_pool,
+    password_needs_rehash,
+    verify_password,
+)
 from app.utils.slugify import generate_unique_slug
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -31,6 +40,18 @@ DEFAULT_PAGES = [
 ]
 
 
+async def _off_loop(fn, *args):
+    """Run a bcrypt call on the hashing pool; 503 when its queue is full."""
+    try:
+        return await hash_pool.run(fn, *args)
+    except PasswordHashBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def register(data: TenantRegister, db: AsyncSession = Depends(get_db)):
     existing = await db.execute(select(Tenant).where(Tenant.email == data.email))
@@ -41,7 +62,7 @@ async def register(data: TenantRegister, db: AsyncSession = Depends(get_db)):
 
     tenant = Tenant(
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=await _off_loop(hash_password, data.password),
         store_name=data.store_name,
         slug=slug,
         country=data.country,
@@ -70,9 +91,13 @@ async def register(data: TenantRegister, db: AsyncSession = Depends(get_db)):
 async def login(data: TenantLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Tenant).where(Tenant.email == data.email))
     tenant = result.scalar_one_or_none()
-    if tenant is None or not verify_password(data.password, tenant.password_hash):
+    if tenant is None or not await _off_loop(verify_password, data.password, tenant.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
 
+    if password_needs_rehash(tenant.password_hash):
+        # Only now do we have the plaintext to re-hash at the current cost
+        tenant.password_hash = await _off_loop(hash_password, data.password)
+
     access_token = create_access_token({"sub": str(tenant.id)})
     refresh_token = create_refresh_token({"sub": str(tenant.id)})
     return TokenResponse(access_token=access_token, refresh_token=refresh_token)
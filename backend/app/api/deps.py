@@ -1,4 +1,5 @@
 import uuid
+from dataclasses import dataclass
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -7,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import async_session
 from app.models.tenant import Tenant
+from app.services import tenant_status
 from app.utils.security import decode_token
 
 security_scheme = HTTPBearer()
@@ -22,10 +24,18 @@ async def get_db():
             raise
 
 
-async def get_current_tenant(
-    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> Tenant:
+@dataclass(frozen=True, slots=True)
+class AuthTenant:
+    """The authenticated tenant, from its token id and the tenant status cache."""
+
+    id: uuid.UUID
+    slug: str
+    plan: str
+    email: str
+    is_active: bool
+
+
+def _token_payload(credentials: HTTPAuthorizationCredentials) -> tuple[uuid.UUID, dict]:
     payload = decode_token(credentials.credentials)
     if payload is None or payload.get("type") != "access":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
@@ -39,6 +49,16 @@ async def get_current_tenant(
     except ValueError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
+    return tenant_id, payload
+
+
+async def get_current_tenant(
+    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Tenant:
+    """Load the full Tenant row (for routes that need more than ``AuthTenant``)."""
+    tenant_id, _ = _token_payload(credentials)
+
     result = await db.execute(select(Tenant).where(Tenant.id == tenant_id))
     tenant = result.scalar_one_or_none()
     if tenant is None:
@@ -47,9 +67,28 @@ async def get_current_tenant(
     return tenant
 
 
+async def get_token_tenant(
+    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> AuthTenant:
+    """Authenticate from the token; no Tenant query while its fields are cached.
+
+    The token only names the tenant. Slug, plan, email and active state come
+    from the tenant status cache, which every Tenant write invalidates, so a
+    deactivation or an email change takes effect on the next request.
+    """
+    tenant_id, _ = _token_payload(credentials)
+
+    fields = await tenant_status.get_tenant_fields(tenant_id, db)
+    if fields is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Tenant not found")
+
+    return AuthTenant(id=tenant_id, **fields)
+
+
 async def require_active_tenant(
-    tenant: Tenant = Depends(get_current_tenant),
-) -> Tenant:
+    tenant: AuthTenant = Depends(get_token_tenant),
+) -> AuthTenant:
     if not tenant.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Tenant is inactive")
     return tenant
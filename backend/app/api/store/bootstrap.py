@@ -0,0 +1,69 @@
+import json
+
+from fastapi import APIRouter, Depends, Request, Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app.api.store.catalog import load_checkout_config_payload, load_store_config
+from app.api.store.pages import PublicPageResponse, load_home_page
+from app.schemas.checkout_config import CheckoutConfigResponse
+from app.schemas.product import ProductResponse
+from app.schemas.store import StoreConfigResponse
+from app.services.catalog_snapshot import get_catalog_snapshot
+from app.services.response_cache import load_response
+from app.services.tenant_resolver import get_tenant_by_slug
+from app.utils.http_cache import store_etag, store_validators
+
+router = APIRouter(prefix="/api/store", tags=["store"])
+
+
+class StoreBootstrapResponse(BaseModel):
+    config: StoreConfigResponse | None = None
+    products: list[ProductResponse] = []
+    checkout_config: CheckoutConfigResponse | None = None
+    home_page: PublicPageResponse | None = None
+
+
+@router.get("/{slug}/bootstrap", response_model=StoreBootstrapResponse)
+async def get_store_bootstrap(slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    """Everything the storefront needs on first paint, in one response.
+
+    Combines /config, /products, /checkout-config and /pages/home. The
+    response carries an ETag; send it back as If-None-Match to get a 304.
+
+    Each part comes from the cache entry its own route uses (the catalog
+    snapshot, and the response cache under that route's ETag). Misses are
+    coalesced with concurrent requests for the same part; a leader loads on
+    this request's session, one part after another, so a burst of first
+    visits triggers one load per part and holds at most one connection per
+    request.
+    """
+    tenant = await get_tenant_by_slug(slug, db)
+    not_modified = await store_validators(request, response, tenant, db)
+    if not_modified:
+        return not_modified
+
+    version = request.state.store_version
+
+    async def _part(resource: str, path: str, loader):
+        etag = store_etag(request, tenant, version, f"/api/store/{slug}{path}")
+        return await load_response(tenant, resource, etag, db, loader, request_session=True)
+
+    config = await _part("config", "/config", load_store_config)
+    checkout_config = await _part("checkout_config", "/checkout-config", load_checkout_config_payload)
+    home_page = await _part("home_page", "/pages/home", load_home_page)
+    snapshot = await get_catalog_snapshot(tenant, version, db, request_session=True)
+
+    # The product list is spliced in as the snapshot's pre-serialized bytes
+    parts = {
+        "config": StoreConfigResponse.model_validate(config).model_dump_json() if config else "null",
+        "checkout_config": json.dumps(checkout_config),
+        "home_page": PublicPageResponse.model_validate(home_page).model_dump_json() if home_page else "null",
+    }
+    body = (
+        f'{{"config":{parts["config"]},"products":'.encode()
+        + snapshot.products
+        + f',"checkout_config":{parts["checkout_config"]},"home_page":{parts["home_page"]}}}'.encode()
+    )
+    return Response(content=body, media_type="application/json", headers=response.headers)
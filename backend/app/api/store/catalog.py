@@ -1,84 +1,112 @@
-from fastapi import APIRouter, HTTPException
+import uuid
+
+from fastapi import APIRouter, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from fastapi import Depends
-import uuid as _uuid_mod
 
 from app.api.deps import get_db
 from app.models.checkout_config import CheckoutConfig
-from app.models.checkout_offer import QuantityOffer
 from app.models.product import Product
 from app.models.store_config import StoreConfig
 from app.models.store_page import StorePage
-from app.models.tenant import Tenant
 from app.schemas.checkout_config import CheckoutConfigResponse
 from app.schemas.product import ProductResponse
-from app.schemas.store import StoreConfigResponse, StorePageResponse, QuantityOfferResponse
+from app.schemas.store import StoreConfigResponse, StorePageResponse, StoreQuantityOfferResponse
+from app.services.catalog_snapshot import get_catalog_snapshot
+from app.services.counters import counter_buffer
+from app.services.offer_index import get_offer_index
+from app.services.response_cache import load_response
+from app.services.tenant_resolver import StoreTenant, get_tenant_by_slug
+from app.utils.http_cache import store_validators
 
 router = APIRouter(prefix="/api/store", tags=["store"])
 
 
-async def get_tenant_by_slug(slug: str, db: AsyncSession) -> Tenant:
-    result = await db.execute(select(Tenant).where(Tenant.slug == slug, Tenant.is_active == True))
-    tenant = result.scalar_one_or_none()
-    if not tenant:
-        raise HTTPException(status_code=404, detail="Store not found")
-    return tenant
-
-
-@router.get("/{slug}/config", response_model=StoreConfigResponse)
-async def get_store_config(slug: str, db: AsyncSession = Depends(get_db)):
-    tenant = await get_tenant_by_slug(slug, db)
+async def load_store_config(tenant: StoreTenant, db: AsyncSession) -> dict | None:
     result = await db.execute(select(StoreConfig).where(StoreConfig.tenant_id == tenant.id))
     config = result.scalar_one_or_none()
     if not config:
-        raise HTTPException(status_code=404, detail="Store config not found")
+        return None
     # Build response with store_name from tenant
     data = {c.key: getattr(config, c.key) for c in StoreConfig.__table__.columns}
     data["store_name"] = tenant.store_name
     return data
 
 
-@router.get("/{slug}/products", response_model=list[ProductResponse])
-async def list_store_products(slug: str, db: AsyncSession = Depends(get_db)):
-    tenant = await get_tenant_by_slug(slug, db)
+async def load_store_products(tenant: StoreTenant, db: AsyncSession) -> list[Product]:
     result = await db.execute(
         select(Product)
         .where(Product.tenant_id == tenant.id, Product.is_active == True)
         .options(selectinload(Product.images), selectinload(Product.variants))
         .order_by(Product.sort_order)
     )
-    return result.scalars().all()
+    return list(result.scalars().all())
 
 
-@router.get("/{slug}/products/{product_slug}", response_model=ProductResponse)
-async def get_store_product(slug: str, product_slug: str, db: AsyncSession = Depends(get_db)):
-    tenant = await get_tenant_by_slug(slug, db)
+async def load_checkout_config(tenant: StoreTenant, db: AsyncSession) -> CheckoutConfig | None:
     result = await db.execute(
-        select(Product)
-        .where(Product.tenant_id == tenant.id, Product.slug == product_slug, Product.is_active == True)
-        .options(selectinload(Product.images), selectinload(Product.variants))
+        select(CheckoutConfig).where(CheckoutConfig.tenant_id == tenant.id)
     )
-    product = result.scalar_one_or_none()
-    if not product:
+    return result.scalar_one_or_none()
+
+
+async def load_checkout_config_payload(tenant: StoreTenant, db: AsyncSession) -> dict | None:
+    config = await load_checkout_config(tenant, db)
+    return CheckoutConfigResponse.model_validate(config).model_dump(mode="json") if config else None
+
+
+@router.get("/{slug}/config", response_model=StoreConfigResponse)
+async def get_store_config(slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    tenant = await get_tenant_by_slug(slug, db)
+    not_modified = await store_validators(request, response, tenant, db)
+    if not_modified:
+        return not_modified
+    data = await load_response(tenant, "config", response.headers["etag"], db, load_store_config)
+    if not data:
+        raise HTTPException(status_code=404, detail="Store config not found")
+    return data
+
+
+@router.get("/{slug}/products", response_model=list[ProductResponse])
+async def list_store_products(slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    tenant = await get_tenant_by_slug(slug, db)
+    not_modified = await store_validators(request, response, tenant, db)
+    if not_modified:
+        return not_modified
+    snapshot = await get_catalog_snapshot(tenant, request.state.store_version, db)
+    return Response(content=snapshot.products, media_type="application/json", headers=response.headers)
+
+
+@router.get("/{slug}/products/{product_slug}", response_model=ProductResponse)
+async def get_store_product(slug: str, product_slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    tenant = await get_tenant_by_slug(slug, db)
+    not_modified = await store_validators(request, response, tenant, db)
+    if not_modified:
+        return not_modified
+    snapshot = await get_catalog_snapshot(tenant, request.state.store_version, db)
+    body = snapshot.by_slug.get(product_slug)
+    if body is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    return Response(content=body, media_type="application/json", headers=response.headers)
 
 
 @router.get("/{slug}/checkout-config", response_model=CheckoutConfigResponse | None)
-async def get_store_checkout_config(slug: str, db: AsyncSession = Depends(get_db)):
+async def get_store_checkout_config(slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     tenant = await get_tenant_by_slug(slug, db)
-    result = await db.execute(
-        select(CheckoutConfig).where(CheckoutConfig.tenant_id == tenant.id)
-    )
-    config = result.scalar_one_or_none()
-    return config
+    not_modified = await store_validators(request, response, tenant, db)
+    if not_modified:
+        return not_modified
+    return await load_response(tenant, "checkout_config", response.headers["etag"], db, load_checkout_config_payload)
 
 
 @router.get("/{slug}/pages/{page_slug}", response_model=StorePageResponse)
-async def get_store_page(slug: str, page_slug: str, db: AsyncSession = Depends(get_db)):
+async def get_store_page(slug: str, page_slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     tenant = await get_tenant_by_slug(slug, db)
+    not_modified = await store_validators(request, response, tenant, db)
+    if not_modified:
+        return not_modified
     result = await db.execute(
         select(StorePage)
         .where(StorePage.tenant_id == tenant.id, StorePage.slug == page_slug, StorePage.is_published == True)
@@ -89,38 +117,25 @@ async def get_store_page(slug: str, page_slug: str, db: AsyncSession = Depends(g
     return page
 
 
-@router.get("/{slug}/quantity-offers/{product_id}", response_model=QuantityOfferResponse | None)
+@router.get("/{slug}/quantity-offers/{product_id}", response_model=StoreQuantityOfferResponse | None)
 async def get_quantity_offer_for_product(
-    slug: str, product_id: str, db: AsyncSession = Depends(get_db)
+    slug: str, product_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)
 ):
     tenant = await get_tenant_by_slug(slug, db)
-    # Find the highest-priority active offer whose product_ids includes this product
-    result = await db.execute(
-        select(QuantityOffer)
-        .where(QuantityOffer.tenant_id == tenant.id, QuantityOffer.is_active == True)
-        .options(selectinload(QuantityOffer.tiers))
-        .order_by(QuantityOffer.priority.desc())
-    )
-    offers = result.scalars().all()
-    for offer in offers:
-        pids = offer.product_ids or []
-        if product_id in pids or str(product_id) in [str(p) for p in pids]:
-            return offer
-    return None
+    not_modified = await store_validators(request, response, tenant, db)
+    if not_modified:
+        return not_modified
+    # Highest-priority active offer whose product_ids includes this product
+    index = await get_offer_index(tenant.id, db)
+    offer = index.offer_for(product_id)
+    return offer.response if offer else None
 
 
 @router.post("/{slug}/quantity-offers/{offer_id}/impression")
 async def register_impression(
-    slug: str, offer_id: str, db: AsyncSession = Depends(get_db)
+    slug: str, offer_id: uuid.UUID, db: AsyncSession = Depends(get_db)
 ):
     tenant = await get_tenant_by_slug(slug, db)
-    result = await db.execute(
-        select(QuantityOffer).where(
-            QuantityOffer.id == _uuid_mod.UUID(offer_id),
-            QuantityOffer.tenant_id == tenant.id,
-        )
-    )
-    offer = result.scalar_one_or_none()
-    if offer:
-        offer.impressions = (offer.impressions or 0) + 1
+    # Buffered; written in batches (an unknown offer id just updates nothing)
+    counter_buffer.incr("offer_impressions", tenant.id, offer_id)
     return {"status": "ok"}
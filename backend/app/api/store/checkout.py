@@ -1,21 +1,31 @@
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.api.deps import get_db
-from app.models.abandoned_cart import AbandonedCart
-from app.models.checkout_offer import QuantityOffer, QuantityOfferTier
+from app.api.store.catalog import load_checkout_config
+from app.database import upsert
 from app.models.customer import Customer
 from app.models.order import Order, OrderItem
 from app.models.product import Product
-from app.models.tenant import Tenant
 from app.models.upsell import Upsell, UpsellConfig
-from app.models.upsell_tick import UpsellTick
+from app.schemas.checkout_config import CheckoutConfigResponse
+from app.schemas.product import ProductResponse
+from app.services.cart_capture import cart_buffer
+from app.services.counters import counter_buffer
+from app.services.offer_index import get_offer_index
+from app.services.order_numbers import next_order_number
+from app.services.response_cache import get_cached_response, set_cached_response
+from app.services.tenant_resolver import StoreTenant, get_tenant_by_slug
+from app.services.upsell_enrichment import enrich_ticks, enrich_upsells
+from app.services.upsell_index import get_tick_index, get_upsell_index
+from app.utils.http_cache import store_validators
 
 router = APIRouter(prefix="/api/store", tags=["store-checkout"])
 
@@ -68,17 +78,9 @@ class CartCapture(BaseModel):
     last_step: str | None = None
 
 
-async def _get_tenant_by_slug(slug: str, db: AsyncSession) -> Tenant:
-    result = await db.execute(select(Tenant).where(Tenant.slug == slug, Tenant.is_active == True))
-    tenant = result.scalar_one_or_none()
-    if not tenant:
-        raise HTTPException(status_code=404, detail="Store not found")
-    return tenant
-
-
 @router.post("/{slug}/order", response_model=OrderCreatedResponse)
 async def create_order(slug: str, data: OrderCreate, db: AsyncSession = Depends(get_db)):
-    tenant = await _get_tenant_by_slug(slug, db)
+    tenant = await get_tenant_by_slug(slug, db)
 
     if not data.items:
         raise HTTPException(status_code=400, detail="Order must have at least one item")
@@ -88,15 +90,22 @@ async def create_order(slug: str, data: OrderCreate, db: AsyncSession = Depends(
     subtotal = 0
 
     # Check for quantity offers
-    offers_result = await db.execute(
-        select(QuantityOffer)
-        .where(QuantityOffer.tenant_id == tenant.id, QuantityOffer.is_active == True)
-        .options(selectinload(QuantityOffer.tiers))
-    )
-    all_offers = offers_result.scalars().all()
+    offer_index = await get_offer_index(tenant.id, db)
+    offer_ids_used = []
 
     tick_ids_accepted = []
 
+    # Load every referenced product (regular items + linked ticks) in one round trip
+    product_ids = {item.product_id for item in data.items if item.product_id}
+    products_by_id = {}
+    if product_ids:
+        products_result = await db.execute(
+            select(Product)
+            .where(Product.id.in_(product_ids), Product.tenant_id == tenant.id)
+            .options(joinedload(Product.variants))
+        )
+        products_by_id = {p.id: p for p in products_result.unique().scalars()}
+
     for item_data in data.items:
         # Handle upsell tick items (inline checkbox add-ons)
         if item_data.is_upsell_tick and item_data.upsell_tick_id:
@@ -109,10 +118,7 @@ async def create_order(slug: str, data: OrderCreate, db: AsyncSession = Depends(
             product_name = tick_name
             dropi_pid = None
             if item_data.product_id:
-                p_result = await db.execute(
-                    select(Product).where(Product.id == item_data.product_id, Product.tenant_id == tenant.id)
-                )
-                linked = p_result.scalar_one_or_none()
+                linked = products_by_id.get(item_data.product_id)
                 if linked:
                     product_id = linked.id
                     product_name = linked.name
@@ -131,13 +137,8 @@ async def create_order(slug: str, data: OrderCreate, db: AsyncSession = Depends(
             continue
 
         # Regular product items
-        result = await db.execute(
-            select(Product)
-            .where(Product.id == item_data.product_id, Product.tenant_id == tenant.id, Product.is_active == True)
-            .options(selectinload(Product.variants))
-        )
-        product = result.scalar_one_or_none()
-        if not product:
+        product = products_by_id.get(item_data.product_id)
+        if not product or not product.is_active:
             raise HTTPException(status_code=400, detail=f"Product {item_data.product_id} not found or inactive")
 
         unit_price = float(product.price)
@@ -151,26 +152,12 @@ async def create_order(slug: str, data: OrderCreate, db: AsyncSession = Depends(
                 variant_name = variant.name
 
         # Apply quantity offer tiers
-        pid_str = str(product.id)
-        matched_offer = None
-        for qo in all_offers:
-            pids = [str(p) for p in (qo.product_ids or [])]
-            if pid_str in pids:
-                matched_offer = qo
-                break
-
+        matched_offer = offer_index.offer_for(product.id)
         if matched_offer and matched_offer.tiers:
-            matched_tier = None
-            for tier in sorted(matched_offer.tiers, key=lambda t: t.quantity, reverse=True):
-                if item_data.quantity >= tier.quantity:
-                    matched_tier = tier
-                    break
-            if matched_tier and float(matched_tier.discount_value) > 0:
-                if matched_tier.discount_type == "percentage":
-                    unit_price = unit_price * (1 - float(matched_tier.discount_value) / 100)
-                elif matched_tier.discount_type == "fixed":
-                    unit_price = max(0, unit_price - float(matched_tier.discount_value))
-            matched_offer.orders_count = (matched_offer.orders_count or 0) + 1
+            matched_tier = matched_offer.tier_for(item_data.quantity)
+            if matched_tier:
+                unit_price = matched_tier.apply(unit_price)
+            offer_ids_used.append(matched_offer.id)
 
         total_price = unit_price * item_data.quantity
         subtotal += total_price
@@ -187,12 +174,7 @@ async def create_order(slug: str, data: OrderCreate, db: AsyncSession = Depends(
             dropi_product_id=product.dropi_product_id,
         ))
 
-    # Generate order number
-    count_result = await db.execute(
-        select(func.count()).select_from(Order).where(Order.tenant_id == tenant.id)
-    )
-    count = (count_result.scalar() or 0) + 1
-    order_number = f"ORD-{count:04d}"
+    order_number = await next_order_number(db, tenant.id)
 
     order = Order(
         tenant_id=tenant.id,
@@ -222,43 +204,40 @@ async def create_order(slug: str, data: OrderCreate, db: AsyncSession = Depends(
         item.order_id = order.id
         db.add(item)
 
-    # Update or create customer
-    cust_result = await db.execute(
-        select(Customer).where(Customer.tenant_id == tenant.id, Customer.phone == data.customer_phone)
+    # Create or update the customer aggregate in one statement. The row lock
+    # taken by ON CONFLICT serializes concurrent orders from the same phone
+    # instead of failing one of them on uq_customer_tenant_phone.
+    customer_stmt = upsert(db, Customer).values(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        name=data.customer_name,
+        phone=data.customer_phone,
+        email=data.customer_email,
+        city=data.city,
+        address=data.address,
+        total_orders=1,
+        total_spent=subtotal,
+        last_order_at=datetime.now(timezone.utc),
     )
-    customer = cust_result.scalar_one_or_none()
-    if customer:
-        customer.total_orders += 1
-        customer.total_spent = float(customer.total_spent) + subtotal
-        customer.last_order_at = datetime.now(timezone.utc)
-        if data.customer_name:
-            customer.name = data.customer_name
-        if data.city:
-            customer.city = data.city
-    else:
-        customer = Customer(
-            tenant_id=tenant.id,
-            name=data.customer_name,
-            phone=data.customer_phone,
-            email=data.customer_email,
-            city=data.city,
-            address=data.address,
-            total_orders=1,
-            total_spent=subtotal,
-            last_order_at=datetime.now(timezone.utc),
-        )
-        db.add(customer)
-
-    # Increment accepted_count for any upsell ticks
-    if tick_ids_accepted:
-        tick_result = await db.execute(
-            select(UpsellTick).where(
-                UpsellTick.id.in_(tick_ids_accepted),
-                UpsellTick.tenant_id == tenant.id,
-            )
-        )
-        for tick in tick_result.scalars():
-            tick.accepted_count = (tick.accepted_count or 0) + 1
+    new = customer_stmt.excluded
+    await db.execute(customer_stmt.on_conflict_do_update(
+        index_elements=[Customer.tenant_id, Customer.phone],
+        set_={
+            "total_orders": func.coalesce(Customer.total_orders, 0) + 1,
+            "total_spent": func.coalesce(Customer.total_spent, 0) + new.total_spent,
+            "last_order_at": new.last_order_at,
+            # Blank name / city keep what we had
+            "name": func.coalesce(func.nullif(new.name, ""), Customer.name),
+            "city": func.coalesce(func.nullif(new.city, ""), Customer.city),
+        },
+    ))
+
+    # Offer orders_count / tick accepted_count go through the write-behind
+    # counters once the order commits, instead of locking those hot rows here
+    for offer_id in offer_ids_used:
+        counter_buffer.incr_on_commit(db, "offer_orders", tenant.id, offer_id)
+    for tick_id in set(tick_ids_accepted):
+        counter_buffer.incr_on_commit(db, "tick_accepted", tenant.id, tick_id)
 
     return OrderCreatedResponse(order_id=order.id, order_number=order_number)
 
@@ -270,7 +249,7 @@ async def get_order_summary(
     db: AsyncSession = Depends(get_db),
 ):
     """Public endpoint: returns basic order summary for confirmation page."""
-    tenant = await _get_tenant_by_slug(slug, db)
+    tenant = await get_tenant_by_slug(slug, db)
 
     result = await db.execute(
         select(Order)
@@ -304,27 +283,9 @@ async def get_order_summary(
 
 @router.post("/{slug}/cart/capture")
 async def capture_cart(slug: str, data: CartCapture, db: AsyncSession = Depends(get_db)):
-    tenant = await _get_tenant_by_slug(slug, db)
-
-    result = await db.execute(
-        select(AbandonedCart).where(
-            AbandonedCart.tenant_id == tenant.id,
-            AbandonedCart.session_id == data.session_id,
-        )
-    )
-    cart = result.scalar_one_or_none()
-
-    if cart:
-        for key, value in data.model_dump(exclude={"session_id"}, exclude_none=True).items():
-            setattr(cart, key, value)
-    else:
-        cart = AbandonedCart(
-            tenant_id=tenant.id,
-            session_id=data.session_id,
-            **data.model_dump(exclude={"session_id"}, exclude_none=True),
-        )
-        db.add(cart)
-
+    tenant = await get_tenant_by_slug(slug, db)
+    # Written by the coalescer within CART_COALESCE_WINDOW, merged with later steps
+    cart_buffer.stage(tenant.id, data.session_id, data.model_dump(exclude={"session_id"}, exclude_none=True))
     return {"status": "captured"}
 
 
@@ -337,8 +298,11 @@ async def get_upsells_for_product(
     product_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
 ):
-    tenant = await _get_tenant_by_slug(slug, db)
+    tenant = await get_tenant_by_slug(slug, db)
+    return await load_upsells_for_product(tenant, product_id, db)
+
 
+async def load_upsells_for_product(tenant: StoreTenant, product_id: uuid.UUID, db: AsyncSession) -> dict:
     # Get config
     cfg_result = await db.execute(
         select(UpsellConfig).where(UpsellConfig.tenant_id == tenant.id)
@@ -347,57 +311,15 @@ async def get_upsells_for_product(
     if not config or not config.is_active:
         return {"config": None, "upsells": []}
 
-    # Get active upsells
-    result = await db.execute(
-        select(Upsell)
-        .where(Upsell.tenant_id == tenant.id, Upsell.is_active == True)
-        .order_by(Upsell.priority.desc(), Upsell.created_at.desc())
-    )
-    all_upsells = result.scalars().all()
-
-    # Filter by trigger
-    pid_str = str(product_id)
-    matched = []
-    for u in all_upsells:
-        if not u.upsell_product_id:
-            continue
-        if u.trigger_type == "all":
-            matched.append(u)
-        elif u.trigger_type == "specific":
-            pids = [str(p) for p in (u.trigger_product_ids or [])]
-            if pid_str in pids:
-                matched.append(u)
+    # Active upsells triggered by this product
+    index = await get_upsell_index(tenant.id, db)
+    matched = index.matches(product_id)
 
     # Limit to max
     matched = matched[: config.max_upsells_per_order]
 
     # Enrich with product info
-    enriched = []
-    for u in matched:
-        data = {c.name: getattr(u, c.name) for c in u.__table__.columns}
-        data["upsell_product"] = None
-        if u.upsell_product_id:
-            p_result = await db.execute(
-                select(Product)
-                .where(Product.id == u.upsell_product_id, Product.is_active == True)
-                .options(selectinload(Product.images), selectinload(Product.variants))
-            )
-            product = p_result.scalar_one_or_none()
-            if product:
-                img = product.images[0].image_url if product.images else None
-                variants = [
-                    {"id": v.id, "name": v.name, "price_override": float(v.price_override) if v.price_override else None}
-                    for v in (product.variants or [])
-                ]
-                data["upsell_product"] = {
-                    "id": product.id,
-                    "name": product.name,
-                    "price": float(product.price),
-                    "description": product.description,
-                    "image_url": img,
-                    "variants": variants,
-                }
-                enriched.append(data)
+    enriched = await enrich_upsells(db, tenant.id, matched, storefront=True)
 
     config_data = {c.name: getattr(config, c.name) for c in config.__table__.columns}
     return {"config": config_data, "upsells": enriched}
@@ -417,7 +339,7 @@ async def add_upsell_item(
     data: UpsellItemCreate,
     db: AsyncSession = Depends(get_db),
 ):
-    tenant = await _get_tenant_by_slug(slug, db)
+    tenant = await get_tenant_by_slug(slug, db)
 
     # Get order
     order_result = await db.execute(
@@ -456,7 +378,7 @@ async def add_upsell_item(
             unit_price = unit_price * (1 - float(upsell.discount_value) / 100)
         elif upsell.discount_type == "fixed" and float(upsell.discount_value) > 0:
             unit_price = max(0, unit_price - float(upsell.discount_value))
-        upsell.accepted_count = (upsell.accepted_count or 0) + 1
+        counter_buffer.incr_on_commit(db, "upsell_accepted", tenant.id, upsell.id)
 
     total_price = unit_price * data.quantity
 
@@ -490,48 +412,16 @@ async def get_upsell_ticks_for_product(
     db: AsyncSession = Depends(get_db),
 ):
     """Return active upsell-ticks that apply to the given product."""
-    tenant = await _get_tenant_by_slug(slug, db)
+    tenant = await get_tenant_by_slug(slug, db)
+    return await load_upsell_ticks_for_product(tenant, product_id, db)
 
-    result = await db.execute(
-        select(UpsellTick)
-        .where(UpsellTick.tenant_id == tenant.id, UpsellTick.is_active == True)
-        .order_by(UpsellTick.priority.desc(), UpsellTick.created_at.desc())
-    )
-    all_ticks = result.scalars().all()
-
-    pid_str = str(product_id)
-    matched = []
-    for t in all_ticks:
-        if t.trigger_type == "all":
-            matched.append(t)
-        elif t.trigger_type == "specific":
-            pids = [str(p) for p in (t.trigger_product_ids or [])]
-            if pid_str in pids:
-                matched.append(t)
+
+async def load_upsell_ticks_for_product(tenant: StoreTenant, product_id: uuid.UUID, db: AsyncSession) -> list[dict]:
+    index = await get_tick_index(tenant.id, db)
+    matched = index.matches(product_id)
 
     # Enrich with linked product info
-    enriched = []
-    for t in matched:
-        data = {c.name: getattr(t, c.name) for c in t.__table__.columns}
-        data["linked_product"] = None
-        if t.link_product and t.linked_product_id:
-            p_result = await db.execute(
-                select(Product)
-                .where(Product.id == t.linked_product_id, Product.is_active == True)
-                .options(selectinload(Product.images))
-            )
-            product = p_result.scalar_one_or_none()
-            if product:
-                img = product.images[0].image_url if product.images else None
-                data["linked_product"] = {
-                    "id": product.id,
-                    "name": product.name,
-                    "price": float(product.price),
-                    "image_url": img,
-                }
-        enriched.append(data)
-
-    return enriched
+    return await enrich_ticks(db, tenant.id, matched, storefront=True)
 
 
 @router.post("/{slug}/upsells/{upsell_id}/impression")
@@ -540,11 +430,54 @@ async def register_upsell_impression(
     upsell_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
 ):
-    tenant = await _get_tenant_by_slug(slug, db)
-    result = await db.execute(
-        select(Upsell).where(Upsell.id == upsell_id, Upsell.tenant_id == tenant.id)
-    )
-    upsell = result.scalar_one_or_none()
-    if upsell:
-        upsell.impressions = (upsell.impressions or 0) + 1
+    tenant = await get_tenant_by_slug(slug, db)
+    # Buffered; written in batches (an unknown upsell id just updates nothing)
+    counter_buffer.incr("upsell_impressions", tenant.id, upsell_id)
     return {"status": "ok"}
+
+
+# ── Checkout bundle ─────────────────────────────────────────────────
+
+
+@router.get("/{slug}/checkout-bundle/{product_id}")
+async def get_checkout_bundle(
+    slug: str,
+    product_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """Everything the checkout needs for one product, in one response.
+
+    Combines the product, its quantity offer, upsells, upsell-ticks and the
+    checkout config. Cached under its ETag until the next admin write.
+    """
+    tenant = await get_tenant_by_slug(slug, db)
+    not_modified = await store_validators(request, response, tenant, db)
+    if not_modified:
+        return not_modified
+
+    etag = response.headers["etag"]
+    bundle = await get_cached_response(etag)
+    if bundle is None:
+        result = await db.execute(
+            select(Product)
+            .where(Product.id == product_id, Product.tenant_id == tenant.id, Product.is_active == True)
+            .options(selectinload(Product.images), selectinload(Product.variants))
+        )
+        product = result.scalar_one_or_none()
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+
+        offer = (await get_offer_index(tenant.id, db)).offer_for(product.id)
+        checkout_config = await load_checkout_config(tenant, db)
+        bundle = jsonable_encoder({
+            "product": ProductResponse.model_validate(product),
+            "quantity_offer": offer.response if offer else None,
+            "upsells": await load_upsells_for_product(tenant, product.id, db),
+            "upsell_ticks": await load_upsell_ticks_for_product(tenant, product.id, db),
+            "checkout_config": CheckoutConfigResponse.model_validate(checkout_config) if checkout_config else None,
+        })
+        await set_cached_response(etag, bundle)
+
+    return bundle
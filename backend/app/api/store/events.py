@@ -0,0 +1,100 @@
+import uuid
+from typing import Annotated, Literal, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app.api.store.checkout import CartCapture
+from app.config import settings
+from app.services.cart_capture import cart_buffer
+from app.services.counters import counter_buffer
+from app.services.tenant_resolver import get_tenant_by_slug
+from app.services.visit_ingest import visit_buffer
+
+router = APIRouter(prefix="/api/store", tags=["store-events"])
+
+
+class ImpressionEvent(BaseModel):
+    type: Literal["impression"]
+    target: Literal["quantity_offer", "upsell"]
+    id: uuid.UUID
+
+
+class TickShownEvent(BaseModel):
+    type: Literal["tick_shown"]
+    id: uuid.UUID
+
+
+class ViewEvent(BaseModel):
+    type: Literal["view"]
+    path: str | None = Field(None, max_length=500)
+    referrer: str | None = Field(None, max_length=500)
+    utm_source: str | None = Field(None, max_length=255)
+    utm_medium: str | None = Field(None, max_length=255)
+    utm_campaign: str | None = Field(None, max_length=255)
+
+
+class CartStepEvent(CartCapture):
+    type: Literal["cart_step"]
+
+
+StoreEvent = Annotated[
+    Union[ImpressionEvent, TickShownEvent, ViewEvent, CartStepEvent],
+    Field(discriminator="type"),
+]
+
+_events = TypeAdapter(list[StoreEvent])
+
+_IMPRESSION_COUNTERS = {"quantity_offer": "offer_impressions", "upsell": "upsell_impressions"}
+
+
+async def _read_body(request: Request) -> bytes:
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.STORE_EVENTS_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Event batch too large")
+    return bytes(body)
+
+
+@router.post("/{slug}/events", status_code=204)
+async def record_events(slug: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """Record a batch of storefront events in one request.
+
+    The body is a JSON array of typed events (``impression``, ``tick_shown``,
+    ``view``, ``cart_step``). It is parsed whatever the Content-Type, so the
+    storefront can send it with ``navigator.sendBeacon`` (text/plain, no
+    CORS preflight). Counters, views and cart steps all go to in-memory
+    buffers that are written in batches.
+    """
+    try:
+        events = _events.validate_json(await _read_body(request))
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    if len(events) > settings.STORE_EVENTS_MAX_BATCH:
+        raise HTTPException(status_code=413, detail="Too many events in one batch")
+
+    tenant = await get_tenant_by_slug(slug, db)
+    for event in events:
+        if isinstance(event, ImpressionEvent):
+            counter_buffer.incr(_IMPRESSION_COUNTERS[event.target], tenant.id, event.id)
+        elif isinstance(event, TickShownEvent):
+            counter_buffer.incr("tick_impressions", tenant.id, event.id)
+        elif isinstance(event, ViewEvent):
+            visit_buffer.record(
+                tenant.id,
+                ip_address=request.client.host if request.client else None,
+                user_agent=(request.headers.get("user-agent") or "")[:500] or None,
+                referrer=event.referrer,
+                page_path=event.path,
+                utm_source=event.utm_source,
+                utm_medium=event.utm_medium,
+                utm_campaign=event.utm_campaign,
+            )
+        else:
+            step = event.model_dump(exclude={"type", "session_id"}, exclude_none=True)
+            cart_buffer.stage(tenant.id, event.session_id, step)
+    return Response(status_code=204)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,7 +7,9 @@ from sqlalchemy.orm import selectinload
 from app.api.deps import get_db
 from app.models.page_design import PageDesign
 from app.models.product import Product
-from app.models.tenant import Tenant
+from app.services.response_cache import load_response
+from app.services.tenant_resolver import StoreTenant, resolve_tenant
+from app.utils.http_cache import store_validators
 
 router = APIRouter(prefix="/api/store/{slug}/pages", tags=["store-pages"])
 
@@ -29,13 +31,11 @@ def _to_public(design: PageDesign) -> dict:
     }
 
 
-@router.get("/home", response_model=PublicPageResponse | None)
-async def get_home_page(slug: str, db: AsyncSession = Depends(get_db)):
+async def load_home_page(tenant: StoreTenant, db: AsyncSession) -> dict | None:
     result = await db.execute(
         select(PageDesign)
         .options(selectinload(PageDesign.product))
-        .join(Tenant, Tenant.id == PageDesign.tenant_id)
-        .where(Tenant.slug == slug, PageDesign.page_type == "home", PageDesign.is_published == True)
+        .where(PageDesign.tenant_id == tenant.id, PageDesign.page_type == "home", PageDesign.is_published == True)
     )
     design = result.scalar_one_or_none()
     if not design:
@@ -43,13 +43,29 @@ async def get_home_page(slug: str, db: AsyncSession = Depends(get_db)):
     return _to_public(design)
 
 
+@router.get("/home", response_model=PublicPageResponse | None)
+async def get_home_page(slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    tenant = await resolve_tenant(slug, db)
+    if not tenant:
+        return None
+    not_modified = await store_validators(request, response, tenant, db)
+    if not_modified:
+        return not_modified
+    return await load_response(tenant, "home_page", response.headers["etag"], db, load_home_page)
+
+
 @router.get("/by-slug/{page_slug}", response_model=PublicPageResponse | None)
-async def get_page_by_slug(slug: str, page_slug: str, db: AsyncSession = Depends(get_db)):
+async def get_page_by_slug(slug: str, page_slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    tenant = await resolve_tenant(slug, db)
+    if not tenant:
+        return None
+    not_modified = await store_validators(request, response, tenant, db)
+    if not_modified:
+        return not_modified
     result = await db.execute(
         select(PageDesign)
         .options(selectinload(PageDesign.product))
-        .join(Tenant, Tenant.id == PageDesign.tenant_id)
-        .where(Tenant.slug == slug, PageDesign.slug == page_slug, PageDesign.is_published == True)
+        .where(PageDesign.tenant_id == tenant.id, PageDesign.slug == page_slug, PageDesign.is_published == True)
     )
     design = result.scalar_one_or_none()
     if not design:
@@ -58,14 +74,19 @@ async def get_page_by_slug(slug: str, page_slug: str, db: AsyncSession = Depends
 
 
 @router.get("/by-product/{product_slug}", response_model=PublicPageResponse | None)
-async def get_page_by_product(slug: str, product_slug: str, db: AsyncSession = Depends(get_db)):
+async def get_page_by_product(slug: str, product_slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    tenant = await resolve_tenant(slug, db)
+    if not tenant:
+        return None
+    not_modified = await store_validators(request, response, tenant, db)
+    if not_modified:
+        return not_modified
     result = await db.execute(
         select(PageDesign)
         .options(selectinload(PageDesign.product))
-        .join(Tenant, Tenant.id == PageDesign.tenant_id)
         .join(Product, Product.id == PageDesign.product_id)
         .where(
-            Tenant.slug == slug,
+            PageDesign.tenant_id == tenant.id,
             Product.slug == product_slug,
             PageDesign.page_type == "product",
             PageDesign.is_published == True,
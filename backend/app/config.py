@@ -13,6 +13,14 @@ class Settings(BaseSettings):
     R2_SECRET_ACCESS_KEY: str | None = None
     R2_BUCKET_NAME: str | None = None
     R2_PUBLIC_URL: str | None = None  # e.g. https://pub-xxx.r2.dev
+    # Storage I/O threads (also the R2 connection pool size) and multipart uploads
+    STORAGE_IO_WORKERS: int = 8
+    STORAGE_MULTIPART_CHUNK_SIZE: int = 8 * 1024 * 1024  # bytes; larger uploads go multipart (min 5 MB)
+    STORAGE_MULTIPART_CONCURRENCY: int = 4  # parts in flight per upload
+    # Product image derivatives (resized + WebP), rendered in a process pool
+    IMAGE_DERIVATIVE_WIDTHS: list[int] = [160, 480, 960, 1600]
+    IMAGE_QUALITY: int = 80
+    IMAGE_WORKERS: int = 2
     # Estrategas IA (Supabase) — for shared API keys
     SUPABASE_URL: str | None = None
     SUPABASE_SERVICE_ROLE_KEY: str | None = None
@@ -24,6 +32,60 @@ class Settings(BaseSettings):
         "http://localhost:3001",
     ]
     CORS_ALLOW_REGEX: str | None = None  # e.g. r"https://.*\.minishop\.co"
+    # Shared cache backend for storefront caches; in-process when unset
+    REDIS_URL: str | None = None  # e.g. redis://redis:6379/0
+    REDIS_TIMEOUT: float = 0.5  # seconds; a slower Redis counts as a cache miss
+    CACHE_LOCAL_TTL: float = 5.0  # seconds a worker keeps a Redis entry in memory
+    # Postgres NOTIFY channel carrying cross-worker cache invalidations
+    CACHE_INVALIDATION_CHANNEL: str = "minishop_cache"
+    # Direct (non-pooled) connection for the LISTEN side; falls back to DATABASE_URL
+    CACHE_LISTEN_DATABASE_URL: str | None = None
+    # Password hashing: bcrypt cost (older hashes are upgraded on login) and
+    # the thread pool that keeps it off the event loop
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE: int = 64  # waiting hashes before logins get a 503
+    # Admin auth: cached tenant fields (slug, plan, email, is_active) per token
+    TENANT_STATUS_TTL: int = 60  # seconds; ORM writes invalidate immediately, out-of-band SQL waits this long
+    TENANT_STATUS_MAXSIZE: int = 10_000
+    # Storefront hosts: <slug>.<STORE_BASE_DOMAIN> or a verified custom domain
+    STORE_BASE_DOMAIN: str = "minishop.co"
+    HOST_MAP_TTL: int = 300  # seconds; refreshed in the background
+    # Storefront tenant resolution cache (slug → tenant)
+    TENANT_CACHE_TTL: int = 60  # seconds
+    TENANT_CACHE_NEGATIVE_TTL: int = 10  # seconds, for unknown slugs
+    TENANT_CACHE_MAXSIZE: int = 10_000
+    # Compiled per-tenant quantity-offer index (dropped on admin writes)
+    OFFER_INDEX_TTL: int = 300  # seconds
+    OFFER_INDEX_MAXSIZE: int = 10_000
+    # Per-tenant upsell / upsell-tick trigger index (dropped on admin writes)
+    UPSELL_INDEX_TTL: int = 300  # seconds
+    UPSELL_INDEX_MAXSIZE: int = 10_000
+    # Assembled store payloads (checkout bundle, store config) keyed by ETag
+    RESPONSE_CACHE_TTL: int = 120  # seconds
+    RESPONSE_CACHE_MAXSIZE: int = 10_000
+    # Serialized storefront catalog per tenant (keyed by store content version)
+    CATALOG_SNAPSHOT_TTL: int = 600  # seconds
+    CATALOG_SNAPSHOT_MAXSIZE: int = 2_000
+    # Write-behind storefront counters (impressions, offer orders, acceptances)
+    COUNTER_FLUSH_INTERVAL: float = 5.0  # seconds
+    COUNTER_MAX_KEYS: int = 10_000  # buffered rows that trigger an early flush
+    COUNTER_BUFFER_SIZE: int = 100_000  # buffered rows beyond this are dropped (and counted)
+    # Page-view ingestion: per-worker ring buffer, COPYed to store_visits in batches
+    VISIT_BUFFER_SIZE: int = 50_000  # visits beyond this are dropped (and counted)
+    VISIT_FLUSH_BATCH: int = 5_000
+    VISIT_FLUSH_INTERVAL: float = 1.0  # seconds
+    # Abandoned-cart capture: latest state per session, upserted once per window
+    CART_COALESCE_WINDOW: float = 2.0  # seconds
+    CART_MAX_PENDING: int = 5_000  # pending sessions that trigger an early flush
+    # Shared secret for GET /api/metrics (X-Metrics-Token); unset hides the endpoint
+    METRICS_TOKEN: str | None = None
+    # Storefront event beacon (/api/store/{slug}/events)
+    STORE_EVENTS_MAX_BATCH: int = 50  # events per request
+    STORE_EVENTS_MAX_BYTES: int = 64 * 1024
+    # Cache-Control for public store GETs (browsers revalidate, CDNs hold s-maxage)
+    STORE_CDN_MAX_AGE: int = 60  # seconds
+    STORE_STALE_WHILE_REVALIDATE: int = 300  # seconds
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
@@ -1,4 +1,6 @@
 from sqlalchemy import MetaData
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -24,3 +26,14 @@ async def get_db():
         except Exception:
             await session.rollback()
             raise
+
+
+def upsert(session: AsyncSession, model):
+    """Return an INSERT for *model* that supports ``on_conflict_do_update``.
+
+    Production runs on Postgres; the test suite runs on SQLite. Both dialects
+    expose the same ON CONFLICT API, so callers stay dialect-agnostic.
+    """
+    if session.bind is not None and session.bind.dialect.name == "sqlite":
+        return sqlite_insert(model)
+    return pg_insert(model)
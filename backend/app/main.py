@@ -1,7 +1,8 @@
+import hmac
 import os
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
@@ -15,8 +16,10 @@ from app.api.admin.orders import router as orders_router
 from app.api.admin.pages import router as pages_router
 from app.api.admin.products import router as products_router
 from app.api.auth import router as auth_router
+from app.api.store.bootstrap import router as store_bootstrap_router
 from app.api.store.catalog import router as store_catalog_router
 from app.api.store.checkout import router as store_checkout_router
+from app.api.store.events import router as store_events_router
 from app.api.admin.media import router as media_router
 from app.api.admin.page_designs import router as page_designs_router
 from app.api.admin.checkout_config import router as checkout_config_router
@@ -26,6 +29,15 @@ from app.api.admin.upsell_ticks import router as upsell_ticks_router
 from app.api.store.pages import router as store_pages_router
 from app.config import settings
 from app.database import Base, engine
+from app.middleware.tenant import TenantMiddleware
+from app.services.cart_capture import cart_buffer
+from app.services.counters import counter_buffer
+from app.services.image_derivatives import shutdown_image_pool
+from app.services.invalidation_bus import start_listener, stop_listener
+from app.services.single_flight import single_flight
+from app.services.storage import is_r2_configured, shutdown_storage
+from app.services.visit_ingest import visit_buffer
+from app.utils.security import hash_pool
 # Import all models so they register with Base.metadata
 import app.models  # noqa: F401
 
@@ -170,11 +182,86 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"[migrate] gemini_api_key: {e}")
 
+    try:
+        async with engine.begin() as conn:
+            # unique (tenant_id, order_number) + backfill per-tenant order_sequences
+            result = await conn.execute(text(
+                "SELECT 1 FROM pg_constraint WHERE conname = 'uq_order_tenant_number'"
+            ))
+            if not result.fetchone():
+                # suffix numbers handed out twice by the old count()+1 scheme (ORD-0042 -> ORD-0042-2)
+                await conn.execute(text(
+                    "UPDATE minishop.orders o SET order_number = o.order_number || '-' || d.rn "
+                    "FROM (SELECT id, ROW_NUMBER() OVER ("
+                    "PARTITION BY tenant_id, order_number ORDER BY created_at, id) AS rn "
+                    "FROM minishop.orders) d "
+                    "WHERE o.id = d.id AND d.rn > 1"
+                ))
+                await conn.execute(text(
+                    "ALTER TABLE minishop.orders "
+                    "ADD CONSTRAINT uq_order_tenant_number UNIQUE (tenant_id, order_number)"
+                ))
+                await conn.execute(text(
+                    "INSERT INTO minishop.order_sequences AS s (tenant_id, last_value) "
+                    "SELECT tenant_id, GREATEST(COUNT(*), "
+                    "COALESCE(MAX(substring(order_number FROM '^ORD-([0-9]+)$')::int), 0)) "
+                    "FROM minishop.orders GROUP BY tenant_id "
+                    "ON CONFLICT (tenant_id) DO UPDATE SET last_value = GREATEST(s.last_value, EXCLUDED.last_value)"
+                ))
+    except Exception as e:
+        print(f"[migrate] order_sequences: {e}")
+
+    try:
+        async with engine.begin() as conn:
+            # resized / WebP derivatives of product images
+            await conn.execute(text(
+                "ALTER TABLE minishop.product_images ADD COLUMN IF NOT EXISTS variants JSON"
+            ))
+    except Exception as e:
+        print(f"[migrate] product_images variants: {e}")
+
+    try:
+        async with engine.begin() as conn:
+            # unique (tenant_id, session_id) for the abandoned-cart upsert
+            result = await conn.execute(text(
+                "SELECT 1 FROM pg_constraint WHERE conname = 'uq_abandoned_cart_tenant_session'"
+            ))
+            if not result.fetchone():
+                # keep the newest of carts captured twice by the old select-then-insert
+                await conn.execute(text(
+                    "DELETE FROM minishop.abandoned_carts a "
+                    "USING (SELECT id, ROW_NUMBER() OVER ("
+                    "PARTITION BY tenant_id, session_id ORDER BY created_at DESC, id) AS rn "
+                    "FROM minishop.abandoned_carts WHERE session_id IS NOT NULL) d "
+                    "WHERE a.id = d.id AND d.rn > 1"
+                ))
+                await conn.execute(text(
+                    "ALTER TABLE minishop.abandoned_carts "
+                    "ADD CONSTRAINT uq_abandoned_cart_tenant_session UNIQUE (tenant_id, session_id)"
+                ))
+    except Exception as e:
+        print(f"[migrate] abandoned_carts session: {e}")
+
+    # Cross-worker cache invalidation (LISTEN/NOTIFY)
+    await start_listener(engine)
+    counter_buffer.start()
+    visit_buffer.start()
+    cart_buffer.start()
+
     yield
 
+    await cart_buffer.stop()
+    await visit_buffer.stop()
+    await counter_buffer.stop()
+    await stop_listener()
+    hash_pool.shutdown()
+    shutdown_storage()
+    shutdown_image_pool()
+
 
 app = FastAPI(title="MiniShop API", version="0.1.0", lifespan=lifespan)
 
+app.add_middleware(TenantMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -194,18 +281,18 @@ app.include_router(apps_router)
 app.include_router(analytics_router)
 app.include_router(carts_router)
 app.include_router(store_catalog_router)
+app.include_router(store_bootstrap_router)
 app.include_router(store_checkout_router)
 app.include_router(media_router)
 app.include_router(page_designs_router)
 app.include_router(store_pages_router)
+app.include_router(store_events_router)
 app.include_router(checkout_config_router)
 app.include_router(upsells_router)
 app.include_router(ai_router)
 app.include_router(upsell_ticks_router)
 
 # Mount uploads directory for local dev (when R2 is not configured, images are served from disk)
-from app.services.storage import is_r2_configured  # noqa: E402
-
 if not is_r2_configured():
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
@@ -215,3 +302,20 @@ if not is_r2_configured():
 @app.get("/api/health")
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/api/metrics")
+async def metrics(x_metrics_token: str | None = Header(None)):
+    """Internal cache / buffer stats; requires ``X-Metrics-Token: <METRICS_TOKEN>``.
+
+    Without a configured token the endpoint does not exist.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_metrics_token or not hmac.compare_digest(x_metrics_token, settings.METRICS_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid metrics token")
+    return {
+        "single_flight": single_flight.stats(),
+        "counters": counter_buffer.stats(),
+        "visits": visit_buffer.stats(),
+    }
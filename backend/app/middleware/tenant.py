@@ -1,52 +1,24 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from sqlalchemy import select
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.database import async_session
-from app.models.tenant import Tenant, TenantDomain
+from app.services.host_resolver import HostMap, host_map as default_host_map
 
 
-class TenantMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        tenant_id = None
+class TenantMiddleware:
+    """Sets ``request.state.tenant_id`` from X-Store-Slug or the Host header.
 
-        # Dev: resolve from header
-        store_slug = request.headers.get("X-Store-Slug")
-        if store_slug:
-            async with async_session() as session:
-                result = await session.execute(
-                    select(Tenant.id).where(Tenant.slug == store_slug, Tenant.is_active == True)
-                )
-                row = result.scalar_one_or_none()
-                if row:
-                    tenant_id = row
+    Pure ASGI (no BaseHTTPMiddleware task/stream overhead). Resolution is a
+    lookup in the in-memory host map; no query per request. ``tenant_id`` is
+    None when the host is not a storefront.
+    """
 
-        # Production: resolve from Host header
-        if not tenant_id:
-            host = request.headers.get("host", "")
-            hostname = host.split(":")[0]
+    def __init__(self, app: ASGIApp, host_map: HostMap = default_host_map):
+        self.app = app
+        self.host_map = host_map
 
-            if hostname.endswith(".minishop.co"):
-                slug = hostname.replace(".minishop.co", "")
-                async with async_session() as session:
-                    result = await session.execute(
-                        select(Tenant.id).where(Tenant.slug == slug, Tenant.is_active == True)
-                    )
-                    row = result.scalar_one_or_none()
-                    if row:
-                        tenant_id = row
-            else:
-                async with async_session() as session:
-                    result = await session.execute(
-                        select(TenantDomain.tenant_id).where(
-                            TenantDomain.domain == hostname,
-                            TenantDomain.is_verified == True,
-                        )
-                    )
-                    row = result.scalar_one_or_none()
-                    if row:
-                        tenant_id = row
-
-        request.state.tenant_id = tenant_id
-        response = await call_next(request)
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            tenant_id = await self.host_map.resolve(headers.get("x-store-slug"), headers.get("host", ""))
+            scope.setdefault("state", {})["tenant_id"] = tenant_id
+        await self.app(scope, receive, send)
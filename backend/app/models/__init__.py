@@ -1,7 +1,7 @@
 from app.models.tenant import Tenant, TenantDomain
-from app.models.store_config import StoreConfig
+from app.models.store_config import StoreConfig, StoreContentVersion
 from app.models.product import Product, ProductImage, ProductVariant
-from app.models.order import Order, OrderItem
+from app.models.order import Order, OrderItem, OrderSequence
 from app.models.store_page import StorePage
 from app.models.abandoned_cart import AbandonedCart
 from app.models.checkout_offer import QuantityOffer, QuantityOfferTier
@@ -13,16 +13,19 @@ from app.models.page_design import PageDesign  # noqa: F401
 from app.models.checkout_config import CheckoutConfig
 from app.models.upsell import UpsellConfig, Upsell
 from app.models.upsell_tick import UpsellTick
+from app.models.media_object import MediaObject
 
 __all__ = [
     "Tenant",
     "TenantDomain",
     "StoreConfig",
+    "StoreContentVersion",
     "Product",
     "ProductImage",
     "ProductVariant",
     "Order",
     "OrderItem",
+    "OrderSequence",
     "StorePage",
     "AbandonedCart",
     "QuantityOffer",
@@ -36,4 +39,5 @@ __all__ = [
     "UpsellConfig",
     "Upsell",
     "UpsellTick",
+    "MediaObject",
 ]
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -10,6 +10,7 @@ from app.database import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (UniqueConstraint("tenant_id", "order_number", name="uq_order_tenant_number"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
@@ -62,3 +63,12 @@ class OrderItem(Base):
     dropi_variation_id: Mapped[str | None] = mapped_column(String(100))
 
     order = relationship("Order", back_populates="items")
+
+
+class OrderSequence(Base):
+    """Per-tenant order number counter (see app.services.order_numbers)."""
+
+    __tablename__ = "order_sequences"
+
+    tenant_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("tenants.id"), primary_key=True)
+    last_value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
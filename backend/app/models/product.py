@@ -46,6 +46,8 @@ class ProductImage(Base):
     alt_text: Mapped[str | None] = mapped_column(String(255))
     sort_order: Mapped[int] = mapped_column(Integer, default=0)
     is_primary: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Resized / WebP copies: [{"width": 480, "format": "webp", "url": ...}, ...]
+    variants: Mapped[list | None] = mapped_column(JSON)
 
     product = relationship("Product", back_populates="images")
 
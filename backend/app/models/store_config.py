@@ -39,3 +39,16 @@ class StoreConfig(Base):
     gemini_api_key: Mapped[str | None] = mapped_column(String(255))
 
     tenant = relationship("Tenant", back_populates="store_config")
+
+
+class StoreContentVersion(Base):
+    """Per-tenant counter bumped by every admin write to storefront content.
+
+    Public store responses derive their ETag from it (see
+    app.services.store_version).
+    """
+
+    __tablename__ = "store_content_versions"
+
+    tenant_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("tenants.id"), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
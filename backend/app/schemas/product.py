@@ -1,7 +1,18 @@
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
+
+
+class ImageVariant(BaseModel):
+    width: int
+    format: str
+    url: str
+
+
+def _srcset(variants: list[ImageVariant], fmt: str) -> str | None:
+    entries = [f"{v.url} {v.width}w" for v in variants if v.format == fmt]
+    return ", ".join(entries) or None
 
 
 class ProductImageResponse(BaseModel):
@@ -10,9 +21,20 @@ class ProductImageResponse(BaseModel):
     alt_text: str | None = None
     sort_order: int = 0
     is_primary: bool = False
+    variants: list[ImageVariant] | None = None
+    # <img srcset> in the original's format, and the WebP one for <source type="image/webp">
+    srcset: str | None = None
+    srcset_webp: str | None = None
 
     model_config = {"from_attributes": True}
 
+    @model_validator(mode="after")
+    def _build_srcsets(self):
+        if self.variants and self.srcset is None:
+            self.srcset = _srcset(self.variants, "jpeg") or _srcset(self.variants, "png")
+            self.srcset_webp = _srcset(self.variants, "webp")
+        return self
+
 
 class ProductVariantCreate(BaseModel):
     name: str
@@ -154,7 +154,13 @@ class QuantityOfferCreate(BaseModel):
     tiers: list[QuantityOfferTierCreate] = []
 
 
-class QuantityOfferResponse(BaseModel):
+class StoreQuantityOfferResponse(BaseModel):
+    """Quantity offer as served to the public store.
+
+    Leaves out the impression / order counters: they change through the
+    write-behind buffer without a content-version bump, so they would be
+    stale in ETag-cached responses (and the storefront has no use for them).
+    """
     id: uuid.UUID
     tenant_id: uuid.UUID
     name: str
@@ -170,8 +176,6 @@ class QuantityOfferResponse(BaseModel):
     hide_product_image: bool
     show_savings: bool
     show_per_unit: bool
-    impressions: int
-    orders_count: int
     tiers: list[QuantityOfferTierResponse] = []
     created_at: datetime | None = None
     updated_at: datetime | None = None
@@ -179,6 +183,11 @@ class QuantityOfferResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class QuantityOfferResponse(StoreQuantityOfferResponse):
+    impressions: int
+    orders_count: int
+
+
 class StoreAppResponse(BaseModel):
     id: uuid.UUID
     app_slug: str
@@ -0,0 +1,206 @@
+"""Caches shared by the storefront read paths.
+
+``TTLCache`` is a plain in-process LRU. ``SharedCache`` is a named cache on
+top of the configured backend: a per-process ``TTLCache`` by default, or
+Redis when ``REDIS_URL`` is set, so that with several uvicorn workers one
+DB miss warms all of them and an invalidation reaches all of them.
+Invalidation itself is driven by app.services.invalidation_bus.
+
+With Redis, each worker still keeps what it read or wrote in its own
+``TTLCache`` for ``CACHE_LOCAL_TTL`` seconds, so a hot key is not fetched
+and decoded on every request (invalidations drop both tiers). Values
+cross the network as JSON through each cache's ``Codec``, never pickle,
+and a Redis error or timeout is treated as a miss: the caller loads from
+the DB instead of failing the request.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+
+_MISSING = object()
+
+
+@dataclass(frozen=True, slots=True)
+class Codec:
+    """How a ``SharedCache`` stores its values in Redis."""
+
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+# JSON-native values (str, int, dicts / lists of them)
+JSON = Codec(dumps=_json_dumps, loads=json.loads)
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a TTL.
+
+    Each entry may override the default TTL (used for negative caching).
+    Not thread-safe; meant to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Encoded values under ``<prefix>:<namespace>:<key>`` in one Redis database."""
+
+    def __init__(self, client: redis.Redis, prefix: str = "minishop"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, raw: bytes, ttl: float) -> None:
+        await self.client.set(key, raw, px=int(ttl * 1000))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        async for key in self.client.scan_iter(match=f"{prefix}*", count=500):
+            await self.client.delete(key)
+
+
+_backend: RedisBackend | None = None
+
+
+def get_cache_backend() -> RedisBackend | None:
+    """The shared backend, or None when caches stay in-process."""
+    global _backend
+    if _backend is None and settings.REDIS_URL:
+        _backend = RedisBackend(redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_TIMEOUT,
+        ))
+    return _backend
+
+
+def set_cache_backend(backend: RedisBackend | None) -> None:
+    global _backend
+    _backend = backend
+
+
+class SharedCache:
+    """A named TTL cache stored in the configured backend.
+
+    Keys are stringified into ``<prefix>:<namespace>:<key>`` on Redis, so
+    they must have a stable ``str()`` (UUIDs, slugs, ETags). *codec* turns
+    values into bytes for Redis; the default handles JSON-native values.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: float = 60.0, codec: Codec = JSON):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.codec = codec
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _key(self, backend: RedisBackend, key: Hashable) -> str:
+        return f"{backend.prefix}:{self.namespace}:{key}"
+
+    def _local_ttl(self, backend: RedisBackend | None, ttl: float | None) -> float:
+        ttl = self.ttl if ttl is None else ttl
+        return ttl if backend is None else min(ttl, settings.CACHE_LOCAL_TTL)
+
+    def _backend_failed(self, op: str, error: Exception) -> None:
+        print(f"[cache] {self.namespace} {op} failed, using the DB: {error!r}")
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        backend = get_cache_backend()
+        if backend is None:
+            return default
+        try:
+            raw = await backend.get(self._key(backend, key))
+            if raw is None:
+                return default
+            value = self.codec.loads(raw)
+        except (RedisError, ValueError, KeyError, TypeError) as e:
+            # Outage, timeout, or an entry this codec cannot read: a miss
+            self._backend_failed("get", e)
+            return default
+        self._local.set(key, value, self._local_ttl(backend, None))
+        return value
+
+    async def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        backend = get_cache_backend()
+        self._local.set(key, value, self._local_ttl(backend, ttl))
+        if backend is None:
+            return
+        try:
+            await backend.set(self._key(backend, key), self.codec.dumps(value), self.ttl if ttl is None else ttl)
+        except RedisError as e:
+            self._backend_failed("set", e)
+
+    async def delete(self, key: Hashable) -> None:
+        self._local.delete(key)
+        backend = get_cache_backend()
+        if backend is None:
+            return
+        try:
+            await backend.delete(self._key(backend, key))
+        except RedisError as e:
+            self._backend_failed("delete", e)
+
+    def clear_local(self) -> None:
+        """Forget this process's entries (the shared backend is left alone)."""
+        self._local.clear()
+
+    async def clear(self) -> None:
+        self._local.clear()
+        backend = get_cache_backend()
+        if backend is None:
+            return
+        try:
+            await backend.delete_prefix(f"{backend.prefix}:{self.namespace}:")
+        except RedisError as e:
+            self._backend_failed("clear", e)
@@ -0,0 +1,102 @@
+"""Coalesced abandoned-cart capture.
+
+Checkout.jsx reports the cart on every step of the form (name, phone,
+email, ...), so one form fill used to be a SELECT by session plus an
+UPDATE or INSERT per field. Now ``stage`` merges each step into the latest
+known state of its (tenant, session) in memory and returns; every
+``CART_COALESCE_WINDOW`` seconds the pending carts are written as one
+upsert against the unique (tenant_id, session_id) constraint:
+
+    INSERT INTO abandoned_carts (...) VALUES (...)       -- executemany
+    ON CONFLICT (tenant_id, session_id)
+    DO UPDATE SET customer_name = coalesce(excluded.customer_name, customer_name), ...
+
+so a form filled in within the window costs one write, and fields a step
+did not send keep their stored value. A failed write is merged back under
+anything staged since; rows the database rejects (e.g. a product deleted
+meanwhile) are retried one by one so they do not hold up the rest. The
+flush loop is app.services.write_behind's.
+"""
+
+import uuid
+
+from sqlalchemy import func
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session, upsert
+from app.models.abandoned_cart import AbandonedCart
+from app.services.write_behind import WriteBehindBuffer
+
+FIELDS = (
+    "customer_name",
+    "customer_phone",
+    "customer_email",
+    "product_id",
+    "product_name",
+    "variant_name",
+    "quantity",
+    "total_value",
+    "last_step",
+)
+
+
+class CartCoalescer(WriteBehindBuffer):
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], window: float, max_pending: int):
+        super().__init__(window)
+        self.session_factory = session_factory
+        self.max_pending = max_pending
+        self._pending: dict[tuple[uuid.UUID, str], dict] = {}
+
+    def stage(self, tenant_id: uuid.UUID, session_id: str, fields: dict) -> None:
+        """Merge one checkout step into the pending cart; later values win."""
+        unknown = fields.keys() - set(FIELDS)
+        if unknown:
+            raise KeyError(", ".join(sorted(unknown)))
+        self._pending.setdefault((tenant_id, session_id), {}).update(fields)
+        if len(self._pending) >= self.max_pending:
+            self.wake()
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        rows = [
+            {"tenant_id": tenant_id, "session_id": session_id, **dict.fromkeys(FIELDS), **fields}
+            for (tenant_id, session_id), fields in pending.items()
+        ]
+        try:
+            await self._write(rows)
+        except (IntegrityError, DataError) as e:
+            print(f"[carts] batch of {len(rows)} rejected, writing one by one: {e}")
+            for row in rows:
+                try:
+                    await self._write([row])
+                except (IntegrityError, DataError) as e:
+                    print(f"[carts] dropped cart {row['session_id']}: {e}")
+        except Exception as e:
+            print(f"[carts] flush failed, retrying next window: {e}")
+            self._requeue(pending)
+
+    def _requeue(self, pending: dict[tuple[uuid.UUID, str], dict]) -> None:
+        for key, fields in pending.items():
+            self._pending[key] = {**fields, **self._pending.get(key, {})}
+
+    async def _write(self, rows: list[dict]) -> None:
+        async with self.session_factory() as session:
+            stmt = upsert(session, AbandonedCart)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[AbandonedCart.tenant_id, AbandonedCart.session_id],
+                set_={
+                    field: func.coalesce(stmt.excluded[field], AbandonedCart.__table__.c[field])
+                    for field in FIELDS
+                },
+            )
+            await session.execute(stmt, rows)
+            await session.commit()
+
+
+cart_buffer = CartCoalescer(
+    async_session, window=settings.CART_COALESCE_WINDOW, max_pending=settings.CART_MAX_PENDING
+)
@@ -0,0 +1,111 @@
+"""Pre-serialized storefront catalog, per tenant.
+
+``/products`` and ``/products/{slug}`` used to hydrate every product with
+images and variants through the ORM and validate it against
+``ProductResponse`` on each call. The snapshot holds the JSON bytes of the
+active product list and of each product by slug, so both endpoints write
+cached bytes straight to the response.
+
+A snapshot is tagged with the tenant's content version (app.services.
+store_version). Product writes bump the version, and the next read after a
+write rebuilds the snapshot once. The "store" invalidation that goes with
+a bump drops the outdated snapshot in every worker right away.
+"""
+
+import json
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.schemas.product import ProductResponse
+from app.services.cache import Codec, SharedCache
+from app.services.invalidation_bus import subscribe
+from app.services.single_flight import single_flight
+from app.services.tenant_resolver import StoreTenant
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    version: int
+    products: bytes
+    by_slug: dict[str, bytes]
+
+
+def _dump_snapshot(snapshot: CatalogSnapshot) -> bytes:
+    # A one-line JSON header with the part lengths, then the JSON bodies as-is
+    header = json.dumps({
+        "version": snapshot.version,
+        "products": len(snapshot.products),
+        "by_slug": [[slug, len(body)] for slug, body in snapshot.by_slug.items()],
+    })
+    return b"\n".join([header.encode(), snapshot.products, *snapshot.by_slug.values()])
+
+
+def _load_snapshot(raw: bytes) -> CatalogSnapshot:
+    header, _, body = raw.partition(b"\n")
+    meta = json.loads(header)
+    offset = meta["products"]
+    products = body[:offset]
+    by_slug = {}
+    for slug, size in meta["by_slug"]:
+        start = offset + 1
+        offset = start + size
+        by_slug[slug] = body[start:offset]
+    return CatalogSnapshot(version=meta["version"], products=products, by_slug=by_slug)
+
+
+_snapshot_cache = SharedCache(
+    "catalog",
+    maxsize=settings.CATALOG_SNAPSHOT_MAXSIZE,
+    ttl=settings.CATALOG_SNAPSHOT_TTL,
+    codec=Codec(dumps=_dump_snapshot, loads=_load_snapshot),
+)
+
+
+async def _build_snapshot(tenant: StoreTenant, version: int, db: AsyncSession) -> CatalogSnapshot:
+    # Imported here: the catalog router imports this module
+    from app.api.store.catalog import load_store_products
+
+    products = [ProductResponse.model_validate(p) for p in await load_store_products(tenant, db)]
+    items = [p.model_dump_json().encode() for p in products]
+    by_slug: dict[str, bytes] = {}
+    for product, item in zip(products, items):
+        by_slug.setdefault(product.slug, item)
+    return CatalogSnapshot(
+        version=version,
+        products=b"[" + b",".join(items) + b"]",
+        by_slug=by_slug,
+    )
+
+
+async def get_catalog_snapshot(
+    tenant: StoreTenant, version: int, db: AsyncSession, *, request_session: bool = False
+) -> CatalogSnapshot:
+    """The tenant's snapshot at *version*, rebuilt on a miss.
+
+    With ``request_session=True`` the flight leader rebuilds on *db* itself
+    rather than on a session of its own.
+    """
+    snapshot = await _snapshot_cache.get(tenant.id)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    async def _load(session: AsyncSession) -> CatalogSnapshot:
+        snapshot = await _build_snapshot(tenant, version, session)
+        await _snapshot_cache.set(tenant.id, snapshot)
+        return snapshot
+
+    # Concurrent misses share one rebuild
+    key = (tenant.id, "catalog", version)
+    if request_session:
+        return await single_flight.run_on_session(key, db, _load)
+    return await single_flight.run_with_session(key, db.bind, _load)
+
+
+async def _drop_snapshot(tenant_id: uuid.UUID, _id: str | None) -> None:
+    await _snapshot_cache.delete(tenant_id)
+
+
+subscribe("store", _drop_snapshot)
@@ -0,0 +1,132 @@
+"""Write-behind buffer for storefront counters.
+
+Impressions and conversions (quantity-offer impressions / orders, upsell
+impressions / acceptances, upsell-tick impressions / acceptances) used to be a
+read-modify-write of one hot row per storefront view. Instead, requests
+``incr`` an in-process counter keyed by (counter, tenant, row) and return;
+every ``COUNTER_FLUSH_INTERVAL`` seconds the buffer is swapped out and
+written as one batched statement per counter:
+
+    UPDATE quantity_offers SET impressions = impressions + :n
+     WHERE id = :id AND tenant_id = :tenant_id        -- executemany
+
+The tenant filter means an id from another store (or a made-up one) just
+updates nothing. Increments made inside a request transaction go through
+``incr_on_commit`` so a rolled-back order does not count. The flush loop
+is app.services.write_behind's; the buffer is flushed on shutdown; a crash loses at most one interval of counts, which
+is acceptable for analytics.
+
+A failed flush keeps its counts for the next interval. The buffer holds at
+most ``COUNTER_BUFFER_SIZE`` keys, so during a DB outage increments for new
+keys are dropped (and counted) instead of growing memory; dropped and
+failed-flush counts are served at ``/api/metrics``.
+"""
+
+import uuid
+from collections import Counter
+
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.models.checkout_offer import QuantityOffer
+from app.models.upsell import Upsell
+from app.models.upsell_tick import UpsellTick
+from app.services import post_commit
+from app.services.write_behind import WriteBehindBuffer
+
+# counter name → (model, column)
+COUNTERS = {
+    "offer_impressions": (QuantityOffer, "impressions"),
+    "offer_orders": (QuantityOffer, "orders_count"),
+    "upsell_impressions": (Upsell, "impressions"),
+    "upsell_accepted": (Upsell, "accepted_count"),
+    "tick_impressions": (UpsellTick, "impressions"),
+    "tick_accepted": (UpsellTick, "accepted_count"),
+}
+
+_HOOK = "counter_buffer"
+
+
+class CounterBuffer(WriteBehindBuffer):
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        interval: float,
+        max_keys: int,
+        capacity: int,
+    ):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.max_keys = max_keys
+        self.capacity = capacity
+        self._pending: Counter[tuple[str, uuid.UUID, uuid.UUID]] = Counter()
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    def incr(self, counter: str, tenant_id: uuid.UUID, entity_id: uuid.UUID, n: int = 1) -> None:
+        if counter not in COUNTERS:
+            raise KeyError(counter)
+        self._add((counter, tenant_id, entity_id), n)
+        if len(self._pending) >= self.max_keys:
+            self.wake()
+
+    def _add(self, key: tuple[str, uuid.UUID, uuid.UUID], n: int) -> None:
+        if key not in self._pending and len(self._pending) >= self.capacity:
+            self.dropped += n
+            return
+        self._pending[key] += n
+
+    def incr_on_commit(self, db: AsyncSession, counter: str, tenant_id: uuid.UUID, entity_id: uuid.UUID) -> None:
+        """``incr`` once *db*'s transaction commits (dropped on rollback)."""
+        if counter not in COUNTERS:
+            raise KeyError(counter)
+        post_commit.defer(db, _HOOK, (counter, tenant_id, entity_id))
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, Counter()
+        by_counter: dict[str, list[dict]] = {}
+        for (counter, tenant_id, entity_id), n in pending.items():
+            by_counter.setdefault(counter, []).append({"_id": entity_id, "_tenant_id": tenant_id, "_n": n})
+        try:
+            async with self.session_factory() as session:
+                for counter, params in by_counter.items():
+                    model, column = COUNTERS[counter]
+                    table = model.__table__
+                    stmt = (
+                        update(table)
+                        .where(table.c.id == bindparam("_id"), table.c.tenant_id == bindparam("_tenant_id"))
+                        .values({column: func.coalesce(table.c[column], 0) + bindparam("_n")})
+                    )
+                    await session.execute(stmt, params)
+                await session.commit()
+        except Exception as e:
+            self.failed_flushes += 1
+            print(f"[counters] flush failed, retrying next interval: {e}")
+            self._requeue(pending)
+
+    def _requeue(self, pending: Counter) -> None:
+        for key, n in pending.items():
+            self._add(key, n)
+
+    def stats(self) -> dict:
+        return {"buffered": len(self._pending), "dropped": self.dropped, "failed_flushes": self.failed_flushes}
+
+
+counter_buffer = CounterBuffer(
+    async_session,
+    interval=settings.COUNTER_FLUSH_INTERVAL,
+    max_keys=settings.COUNTER_MAX_KEYS,
+    capacity=settings.COUNTER_BUFFER_SIZE,
+)
+
+
+async def _apply_on_commit(increments: list[tuple[str, uuid.UUID, uuid.UUID]]) -> None:
+    for counter, tenant_id, entity_id in increments:
+        counter_buffer.incr(counter, tenant_id, entity_id)
+
+
+post_commit.register(_HOOK, on_commit=_apply_on_commit)
@@ -0,0 +1,158 @@
+"""In-memory host → tenant map for TenantMiddleware.
+
+The whole map is loaded in two queries and held per worker:
+
+    slugs    slug → tenant_id      (active tenants; <slug>.<STORE_BASE_DOMAIN>
+                                    and the X-Store-Slug header)
+    domains  domain → tenant_id    (verified custom domains of active tenants)
+
+so resolving a request is a dict lookup. The map is refreshed in the
+background once ``HOST_MAP_TTL`` expires. When a Tenant or TenantDomain row
+changes, the invalidation bus tells every worker which tenant it was, and
+each worker re-reads only that tenant's slug and domains (two lookups by
+id) instead of reloading the whole map.
+"""
+
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import object_session
+
+from app.config import settings
+from app.database import async_session
+from app.models.tenant import Tenant, TenantDomain
+from app.services.invalidation_bus import on_reconnect, publish, subscribe
+
+_RETRY_AFTER_ERROR = 5.0  # seconds
+
+
+class HostMap:
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], ttl: float):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self._slugs: dict[str, uuid.UUID] = {}
+        self._domains: dict[str, uuid.UUID] = {}
+        self._loaded = False
+        self._generation = 0
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    async def resolve(self, store_slug: str | None, host: str) -> uuid.UUID | None:
+        """Tenant for the X-Store-Slug header, else for the Host header."""
+        hostname = host.split(":")[0].lower().rstrip(".")
+        base = f".{settings.STORE_BASE_DOMAIN}"
+        if store_slug:
+            await self._ensure_fresh()
+            tenant_id = self._slugs.get(store_slug)
+            if tenant_id:
+                return tenant_id
+            # Unknown header slug: fall back to the Host header
+
+        if hostname.endswith(base):
+            key = ("slug", hostname[: -len(base)])
+        elif "." in hostname and not hostname.replace(".", "").isdigit():
+            key = ("domain", hostname)
+        else:
+            # localhost, IPs, in-cluster service names: never a storefront
+            return None
+
+        await self._ensure_fresh()
+        kind, value = key
+        return (self._slugs if kind == "slug" else self._domains).get(value)
+
+    def invalidate(self) -> None:
+        """Reload before the next lookup."""
+        self._generation += 1
+        self._loaded = False
+
+    async def refresh_tenant(self, tenant_id: uuid.UUID) -> None:
+        """Re-read one tenant's slug and verified domains into the map."""
+        async with self._lock:
+            if not self._loaded:
+                # The next full load reads the change anyway
+                return
+            try:
+                async with self.session_factory() as session:
+                    tenant = (
+                        await session.execute(select(Tenant.slug, Tenant.is_active).where(Tenant.id == tenant_id))
+                    ).one_or_none()
+                    domains = []
+                    if tenant and tenant.is_active:
+                        domains = (
+                            await session.execute(
+                                select(TenantDomain.domain).where(
+                                    TenantDomain.tenant_id == tenant_id, TenantDomain.is_verified == True
+                                )
+                            )
+                        ).scalars().all()
+            except Exception as e:
+                print(f"[host-map] refresh of tenant {tenant_id} failed, reloading: {e}")
+                self.invalidate()
+                return
+
+            for table in (self._slugs, self._domains):
+                for key in [key for key, value in table.items() if value == tenant_id]:
+                    del table[key]
+            if tenant and tenant.is_active:
+                self._slugs[tenant.slug] = tenant_id
+                self._domains.update((domain.lower(), tenant_id) for domain in domains)
+
+    async def _ensure_fresh(self) -> None:
+        if not self._loaded:
+            async with self._lock:
+                if not self._loaded:
+                    await self._load()
+        elif self._expires_at <= time.monotonic() and self._refresh_task is None:
+            # Serve the current map while a single background refresh runs
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            async with self._lock:
+                await self._load()
+        finally:
+            self._refresh_task = None
+
+    async def _load(self) -> None:
+        generation = self._generation
+        try:
+            async with self.session_factory() as session:
+                slugs = await session.execute(select(Tenant.slug, Tenant.id).where(Tenant.is_active == True))
+                domains = await session.execute(
+                    select(TenantDomain.domain, TenantDomain.tenant_id)
+                    .join(Tenant, Tenant.id == TenantDomain.tenant_id)
+                    .where(TenantDomain.is_verified == True, Tenant.is_active == True)
+                )
+                self._slugs = {slug: tenant_id for slug, tenant_id in slugs}
+                self._domains = {domain.lower(): tenant_id for domain, tenant_id in domains}
+        except Exception as e:
+            print(f"[host-map] refresh failed: {e}")
+            self._expires_at = time.monotonic() + _RETRY_AFTER_ERROR
+        else:
+            self._expires_at = time.monotonic() + self.ttl
+        # An invalidation that landed mid-load may not be reflected yet
+        self._loaded = self._generation == generation
+
+
+host_map = HostMap(async_session, ttl=settings.HOST_MAP_TTL)
+
+
+async def _on_host_change(tenant_id: uuid.UUID, _id: str | None) -> None:
+    await host_map.refresh_tenant(tenant_id)
+
+
+subscribe("tenant", _on_host_change)
+subscribe("tenant_domain", _on_host_change)
+# Events may have been missed while LISTEN was down
+on_reconnect(host_map.invalidate)
+
+
+@event.listens_for(TenantDomain, "after_insert")
+@event.listens_for(TenantDomain, "after_update")
+@event.listens_for(TenantDomain, "after_delete")
+def _on_domain_change(mapper, connection, target: TenantDomain) -> None:
+    publish(object_session(target), target.tenant_id, "tenant_domain", target.domain)
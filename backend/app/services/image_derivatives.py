@@ -0,0 +1,100 @@
+"""Resized / WebP derivatives of uploaded product images.
+
+Each product image is stored as uploaded plus, for every width in
+``IMAGE_DERIVATIVE_WIDTHS`` narrower than the original, a WebP copy and a
+copy in the original format (JPEG or PNG) for browsers without WebP. The
+derivatives are recorded on ``ProductImage.variants`` as
+
+    [{"width": 480, "format": "webp", "url": "..."}, ...]
+
+which ``ProductImageResponse`` turns into ``srcset`` / ``srcset_webp``.
+
+Decoding and resizing is CPU-bound, so it runs in a process pool
+(``IMAGE_WORKERS`` processes) instead of on the event loop or behind the
+GIL. The workers are started with ``forkserver`` rather than forked from
+the running server (its event loop, sockets and DB pools), and they read
+the upload from a temporary file, so the image is never held in the
+server's memory. Derivatives are best effort: if they cannot be rendered (Pillow
+missing, an image Pillow cannot decode) the original is still saved and
+served on its own. Animated GIFs are left alone.
+"""
+
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config import settings
+from app.services.storage import upload_file
+
+FORMAT_EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "webp": ".webp"}
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def render_derivatives(source_path: str, widths: tuple[int, ...], quality: int) -> list[tuple[int, str, bytes]]:
+    """``(width, format, encoded bytes)`` for every target width below the source's.
+
+    Runs in a worker process.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as original:
+        fallback = "png" if original.format == "PNG" else "jpeg"
+        image = ImageOps.exif_transpose(original)
+        if fallback == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        rendered = []
+        for width in sorted(w for w in widths if w < image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt in ("webp", fallback):
+                out = io.BytesIO()
+                if fmt == "png":
+                    resized.save(out, "PNG", optimize=True)
+                else:
+                    resized.save(out, fmt.upper(), quality=quality)
+                rendered.append((width, fmt, out.getvalue()))
+        return rendered
+
+
+def shutdown_image_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def create_derivatives(source_path: str, key: str) -> list[dict]:
+    """Render and upload derivatives of the image stored at *key*.
+
+    *source_path* is a local copy of the image for the worker to read.
+
+    ``<tenant>/products/<id>.jpg`` gets ``<tenant>/products/<id>_480w.webp``
+    and so on. Returns the entries for ``ProductImage.variants`` (empty if
+    none could be made).
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS, mp_context=multiprocessing.get_context("forkserver")
+        )
+    try:
+        rendered = await asyncio.get_running_loop().run_in_executor(
+            _pool, render_derivatives, source_path, tuple(settings.IMAGE_DERIVATIVE_WIDTHS), settings.IMAGE_QUALITY
+        )
+    except Exception as e:
+        print(f"[images] derivatives for {key} failed: {e!r}")
+        return []
+
+    stem = key.rsplit(".", 1)[0]
+
+    async def _upload(width: int, fmt: str, content: bytes) -> dict:
+        url = await upload_file(content, f"{stem}_{width}w{FORMAT_EXTENSIONS[fmt]}", f"image/{fmt}")
+        return {"width": width, "format": fmt, "url": url}
+
+    try:
+        return list(await asyncio.gather(*(_upload(*item) for item in rendered)))
+    except Exception as e:
+        print(f"[images] uploading derivatives for {key} failed: {e!r}")
+        return []
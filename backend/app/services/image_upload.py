@@ -1,9 +1,16 @@
 import os
+import shutil
+import tempfile
 import uuid
+from typing import AsyncIterator
 
 from fastapi import HTTPException, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.services.storage import upload_file
+from app.models.media_object import MediaObject
+from app.services.image_derivatives import create_derivatives
+from app.services.media_library import store_media
 
 ALLOWED_CONTENT_TYPES = {
     "image/jpeg",
@@ -24,21 +31,61 @@ CONTENT_TYPE_MAP = {
     ".gif": "image/gif",
 }
 
+UPLOAD_CHUNK_SIZE = 64 * 1024  # bytes read from the request per step
 
-async def validate_and_save_image(
-    file: UploadFile,
-    tenant_id: uuid.UUID,
-    subfolder: str = "products",
-) -> str:
-    """Validate an uploaded image file and save it to storage.
 
-    Validates file type (JPEG, PNG, WebP, GIF only) and file size (max 5MB).
-    Generates a unique filename using UUID and uploads via storage service.
+def sniff_content_type(head: bytes) -> str | None:
+    """Content type from a file's first bytes, or None if unrecognised."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    text = head[:512].lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in text):
+        return "image/svg+xml"
+    return None
 
-    Returns the public URL (R2) or relative path (local dev).
-    Raises ``HTTPException`` on invalid file type or size.
+
+class UploadStream:
+    """An UploadFile read in fixed-size chunks, with the size limit enforced as it goes.
+
+    ``await open()`` reads the first chunk and returns its sniffed content
+    type; iterating then yields the file chunk by chunk (starting with that
+    first one) and raises a 400 *too_large* as soon as *max_size* is passed,
+    which makes the storage backend drop the partial upload.
     """
 
+    def __init__(self, file: UploadFile, max_size: int, too_large: str):
+        self.file = file
+        self.max_size = max_size
+        self.too_large = too_large
+        self.size = 0
+        self._head = b""
+
+    async def open(self) -> str | None:
+        self._head = await self.file.read(UPLOAD_CHUNK_SIZE)
+        return sniff_content_type(self._head)
+
+    def _count(self, chunk: bytes) -> bytes:
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=self.too_large)
+        return chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        if self._head:
+            yield self._count(self._head)
+        while chunk := await self.file.read(UPLOAD_CHUNK_SIZE):
+            yield self._count(chunk)
+
+
+async def _save_image(file: UploadFile, tenant_id: uuid.UUID, db: AsyncSession) -> MediaObject:
+    """Validate *file* and store it in the tenant's media library."""
+
     # Validate content type
     if file.content_type not in ALLOWED_CONTENT_TYPES:
         raise HTTPException(
@@ -54,17 +101,49 @@ async def validate_and_save_image(
             detail=f"Invalid file extension '{ext}'. Allowed: {', '.join(ALLOWED_EXTENSIONS)}.",
         )
 
-    # Read file content and validate size
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
+    # Sniff the real type; the size limit is enforced while streaming to storage
+    stream = UploadStream(
+        file,
+        MAX_FILE_SIZE,
+        too_large=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB.",
+    )
+    content_type = await stream.open()
+    if content_type not in ALLOWED_CONTENT_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB.",
+            detail="File content is not a JPEG, PNG, WebP or GIF image.",
         )
 
-    # Generate unique filename and storage key
-    filename = f"{uuid.uuid4()}{ext}"
-    key = f"{tenant_id}/{subfolder}/{filename}"
-    content_type = CONTENT_TYPE_MAP.get(ext, "image/jpeg")
+    return await store_media(db, tenant_id, stream, content_type)
 
-    return upload_file(content, key, content_type)
+
+async def validate_and_save_image(file: UploadFile, tenant_id: uuid.UUID, db: AsyncSession) -> str:
+    """Validate an uploaded image file and save it to storage.
+
+    Validates file type (JPEG, PNG, WebP, GIF only, checked against the
+    file's first bytes) and file size (max 5MB, enforced while streaming).
+    Stores it under a content-hash key via the media library, so identical
+    images share one object; release it with ``release_media``.
+
+    Returns the public URL (R2) or relative path (local dev).
+    Raises ``HTTPException`` on invalid file type or size.
+    """
+    media = await _save_image(file, tenant_id, db)
+    return media.url
+
+
+async def save_product_image(file: UploadFile, tenant_id: uuid.UUID, db: AsyncSession) -> tuple[str, list[dict]]:
+    """Like ``validate_and_save_image``, plus resized / WebP derivatives.
+
+    Returns the original's URL and the ``ProductImage.variants`` entries.
+    Derivatives are rendered once per media object and reused on re-upload.
+    """
+    media = await _save_image(file, tenant_id, db)
+    if media.variants is None and media.content_type != "image/gif":  # GIFs may be animated
+        # Copy Starlette's spooled upload to a file the image worker can open
+        with tempfile.NamedTemporaryFile(prefix="upload-") as source:
+            await file.seek(0)
+            await run_in_threadpool(shutil.copyfileobj, file.file, source, UPLOAD_CHUNK_SIZE)
+            await run_in_threadpool(source.flush)
+            media.variants = await create_derivatives(source.name, media.key) or None
+    return media.url, media.variants or []
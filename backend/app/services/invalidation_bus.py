@@ -0,0 +1,200 @@
+"""Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+Admin write paths ``publish(db, tenant_id, entity, entity_id)``. The event
+is sent with ``pg_notify`` inside the same transaction, so Postgres only
+delivers it if the write commits. Every worker keeps one LISTEN connection
+and runs the handlers subscribed to that entity, which evict the matching
+entries from its caches:
+
+    admin write ──► NOTIFY minishop_cache {"t": tenant, "e": entity, "i": id}
+                        │
+            ┌───────────┼───────────┐
+         worker 1    worker 2    worker N   → subscribe(entity, handler)
+
+The publishing worker also runs the handlers itself after commit, so it
+never depends on its own notification round trip (and SQLite tests, which
+have no NOTIFY, behave the same). Handlers must be idempotent. Events lost
+while the LISTEN connection is down are covered by running every
+``on_reconnect`` reset once the connection is back (only process-local
+entries need it, including the local tier in front of Redis: Redis itself
+already saw the publisher's delete).
+
+The LISTEN connection must be a direct (session-level) one: behind a
+transaction-mode pooler such as PgBouncer, notifications are never
+delivered to it and other workers silently keep stale entries until their
+TTL. Point ``CACHE_LISTEN_DATABASE_URL`` at Postgres directly when
+``DATABASE_URL`` goes through a pooler.
+"""
+
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import asyncpg
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services import post_commit
+
+Handler = Callable[[uuid.UUID, str | None], Awaitable[None]]
+
+_HOOK = "invalidation_bus"
+
+
+@dataclass(frozen=True, slots=True)
+class InvalidationEvent:
+    tenant_id: uuid.UUID
+    entity: str
+    entity_id: str | None = None
+
+    def to_payload(self) -> str:
+        return json.dumps({"t": str(self.tenant_id), "e": self.entity, "i": self.entity_id})
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "InvalidationEvent":
+        data = json.loads(payload)
+        return cls(tenant_id=uuid.UUID(data["t"]), entity=data["e"], entity_id=data.get("i"))
+
+
+_handlers: dict[str, list[Handler]] = {}
+_resets: list[Callable[[], None]] = []
+
+
+def subscribe(entity: str, handler: Handler) -> None:
+    _handlers.setdefault(entity, []).append(handler)
+
+
+def on_reconnect(reset: Callable[[], None]) -> None:
+    """Register a reset of process-local cache state, run when LISTEN recovers."""
+    _resets.append(reset)
+
+
+async def dispatch(evt: InvalidationEvent) -> None:
+    for handler in _handlers.get(evt.entity, ()):
+        await handler(evt.tenant_id, evt.entity_id)
+
+
+def publish(
+    db: AsyncSession | Session,
+    tenant_id: uuid.UUID,
+    entity: str,
+    entity_id: uuid.UUID | str | None = None,
+) -> None:
+    """Queue an invalidation for *db*'s transaction; sent on commit, dropped on rollback."""
+    evt = InvalidationEvent(tenant_id, entity, str(entity_id) if entity_id is not None else None)
+    pending = post_commit.queued(db, _HOOK)
+    if evt not in pending:
+        pending.append(evt)
+
+
+@event.listens_for(Session, "before_commit")
+def _send_notifications(session: Session) -> None:
+    pending = post_commit.queued(session, _HOOK)
+    if not pending:
+        return
+    connection = session.connection()
+    if connection.dialect.name != "postgresql":
+        return
+    for evt in pending:
+        connection.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": settings.CACHE_INVALIDATION_CHANNEL, "payload": evt.to_payload()},
+        )
+
+
+async def _dispatch_locally(events: list[InvalidationEvent]) -> None:
+    for evt in events:
+        await dispatch(evt)
+
+
+post_commit.register(_HOOK, on_commit=_dispatch_locally)
+
+
+# ── Listener ────────────────────────────────────────────────────────
+
+
+class InvalidationListener:
+    """One LISTEN connection per worker, reconnecting with backoff."""
+
+    def __init__(self, dsn: str, channel: str):
+        self.dsn = dsn
+        self.channel = channel
+        self._task: asyncio.Task | None = None
+        self._dispatching: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            evt = InvalidationEvent.from_payload(payload)
+        except (ValueError, KeyError) as e:
+            print(f"[cache-bus] bad payload {payload!r}: {e}")
+            return
+        task = asyncio.create_task(dispatch(evt))
+        self._dispatching.add(task)
+        task.add_done_callback(self._dispatching.discard)
+
+    async def _run(self) -> None:
+        delay = 1.0
+        connected_before = False
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                print(f"[cache-bus] connect failed: {e}; retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            try:
+                await connection.add_listener(self.channel, self._on_notify)
+                if connected_before:
+                    # Anything published while we were away was missed
+                    for reset in _resets:
+                        reset()
+                connected_before = True
+                delay = 1.0
+                await closed.wait()
+                print("[cache-bus] connection lost; reconnecting")
+            finally:
+                if not connection.is_closed():
+                    await connection.close()
+
+
+_listener: InvalidationListener | None = None
+
+
+async def start_listener(engine) -> None:
+    """Start this worker's LISTEN loop (Postgres only)."""
+    global _listener
+    if engine.dialect.name != "postgresql":
+        return
+    # LISTEN needs a session-level connection; a transaction pooler never delivers to it
+    url = make_url(settings.CACHE_LISTEN_DATABASE_URL) if settings.CACHE_LISTEN_DATABASE_URL else engine.url
+    dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+    _listener = InvalidationListener(dsn, settings.CACHE_INVALIDATION_CHANNEL)
+    _listener.start()
+
+
+async def stop_listener() -> None:
+    global _listener
+    if _listener:
+        await _listener.stop()
+        _listener = None
@@ -0,0 +1,175 @@
+"""Content-addressed, reference-counted media storage.
+
+Uploaded images are stored once per tenant and content: one
+``MediaObject`` row per (tenant, sha256), whose object lives at
+``<tenant>/media/<sha256>-<row id><ext>``. The same photo uploaded for
+three products, a page design and an offer tier is one object with one URL
+(and one CDN cache entry). The rows count the uploads pointing at each
+object:
+
+    store_media()    stage → hash → upsert ref_count + 1 → new row? move into place : drop
+    release_media()  ref_count − 1 → at 0, delete the row, then the object after commit
+
+Whatever keeps an uploaded URL (a product image, the store logo, a
+checkout or page design) holds that reference. When it is replaced or
+deleted, ``release_replaced(db, tenant_id, before, after)`` releases the URLs
+``media_urls`` found in the old values but no longer in the new ones.
+
+The hash is only known once the upload has streamed through, so the bytes
+land under a staging key first and are moved (a server-side copy on R2).
+Whether the upsert inserted is what decides the move, and the key carries
+the row id, so an upload racing the release of the last reference gets a
+fresh object that the release's after-commit delete cannot touch.
+"""
+
+import hashlib
+import re
+import uuid
+from typing import AsyncIterable, AsyncIterator
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert
+from app.models.media_object import MediaObject
+from app.services import post_commit
+from app.services.storage import delete_file, move_file, upload_stream, url_for, url_to_key
+
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/svg+xml": ".svg",
+}
+
+_RELEASED_HOOK = "media_released"
+_NEW_OBJECTS_HOOK = "media_new_objects"
+
+
+def media_urls(tenant_id: uuid.UUID, *values) -> set[str]:
+    """URLs of the tenant's media objects in *values*.
+
+    Strings are searched anywhere (plain URLs, HTML, CSS); lists and dicts
+    (JSON columns) are walked.
+    """
+    pattern = re.compile(re.escape(url_for(f"{tenant_id}/media/")) + r"[\w.\-]+")
+    found: set[str] = set()
+    stack = list(values)
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            found.update(pattern.findall(value))
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return found
+
+
+async def release_replaced(
+    db: AsyncSession, tenant_id: uuid.UUID, before: set[str], after: set[str] = frozenset()
+) -> None:
+    """Release the media URLs in *before* that are not in *after*."""
+    for url in sorted(before - after):
+        await release_media(db, tenant_id, url)
+
+
+def media_key(tenant_id: uuid.UUID, sha256: str, content_type: str, media_id: uuid.UUID) -> str:
+    return f"{tenant_id}/media/{sha256}-{media_id.hex[:12]}{EXTENSIONS.get(content_type, '')}"
+
+
+async def store_media(
+    db: AsyncSession, tenant_id: uuid.UUID, chunks: AsyncIterable[bytes], content_type: str
+) -> MediaObject:
+    """Store an upload, deduplicated by content, and take one reference to it."""
+    digest = hashlib.sha256()
+    size = 0
+
+    async def _hashed() -> AsyncIterator[bytes]:
+        nonlocal size
+        async for chunk in chunks:
+            digest.update(chunk)
+            size += len(chunk)
+            yield chunk
+
+    staging_key = f"{tenant_id}/staging/{uuid.uuid4().hex}"
+    await upload_stream(_hashed(), staging_key, content_type)
+    sha256 = digest.hexdigest()
+    new_id = uuid.uuid4()
+    key = media_key(tenant_id, sha256, content_type, new_id)
+
+    try:
+        stmt = upsert(db, MediaObject).values(
+            id=new_id,
+            tenant_id=tenant_id,
+            sha256=sha256,
+            key=key,
+            url=url_for(key),
+            content_type=content_type,
+            size=size,
+            ref_count=1,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tenant_id", "sha256"],
+            set_={"ref_count": MediaObject.ref_count + 1},
+        ).returning(MediaObject.id)
+        # Decided after the upsert, which waits for any concurrent release of this
+        # content: only a freshly inserted row (our id came back) needs the bytes
+        media_id = (await db.execute(stmt)).scalar_one()
+        if media_id == new_id:
+            await move_file(staging_key, key)
+            post_commit.defer(db, _NEW_OBJECTS_HOOK, key)
+        else:
+            await delete_file(staging_key)
+    except BaseException:
+        await delete_file(staging_key)
+        raise
+    return await db.get(MediaObject, media_id, populate_existing=True)
+
+
+async def release_media(db: AsyncSession, tenant_id: uuid.UUID, url: str) -> None:
+    """Drop one reference to the media at *url*; the last one deletes it.
+
+    Objects are deleted once *db* commits, so a rolled-back delete never
+    leaves a row pointing at a missing file. URLs that predate the media
+    table are not counted and are deleted directly, as before.
+    """
+    key = url_to_key(url)
+    if not key:
+        return
+    if not key.startswith(f"{tenant_id}/media/"):
+        await delete_file(key)
+        return
+
+    remaining = await db.scalar(
+        update(MediaObject)
+        .where(MediaObject.tenant_id == tenant_id, MediaObject.key == key)
+        .values(ref_count=MediaObject.ref_count - 1)
+        .returning(MediaObject.ref_count)
+    )
+    if remaining is None or remaining > 0:
+        return
+    deleted = await db.execute(
+        delete(MediaObject)
+        .where(MediaObject.tenant_id == tenant_id, MediaObject.key == key, MediaObject.ref_count <= 0)
+        .returning(MediaObject.key, MediaObject.variants)
+    )
+    row = deleted.one_or_none()
+    if row is None:
+        return  # re-referenced in the meantime
+    keys = [row.key] + [url_to_key(v["url"]) for v in row.variants or ()]
+    post_commit.defer(db, _RELEASED_HOOK, *(k for k in keys if k))
+
+
+async def _delete_objects(keys: list[str]) -> None:
+    for key in keys:
+        try:
+            await delete_file(key)
+        except Exception as e:
+            print(f"[media] deleting {key} failed: {e}")
+
+
+post_commit.register(_RELEASED_HOOK, on_commit=_delete_objects)
+# Objects moved into place for rows that were never committed
+post_commit.register(_NEW_OBJECTS_HOOK, on_rollback=_delete_objects)
@@ -0,0 +1,167 @@
+"""Compiled per-tenant quantity-offer index.
+
+Offers store their target products as a JSON list of UUID strings, so
+resolving "which offer applies to product X" used to mean loading every
+active offer and scanning it. The index is built once per tenant:
+
+    product_id  →  CompiledOffer (highest priority wins)
+
+with each offer's tiers sorted by quantity so the tier for an order
+quantity is a bisect. Admin writes in app/api/admin/checkout.py publish an
+"offer" invalidation that drops the tenant's index in every worker once
+the write commits; the TTL is only a safety net.
+"""
+
+import json
+import uuid
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.models.checkout_offer import QuantityOffer
+from app.schemas.store import StoreQuantityOfferResponse
+from app.services.cache import JSON, Codec, SharedCache
+from app.services.invalidation_bus import on_reconnect, publish, subscribe
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledTier:
+    quantity: int
+    discount_type: str
+    discount_value: float
+
+    def apply(self, unit_price: float) -> float:
+        if self.discount_value <= 0:
+            return unit_price
+        if self.discount_type == "percentage":
+            return unit_price * (1 - self.discount_value / 100)
+        if self.discount_type == "fixed":
+            return max(0, unit_price - self.discount_value)
+        return unit_price
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledOffer:
+    id: uuid.UUID
+    response: StoreQuantityOfferResponse
+    tiers: tuple[CompiledTier, ...]
+    _quantities: tuple[int, ...] = field(repr=False)
+
+    def tier_for(self, quantity: int) -> CompiledTier | None:
+        """Return the largest tier whose quantity is <= *quantity*."""
+        i = bisect_right(self._quantities, quantity)
+        return self.tiers[i - 1] if i else None
+
+
+@dataclass(slots=True)
+class OfferIndex:
+    by_product: dict[uuid.UUID, CompiledOffer]
+
+    def offer_for(self, product_id: uuid.UUID | str) -> CompiledOffer | None:
+        if not isinstance(product_id, uuid.UUID):
+            try:
+                product_id = uuid.UUID(str(product_id))
+            except ValueError:
+                return None
+        return self.by_product.get(product_id)
+
+
+def _dump_index(index: OfferIndex) -> bytes:
+    # One entry per offer, listing the products it applies to
+    offers: dict[uuid.UUID, dict] = {}
+    for product_id, offer in index.by_product.items():
+        entry = offers.get(offer.id)
+        if entry is None:
+            entry = offers[offer.id] = {
+                "offer": offer.response.model_dump(mode="json"),
+                "tiers": [[t.quantity, t.discount_type, t.discount_value] for t in offer.tiers],
+                "products": [],
+            }
+        entry["products"].append(str(product_id))
+    return JSON.dumps(list(offers.values()))
+
+
+def _load_index(raw: bytes) -> OfferIndex:
+    by_product: dict[uuid.UUID, CompiledOffer] = {}
+    for entry in json.loads(raw):
+        tiers = tuple(CompiledTier(*tier) for tier in entry["tiers"])
+        response = StoreQuantityOfferResponse.model_validate(entry["offer"])
+        compiled = CompiledOffer(
+            id=response.id,
+            response=response,
+            tiers=tiers,
+            _quantities=tuple(t.quantity for t in tiers),
+        )
+        for product_id in entry["products"]:
+            by_product[uuid.UUID(product_id)] = compiled
+    return OfferIndex(by_product=by_product)
+
+
+_offer_cache = SharedCache(
+    "offers",
+    maxsize=settings.OFFER_INDEX_MAXSIZE,
+    ttl=settings.OFFER_INDEX_TTL,
+    codec=Codec(dumps=_dump_index, loads=_load_index),
+)
+
+
+def _compile_offer(offer: QuantityOffer) -> CompiledOffer:
+    tiers: dict[int, CompiledTier] = {}
+    # Tiers arrive ordered by position; on equal quantity the first one wins
+    for tier in offer.tiers:
+        tiers.setdefault(tier.quantity, CompiledTier(
+            quantity=tier.quantity,
+            discount_type=tier.discount_type,
+            discount_value=float(tier.discount_value or 0),
+        ))
+    ordered = tuple(sorted(tiers.values(), key=lambda t: t.quantity))
+    return CompiledOffer(
+        id=offer.id,
+        response=StoreQuantityOfferResponse.model_validate(offer),
+        tiers=ordered,
+        _quantities=tuple(t.quantity for t in ordered),
+    )
+
+
+async def _build_index(tenant_id: uuid.UUID, db: AsyncSession) -> OfferIndex:
+    result = await db.execute(
+        select(QuantityOffer)
+        .where(QuantityOffer.tenant_id == tenant_id, QuantityOffer.is_active == True)
+        .options(selectinload(QuantityOffer.tiers))
+        .order_by(QuantityOffer.priority.desc(), QuantityOffer.created_at.desc())
+    )
+    by_product: dict[uuid.UUID, CompiledOffer] = {}
+    for offer in result.scalars():
+        compiled = _compile_offer(offer)
+        for pid in offer.product_ids or []:
+            try:
+                key = pid if isinstance(pid, uuid.UUID) else uuid.UUID(str(pid))
+            except ValueError:
+                continue
+            by_product.setdefault(key, compiled)
+    return OfferIndex(by_product=by_product)
+
+
+async def get_offer_index(tenant_id: uuid.UUID, db: AsyncSession) -> OfferIndex:
+    index = await _offer_cache.get(tenant_id)
+    if index is None:
+        index = await _build_index(tenant_id, db)
+        await _offer_cache.set(tenant_id, index)
+    return index
+
+
+def invalidate_offer_index(db: AsyncSession, tenant_id: uuid.UUID) -> None:
+    """Drop *tenant_id*'s index in every worker once *db* commits."""
+    publish(db, tenant_id, "offer")
+
+
+async def _drop_index(tenant_id: uuid.UUID, _offer_id: str | None) -> None:
+    await _offer_cache.delete(tenant_id)
+
+
+subscribe("offer", _drop_index)
+on_reconnect(_offer_cache.clear_local)
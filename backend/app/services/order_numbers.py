@@ -0,0 +1,25 @@
+"""Per-tenant order number allocation.
+
+Each tenant has one row in ``order_sequences``. A single
+``INSERT ... ON CONFLICT DO UPDATE SET last_value = last_value + 1 RETURNING``
+both creates the counter on the first order and increments it afterwards,
+so allocation is O(1) and the row lock serializes concurrent orders of the
+same tenant until their transaction ends (no duplicates, no gaps).
+"""
+
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert
+from app.models.order import OrderSequence
+
+
+async def next_order_number(db: AsyncSession, tenant_id: uuid.UUID) -> str:
+    stmt = upsert(db, OrderSequence).values(tenant_id=tenant_id, last_value=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[OrderSequence.tenant_id],
+        set_={"last_value": OrderSequence.last_value + 1},
+    ).returning(OrderSequence.last_value)
+    result = await db.execute(stmt)
+    return f"ORD-{result.scalar_one():04d}"
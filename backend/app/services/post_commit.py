@@ -0,0 +1,59 @@
+"""Work queued on a session and run once its transaction ends.
+
+A write path queues items under a named hook; the hook's handlers get the
+whole list after COMMIT or after ROLLBACK, and the list is cleared either
+way:
+
+    defer(db, "media_deletes", key)
+    register("media_deletes", on_commit=_delete_objects)
+
+Handlers are coroutines. Commit and rollback run inside the AsyncSession's
+greenlet, so they are awaited from there on the event loop.
+"""
+
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+HookHandler = Callable[[list], Awaitable[None]]
+
+_hooks: dict[str, tuple[HookHandler | None, HookHandler | None]] = {}
+
+
+def _info_key(name: str) -> str:
+    return f"post_commit:{name}"
+
+
+def register(name: str, *, on_commit: HookHandler | None = None, on_rollback: HookHandler | None = None) -> None:
+    _hooks[name] = (on_commit, on_rollback)
+
+
+def queued(db: AsyncSession | Session, name: str) -> list:
+    """The items queued on *db* under *name* so far (live list)."""
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    return session.info.setdefault(_info_key(name), [])
+
+
+def defer(db: AsyncSession | Session, name: str, *items: Any) -> None:
+    queued(db, name).extend(items)
+
+
+def _run(session: Session, outcome: int) -> None:
+    # Take every hook's items first, so a failing handler leaves none behind
+    pending = [(handlers[outcome], session.info.pop(_info_key(name), None)) for name, handlers in _hooks.items()]
+    for handler, items in pending:
+        if items and handler:
+            await_only(handler(items))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    _run(session, 0)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    _run(session, 1)
@@ -0,0 +1,73 @@
+"""Store responses cached under their ETag.
+
+Used for payloads that are assembled from several queries (the per-product
+checkout bundle, the store config, the home page). The ETag is derived from the tenant's
+content version (app.services.store_version), which every relevant admin
+write bumps, so a write makes the tenant's cached payloads unreachable
+without scanning the cache; orphaned entries age out through the TTL.
+
+Misses go through the single-flight layer, so a burst of first visitors
+triggers one load. A load that finds nothing (a store without a home page
+or checkout config) is cached too, as a marker under the same ETag, so
+those stores do not query on every request either.
+"""
+
+from typing import Any, Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.cache import JSON, Codec, SharedCache
+from app.services.single_flight import single_flight
+from app.services.tenant_resolver import StoreTenant
+
+# Payloads go out through their response model, which accepts the JSON form
+_response_cache = SharedCache(
+    "response",
+    maxsize=settings.RESPONSE_CACHE_MAXSIZE,
+    ttl=settings.RESPONSE_CACHE_TTL,
+    codec=Codec(dumps=lambda payload: JSON.dumps(jsonable_encoder(payload)), loads=JSON.loads),
+)
+
+
+# Cached in place of a None payload
+_MISSING = "__missing__"
+
+
+async def get_cached_response(etag: str):
+    return await _response_cache.get(etag)
+
+
+async def set_cached_response(etag: str, payload) -> None:
+    await _response_cache.set(etag, payload)
+
+
+async def load_response(
+    tenant: StoreTenant,
+    resource: str,
+    etag: str,
+    db: AsyncSession,
+    loader: Callable[[StoreTenant, AsyncSession], Awaitable[Any]],
+    *,
+    request_session: bool = False,
+) -> Any:
+    """Return the payload cached under *etag*, loading it once on a miss.
+
+    A ``None`` result is cached as well. With ``request_session=True`` the
+    flight leader loads on *db* itself instead of on a session of its own,
+    for callers that must not hold a second connection.
+    """
+    payload = await get_cached_response(etag)
+    if payload is not None:
+        return None if payload == _MISSING else payload
+
+    async def _load(session: AsyncSession):
+        payload = await loader(tenant, session)
+        await set_cached_response(etag, _MISSING if payload is None else payload)
+        return payload
+
+    key = (tenant.id, resource, etag)
+    if request_session:
+        return await single_flight.run_on_session(key, db, _load)
+    return await single_flight.run_with_session(key, db.bind, _load)
@@ -0,0 +1,117 @@
+"""Single-flight coalescing for storefront cache misses.
+
+When a popular store's cache entry expires (or right after a deploy), many
+concurrent requests miss at once. ``single_flight.run(key, load)`` lets the
+first caller for *key* (the leader) start *load* and every concurrent caller
+for the same key await that same result instead of opening its own session:
+
+    request 1 ──► miss ──► load() ─────────────► result
+    request 2 ──► miss ──► (coalesced) ─────────► same result
+    request N ──► miss ──► (coalesced) ─────────► same result
+
+Keys are ``(tenant_id, resource, ...)``. With ``run_with_session`` the load
+runs as its own task on its own session, so a leader whose client
+disconnects does not cancel the load for everyone else. ``run_on_session``
+is for callers that must not take a second connection: the leader loads on
+the request's own session, and if it is cancelled a waiter takes over.
+Per-resource leader / coalesced counters are served at ``/api/metrics``.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.leaders: Counter[str] = Counter()
+        self.coalesced: Counter[str] = Counter()
+
+    async def run(self, key: tuple, load: Callable[[], Awaitable[T]]) -> T:
+        """Return ``await load()``, sharing one in-flight call per *key*.
+
+        ``key[1]`` names the resource in the metrics.
+        """
+        resource = str(key[1])
+        joined, result = await self._join(key, resource)
+        if joined:
+            return result
+        self.leaders[resource] += 1
+        task = asyncio.ensure_future(load())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    async def run_on_session(
+        self, key: tuple, db: AsyncSession, load: Callable[[AsyncSession], Awaitable[T]]
+    ) -> T:
+        """Like ``run_with_session``, but the leader runs ``load(db)`` itself.
+
+        Waiters await the leader's result without taking a connection.
+        """
+        resource = str(key[1])
+        joined, result = await self._join(key, resource)
+        if joined:
+            return result
+        self.leaders[resource] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        future.add_done_callback(lambda f: self._finish(key, f))
+        try:
+            result = await load(db)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+    async def _join(self, key: tuple, resource: str) -> tuple[bool, object]:
+        """``(True, result)`` of the flight in progress for *key*, else ``(False, None)``."""
+        counted = False
+        while (flight := self._inflight.get(key)) is not None:
+            if not counted:
+                self.coalesced[resource] += 1
+                counted = True
+            try:
+                return True, await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise  # this caller was cancelled, not the flight
+                # The leader went away mid-load; take over (or join whoever did)
+                if self._inflight.get(key) is flight:
+                    self._inflight.pop(key)
+        return False, None
+
+    def _finish(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.cancelled():
+            flight.exception()  # retrieved even if every waiter went away
+
+    async def run_with_session(
+        self, key: tuple, bind: AsyncEngine, load: Callable[[AsyncSession], Awaitable[T]]
+    ) -> T:
+        """Like ``run``, but *load* gets a session owned by the flight."""
+
+        async def _load() -> T:
+            async with AsyncSession(bind, expire_on_commit=False) as session:
+                return await load(session)
+
+        return await self.run(key, _load)
+
+    def stats(self) -> dict:
+        return {
+            resource: {"leader": self.leaders[resource], "coalesced": self.coalesced[resource]}
+            for resource in sorted(self.leaders | self.coalesced)
+        }
+
+
+single_flight = SingleFlight()
@@ -1,27 +1,43 @@
-"""Storage abstraction — Cloudflare R2 in production, local filesystem in dev."""
+"""Storage abstraction — Cloudflare R2 in production, local filesystem in dev.
 
+All entry points are coroutines. boto3 and file I/O block, so each backend
+runs them on a dedicated thread pool (``STORAGE_IO_WORKERS`` threads, which
+is also the size of the R2 client's connection pool) and the event loop
+keeps serving storefront traffic while a merchant uploads a batch of
+photos. Uploads are streamed: locally chunk by chunk into a temporary file,
+and to R2 as one PUT or, past one ``STORAGE_MULTIPART_CHUNK_SIZE`` part, as
+a multipart upload whose parts are sent concurrently.
+"""
+
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterable, AsyncIterator, BinaryIO, Callable, TypeVar
 
 import boto3
 from botocore.config import Config as BotoConfig
 
 from app.config import settings
 
-_s3_client = None
+T = TypeVar("T")
 
+_io_pool: ThreadPoolExecutor | None = None
 
-def _get_s3_client():
-    global _s3_client
-    if _s3_client is None:
-        _s3_client = boto3.client(
-            "s3",
-            endpoint_url=f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
-            aws_access_key_id=settings.R2_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
-            config=BotoConfig(signature_version="s3v4"),
-            region_name="auto",
-        )
-    return _s3_client
+
+async def _run_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=settings.STORAGE_IO_WORKERS, thread_name_prefix="storage")
+    return await asyncio.get_running_loop().run_in_executor(_io_pool, partial(fn, *args, **kwargs))
+
+
+def shutdown_storage() -> None:
+    """Release the I/O threads (lifespan shutdown)."""
+    global _io_pool
+    if _io_pool is not None:
+        _io_pool.shutdown(wait=True)
+        _io_pool = None
 
 
 def is_r2_configured() -> bool:
@@ -34,29 +50,214 @@ def is_r2_configured() -> bool:
     ])
 
 
-def upload_file(content: bytes, key: str, content_type: str = "image/jpeg") -> str:
+async def _single(content: bytes) -> AsyncIterator[bytes]:
+    yield content
+
+
+async def _rechunk(chunks: AsyncIterable[bytes], size: int) -> AsyncIterator[bytes]:
+    """Regroup *chunks* into blocks of exactly *size* bytes (the last may be short)."""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+    if buffer:
+        yield bytes(buffer)
+
+
+class LocalStorage:
+    """Files under ``UPLOAD_DIR``, served by the app at /uploads/."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def url_for(self, key: str) -> str:
+        return f"/uploads/{key}"
+
+    @staticmethod
+    def _open(path: str) -> BinaryIO:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return open(path, "wb")
+
+    @staticmethod
+    def _discard(f: BinaryIO, path: str) -> None:
+        f.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _remove(self, key: str) -> None:
+        filepath = os.path.join(self.root, key)
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+    async def upload_stream(self, chunks: AsyncIterable[bytes], key: str, content_type: str) -> str:
+        # Written under a temporary name so a failed upload never shows up at /uploads/
+        filepath = os.path.join(self.root, key)
+        partial_path = f"{filepath}.part"
+        f = await _run_blocking(self._open, partial_path)
+        try:
+            async for chunk in chunks:
+                await _run_blocking(f.write, chunk)
+            await _run_blocking(f.close)
+            await _run_blocking(os.replace, partial_path, filepath)
+        except BaseException:
+            await _run_blocking(self._discard, f, partial_path)
+            raise
+        return self.url_for(key)
+
+    def _move(self, src_key: str, dst_key: str) -> None:
+        dst = os.path.join(self.root, dst_key)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        os.replace(os.path.join(self.root, src_key), dst)
+
+    async def move(self, src_key: str, dst_key: str) -> None:
+        await _run_blocking(self._move, src_key, dst_key)
+
+    async def delete(self, key: str) -> None:
+        await _run_blocking(self._remove, key)
+
+
+class R2Storage:
+    """Cloudflare R2 through boto3's S3 client (thread-safe, pooled connections)."""
+
+    def __init__(self):
+        self.bucket = settings.R2_BUCKET_NAME
+        self.public_url = settings.R2_PUBLIC_URL.rstrip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
+            aws_access_key_id=settings.R2_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
+            config=BotoConfig(
+                signature_version="s3v4",
+                max_pool_connections=settings.STORAGE_IO_WORKERS,
+            ),
+            region_name="auto",
+        )
+
+    def url_for(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    async def upload_stream(self, chunks: AsyncIterable[bytes], key: str, content_type: str) -> str:
+        parts = _rechunk(chunks, settings.STORAGE_MULTIPART_CHUNK_SIZE)
+        first = await anext(parts, b"")
+        second = await anext(parts, None)
+        if second is None:
+            await _run_blocking(
+                self.client.put_object,
+                Bucket=self.bucket,
+                Key=key,
+                Body=first,
+                ContentType=content_type,
+            )
+        else:
+            await self._upload_multipart(first, second, parts, key, content_type)
+        return self.url_for(key)
+
+    async def _upload_multipart(
+        self, first: bytes, second: bytes, rest: AsyncIterator[bytes], key: str, content_type: str
+    ) -> None:
+        created = await _run_blocking(
+            self.client.create_multipart_upload, Bucket=self.bucket, Key=key, ContentType=content_type
+        )
+        upload_id = created["UploadId"]
+        # Each slot is one part held in memory while it uploads
+        slots = asyncio.Semaphore(settings.STORAGE_MULTIPART_CONCURRENCY)
+        tasks: list[asyncio.Task] = []
+
+        async def _part(number: int, body: bytes) -> dict:
+            try:
+                result = await _run_blocking(
+                    self.client.upload_part,
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=number,
+                    Body=body,
+                )
+            finally:
+                slots.release()
+            return {"PartNumber": number, "ETag": result["ETag"]}
+
+        async def _bodies() -> AsyncIterator[bytes]:
+            yield first
+            yield second
+            async for body in rest:
+                yield body
+
+        try:
+            async for body in _bodies():
+                await slots.acquire()
+                failed = next((t for t in tasks if t.done() and t.exception()), None)
+                if failed:
+                    slots.release()
+                    raise failed.exception()
+                tasks.append(asyncio.create_task(_part(len(tasks) + 1, body)))
+            parts = await asyncio.gather(*tasks)
+            await _run_blocking(
+                self.client.complete_multipart_upload,
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            # Let every part settle before aborting, so none lands after the abort
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await _run_blocking(self.client.abort_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+    async def move(self, src_key: str, dst_key: str) -> None:
+        # Server-side copy: the bytes do not come back through the app
+        await _run_blocking(
+            self.client.copy_object,
+            Bucket=self.bucket,
+            Key=dst_key,
+            CopySource={"Bucket": self.bucket, "Key": src_key},
+        )
+        await self.delete(src_key)
+
+    async def delete(self, key: str) -> None:
+        await _run_blocking(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+
+_storage: LocalStorage | R2Storage | None = None
+
+
+def get_storage() -> LocalStorage | R2Storage:
+    global _storage
+    if _storage is None:
+        _storage = R2Storage() if is_r2_configured() else LocalStorage(settings.UPLOAD_DIR)
+    return _storage
+
+
+async def upload_file(content: bytes, key: str, content_type: str = "image/jpeg") -> str:
     """Upload file and return its public URL.
 
     If R2 is configured, uploads to Cloudflare R2 and returns the public URL.
     Otherwise, saves to local filesystem and returns a relative /uploads/ path.
     """
-    if is_r2_configured():
-        client = _get_s3_client()
-        client.put_object(
-            Bucket=settings.R2_BUCKET_NAME,
-            Key=key,
-            Body=content,
-            ContentType=content_type,
-        )
-        public_url = settings.R2_PUBLIC_URL.rstrip("/")
-        return f"{public_url}/{key}"
+    return await get_storage().upload_stream(_single(content), key, content_type)
 
-    # Fallback: local filesystem
-    filepath = os.path.join(settings.UPLOAD_DIR, key)
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, "wb") as f:
-        f.write(content)
-    return f"/uploads/{key}"
+
+async def upload_stream(chunks: AsyncIterable[bytes], key: str, content_type: str) -> str:
+    """Like ``upload_file``, but consumes *chunks* as they arrive.
+
+    Memory stays bounded by the chunk size locally, and by
+    ``STORAGE_MULTIPART_CONCURRENCY`` parts of ``STORAGE_MULTIPART_CHUNK_SIZE``
+    on R2. If *chunks* raises, nothing is stored and the error propagates.
+    """
+    return await get_storage().upload_stream(chunks, key, content_type)
+
+
+def url_for(key: str) -> str:
+    return get_storage().url_for(key)
+
+
+async def move_file(src_key: str, dst_key: str) -> None:
+    """Rename a stored object, replacing any object already at *dst_key*."""
+    await get_storage().move(src_key, dst_key)
 
 
 def url_to_key(url: str) -> str | None:
@@ -76,19 +277,13 @@ def url_to_key(url: str) -> str | None:
     return None
 
 
-def delete_file(key: str) -> None:
+async def delete_file(key: str) -> None:
     """Delete a file from storage."""
-    if is_r2_configured():
-        client = _get_s3_client()
-        client.delete_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
-    else:
-        filepath = os.path.join(settings.UPLOAD_DIR, key)
-        if os.path.exists(filepath):
-            os.remove(filepath)
+    await get_storage().delete(key)
 
 
-def delete_by_url(url: str) -> None:
+async def delete_by_url(url: str) -> None:
     """Delete a file from storage using its URL."""
     key = url_to_key(url)
     if key:
-        delete_file(key)
+        await delete_file(key)
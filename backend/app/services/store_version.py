@@ -0,0 +1,56 @@
+"""Per-tenant storefront content version.
+
+Every admin write to products, store / checkout / upsell config, offers,
+upsells, upsell-ticks, pages or page designs calls ``bump_store_version``
+in the same transaction, so the version changes exactly when the content
+does. Public store GETs derive a strong ETag from (tenant, version, URL)
+and answer ``If-None-Match`` with a 304 before loading anything.
+
+A bump also publishes a "store" invalidation so every worker can drop
+version-tagged entries it will never serve again. The version itself is
+cached per tenant alongside the slug → tenant entry (same size and TTL),
+and that event drops it too, so a 304 or a snapshot hit does not touch
+the DB.
+"""
+
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import upsert
+from app.models.store_config import StoreContentVersion
+from app.services.cache import SharedCache
+from app.services.invalidation_bus import on_reconnect, publish, subscribe
+
+_version_cache = SharedCache("store_version", maxsize=settings.TENANT_CACHE_MAXSIZE, ttl=settings.TENANT_CACHE_TTL)
+
+
+async def get_store_version(db: AsyncSession, tenant_id: uuid.UUID) -> int:
+    version = await _version_cache.get(tenant_id)
+    if version is None:
+        result = await db.execute(
+            select(StoreContentVersion.version).where(StoreContentVersion.tenant_id == tenant_id)
+        )
+        version = result.scalar_one_or_none() or 0
+        await _version_cache.set(tenant_id, version)
+    return version
+
+
+async def bump_store_version(db: AsyncSession, tenant_id: uuid.UUID) -> None:
+    stmt = upsert(db, StoreContentVersion).values(tenant_id=tenant_id, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StoreContentVersion.tenant_id],
+        set_={"version": StoreContentVersion.version + 1},
+    )
+    await db.execute(stmt)
+    publish(db, tenant_id, "store")
+
+
+async def _drop_version(tenant_id: uuid.UUID, _id: str | None) -> None:
+    await _version_cache.delete(tenant_id)
+
+
+subscribe("store", _drop_version)
+on_reconnect(_version_cache.clear_local)
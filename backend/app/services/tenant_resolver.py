@@ -0,0 +1,123 @@
+"""Slug → tenant resolution for the public storefront routes.
+
+Every ``/api/store/{slug}/...`` request starts by resolving the store slug.
+Results are kept in a bounded TTL+LRU cache so repeat hits skip the DB:
+
+    slug  →  StoreTenant(id, slug, store_name, is_active)
+    slug  →  _UNKNOWN   (negative entry, shorter TTL)
+
+Inserting, updating or deleting a Tenant row publishes a "tenant"
+invalidation per affected slug (SQLAlchemy mapper events below), so every
+worker picks up a rename, deactivation or freshly registered slug once the
+transaction commits, without waiting for the TTL.
+"""
+
+import json
+import uuid
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import object_session
+
+from app.config import settings
+from app.models.tenant import Tenant
+from app.services.cache import Codec, SharedCache
+from app.services.invalidation_bus import on_reconnect, publish, subscribe
+
+
+@dataclass(frozen=True, slots=True)
+class StoreTenant:
+    id: uuid.UUID
+    slug: str
+    store_name: str
+    is_active: bool
+
+
+# Negative entry; a plain constant so it survives the Redis round trip
+_UNKNOWN = False
+
+
+def _dump_tenant(value: StoreTenant | bool) -> bytes:
+    if value is _UNKNOWN:
+        return b"false"
+    return json.dumps({
+        "id": str(value.id),
+        "slug": value.slug,
+        "store_name": value.store_name,
+        "is_active": value.is_active,
+    }).encode()
+
+
+def _load_tenant(raw: bytes) -> StoreTenant | bool:
+    data = json.loads(raw)
+    if data is _UNKNOWN:
+        return _UNKNOWN
+    return StoreTenant(
+        id=uuid.UUID(data["id"]),
+        slug=data["slug"],
+        store_name=data["store_name"],
+        is_active=data["is_active"],
+    )
+
+
+_tenant_cache = SharedCache(
+    "tenant",
+    maxsize=settings.TENANT_CACHE_MAXSIZE,
+    ttl=settings.TENANT_CACHE_TTL,
+    codec=Codec(dumps=_dump_tenant, loads=_load_tenant),
+)
+
+
+async def resolve_tenant(slug: str, db: AsyncSession) -> StoreTenant | None:
+    """Return the active tenant for *slug*, or None if unknown / inactive."""
+    cached = await _tenant_cache.get(slug)
+    if cached is _UNKNOWN:
+        return None
+    if cached is None:
+        result = await db.execute(
+            select(Tenant.id, Tenant.slug, Tenant.store_name, Tenant.is_active).where(Tenant.slug == slug)
+        )
+        row = result.one_or_none()
+        if row is None:
+            await _tenant_cache.set(slug, _UNKNOWN, ttl=settings.TENANT_CACHE_NEGATIVE_TTL)
+            return None
+        cached = StoreTenant(id=row.id, slug=row.slug, store_name=row.store_name, is_active=bool(row.is_active))
+        await _tenant_cache.set(slug, cached)
+    return cached if cached.is_active else None
+
+
+async def get_tenant_by_slug(slug: str, db: AsyncSession) -> StoreTenant:
+    tenant = await resolve_tenant(slug, db)
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Store not found")
+    return tenant
+
+
+async def invalidate_tenant(*slugs: str) -> None:
+    for slug in slugs:
+        await _tenant_cache.delete(slug)
+
+
+async def clear_tenant_cache() -> None:
+    await _tenant_cache.clear()
+
+
+@event.listens_for(Tenant, "after_insert")
+@event.listens_for(Tenant, "after_update")
+@event.listens_for(Tenant, "after_delete")
+def _on_tenant_change(mapper, connection, target: Tenant) -> None:
+    # Drop both the current and (on rename) the previous slug
+    history = inspect(target).attrs.slug.history
+    for slug in (target.slug, *(history.deleted or ())):
+        publish(object_session(target), target.id, "tenant", slug)
+
+
+async def _drop_slug(tenant_id: uuid.UUID, slug: str | None) -> None:
+    if slug:
+        await invalidate_tenant(slug)
+
+
+subscribe("tenant", _drop_slug)
+on_reconnect(_tenant_cache.clear_local)
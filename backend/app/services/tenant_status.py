@@ -0,0 +1,56 @@
+"""Cached tenant fields for the stateless admin auth path.
+
+Access tokens carry only the tenant id, so without this every admin
+request would load the Tenant row. The cache holds the fields admin routes
+read from ``AuthTenant``:
+
+    tenant_id  →  {"slug", "plan", "email", "is_active"}  |  "missing"
+
+Every Tenant write publishes a "tenant" invalidation (app.services.
+tenant_resolver), which drops the entry in every worker, so a deactivation,
+rename, plan or email change applies on the next request instead of when
+the token expires.
+
+Only writes made through the ORM publish that event. A tenant deactivated
+any other way (raw SQL, a psql session, a script using a plain
+connection) keeps passing admin auth until its entry expires, up to
+``TENANT_STATUS_TTL`` seconds, which is why that TTL is kept short. Such
+scripts should call ``invalidation_bus.publish`` for the tenant, or load
+and update the row through a session.
+"""
+
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.tenant import Tenant
+from app.services.cache import SharedCache
+from app.services.invalidation_bus import on_reconnect, subscribe
+
+_status_cache = SharedCache("tenant_status", maxsize=settings.TENANT_STATUS_MAXSIZE, ttl=settings.TENANT_STATUS_TTL)
+
+
+MISSING = "missing"
+
+
+async def get_tenant_fields(tenant_id: uuid.UUID, db: AsyncSession) -> dict | None:
+    """The tenant's slug, plan, email and is_active; None if it no longer exists."""
+    fields = await _status_cache.get(tenant_id)
+    if fields is None:
+        result = await db.execute(
+            select(Tenant.slug, Tenant.plan, Tenant.email, Tenant.is_active).where(Tenant.id == tenant_id)
+        )
+        row = result.one_or_none()
+        fields = MISSING if row is None else dict(row._mapping)
+        await _status_cache.set(tenant_id, fields)
+    return None if fields == MISSING else fields
+
+
+async def _drop_status(tenant_id: uuid.UUID, _slug: str | None) -> None:
+    await _status_cache.delete(tenant_id)
+
+
+subscribe("tenant", _drop_status)
+on_reconnect(_status_cache.clear_local)
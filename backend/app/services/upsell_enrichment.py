@@ -0,0 +1,125 @@
+"""Batched product enrichment for upsells and upsell ticks.
+
+Upsell and tick payloads embed a summary of the product they point to.
+All referenced products are loaded in one query per request (first image
+via a correlated subquery, variants via a joined eager load) instead of one
+``select(Product)`` per row. Shared by the storefront and admin routers.
+"""
+
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.models.product import Product, ProductImage
+
+# Write-behind counters (app.services.counters) change without a store
+# version bump, so they are left out of ETag-cached storefront payloads
+_COUNTER_FIELDS = ("impressions", "accepted_count")
+
+
+def _as_dict(row, storefront: bool = False) -> dict:
+    data = dict(row) if isinstance(row, dict) else {c.name: getattr(row, c.name) for c in row.__table__.columns}
+    if storefront:
+        for name in _COUNTER_FIELDS:
+            data.pop(name, None)
+    return data
+
+
+async def load_products(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    product_ids,
+    *,
+    active_only: bool = False,
+    with_variants: bool = False,
+) -> dict[uuid.UUID, dict]:
+    """Return ``{product_id: summary}`` for *product_ids* in a single query."""
+    ids = {pid for pid in product_ids if pid}
+    if not ids:
+        return {}
+
+    first_image = (
+        select(ProductImage.image_url)
+        .where(ProductImage.product_id == Product.id)
+        .order_by(ProductImage.sort_order)
+        .limit(1)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    query = select(Product, first_image.label("image_url")).where(
+        Product.id.in_(ids), Product.tenant_id == tenant_id
+    )
+    if active_only:
+        query = query.where(Product.is_active == True)
+    if with_variants:
+        query = query.options(joinedload(Product.variants))
+
+    result = await db.execute(query)
+    products = {}
+    for product, image_url in result.unique().all():
+        summary = {
+            "id": product.id,
+            "name": product.name,
+            "price": float(product.price),
+            "image_url": image_url,
+        }
+        if with_variants:
+            summary["description"] = product.description
+            summary["variants"] = [
+                {"id": v.id, "name": v.name, "price_override": float(v.price_override) if v.price_override else None}
+                for v in product.variants
+            ]
+        products[product.id] = summary
+    return products
+
+
+async def enrich_upsells(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    upsells,
+    *,
+    storefront: bool = False,
+) -> list[dict]:
+    """Attach ``upsell_product`` to each upsell.
+
+    On the storefront, upsells whose product is missing or inactive are
+    dropped, the summary also carries description and variants, and the
+    counters are left out.
+    """
+    rows = [_as_dict(u, storefront) for u in upsells]
+    products = await load_products(
+        db,
+        tenant_id,
+        (r["upsell_product_id"] for r in rows),
+        active_only=storefront,
+        with_variants=storefront,
+    )
+    enriched = []
+    for data in rows:
+        data["upsell_product"] = products.get(data["upsell_product_id"])
+        if storefront and data["upsell_product"] is None:
+            continue
+        enriched.append(data)
+    return enriched
+
+
+async def enrich_ticks(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    ticks,
+    *,
+    storefront: bool = False,
+) -> list[dict]:
+    """Attach ``linked_product`` to each tick (None when not linked or not found)."""
+    rows = [_as_dict(t, storefront) for t in ticks]
+    products = await load_products(
+        db,
+        tenant_id,
+        (r["linked_product_id"] for r in rows if r["link_product"]),
+        active_only=storefront,
+    )
+    for data in rows:
+        data["linked_product"] = products.get(data["linked_product_id"]) if data["link_product"] else None
+    return rows
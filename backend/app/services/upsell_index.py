@@ -0,0 +1,168 @@
+"""Per-tenant trigger index for upsells and upsell ticks.
+
+Both models target products the same way: ``trigger_type == "all"`` or
+``"specific"`` with a JSON list of product ids. Instead of loading every
+active row and filtering in Python per request, each tenant gets:
+
+    all         →  rows that apply to every product
+    by_product  →  product_id → rows that list it
+
+Every row carries its rank in (priority desc, created_at desc) order, so
+the matches for a product are a merge of two pre-sorted lists: O(matches).
+Admin writes in app/api/admin/upsells.py and upsell_ticks.py publish an
+"upsell" / "upsell_tick" invalidation that drops the tenant's index in
+every worker once the write commits.
+"""
+
+import heapq
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from operator import itemgetter
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import DateTime, Numeric, select
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.upsell import Upsell
+from app.models.upsell_tick import UpsellTick
+from app.services.cache import JSON, Codec, SharedCache
+from app.services.invalidation_bus import on_reconnect, publish, subscribe
+
+_Entry = tuple[int, dict]
+
+
+@dataclass(frozen=True, slots=True)
+class TriggerIndex:
+    all: tuple[_Entry, ...]
+    by_product: dict[uuid.UUID, tuple[_Entry, ...]]
+
+    def matches(self, product_id: uuid.UUID) -> list[dict]:
+        """Rows for *product_id*, in priority order. Rows are shared; copy before mutating."""
+        specific = self.by_product.get(product_id, ())
+        if not specific:
+            return [row for _, row in self.all]
+        return [row for _, row in heapq.merge(self.all, specific, key=itemgetter(0))]
+
+
+def _index_codec(model) -> Codec:
+    """JSON for a ``TriggerIndex`` of *model* rows, restoring the column types on load."""
+    parsers = {}
+    for column in model.__table__.columns:
+        if isinstance(column.type, UUID):
+            parsers[column.name] = uuid.UUID
+        elif isinstance(column.type, DateTime):
+            parsers[column.name] = datetime.fromisoformat
+        elif isinstance(column.type, Numeric) and column.type.asdecimal:
+            parsers[column.name] = lambda value: Decimal(str(value))
+
+    def dumps(index: TriggerIndex) -> bytes:
+        rows = {rank: row for rank, row in index.all}
+        for entries in index.by_product.values():
+            rows.update(entries)
+        return JSON.dumps({
+            "rows": [[rank, jsonable_encoder(row)] for rank, row in rows.items()],
+            "all": [rank for rank, _ in index.all],
+            "by_product": {str(pid): [rank for rank, _ in entries] for pid, entries in index.by_product.items()},
+        })
+
+    def loads(raw: bytes) -> TriggerIndex:
+        data = json.loads(raw)
+        rows = {}
+        for rank, row in data["rows"]:
+            for name, parse in parsers.items():
+                if row.get(name) is not None:
+                    row[name] = parse(row[name])
+            rows[rank] = (rank, row)
+        return TriggerIndex(
+            all=tuple(rows[rank] for rank in data["all"]),
+            by_product={uuid.UUID(pid): tuple(rows[rank] for rank in ranks) for pid, ranks in data["by_product"].items()},
+        )
+
+    return Codec(dumps=dumps, loads=loads)
+
+
+_upsell_cache = SharedCache(
+    "upsells", maxsize=settings.UPSELL_INDEX_MAXSIZE, ttl=settings.UPSELL_INDEX_TTL, codec=_index_codec(Upsell)
+)
+_tick_cache = SharedCache(
+    "upsell_ticks", maxsize=settings.UPSELL_INDEX_MAXSIZE, ttl=settings.UPSELL_INDEX_TTL, codec=_index_codec(UpsellTick)
+)
+
+
+def _parse_ids(values) -> set[uuid.UUID]:
+    ids = set()
+    for value in values or []:
+        try:
+            ids.add(value if isinstance(value, uuid.UUID) else uuid.UUID(str(value)))
+        except ValueError:
+            continue
+    return ids
+
+
+async def _build_index(model, tenant_id: uuid.UUID, db: AsyncSession) -> TriggerIndex:
+    result = await db.execute(
+        select(model)
+        .where(model.tenant_id == tenant_id, model.is_active == True)
+        .order_by(model.priority.desc(), model.created_at.desc())
+    )
+    all_rows: list[_Entry] = []
+    by_product: dict[uuid.UUID, list[_Entry]] = {}
+    for rank, row in enumerate(result.scalars()):
+        # Upsells without a product have nothing to offer
+        if model is Upsell and not row.upsell_product_id:
+            continue
+        entry = (rank, {c.name: getattr(row, c.name) for c in row.__table__.columns})
+        if row.trigger_type == "all":
+            all_rows.append(entry)
+        elif row.trigger_type == "specific":
+            for pid in _parse_ids(row.trigger_product_ids):
+                by_product.setdefault(pid, []).append(entry)
+    return TriggerIndex(
+        all=tuple(all_rows),
+        by_product={pid: tuple(entries) for pid, entries in by_product.items()},
+    )
+
+
+async def _get_index(cache: SharedCache, model, tenant_id: uuid.UUID, db: AsyncSession) -> TriggerIndex:
+    index = await cache.get(tenant_id)
+    if index is None:
+        index = await _build_index(model, tenant_id, db)
+        await cache.set(tenant_id, index)
+    return index
+
+
+async def get_upsell_index(tenant_id: uuid.UUID, db: AsyncSession) -> TriggerIndex:
+    return await _get_index(_upsell_cache, Upsell, tenant_id, db)
+
+
+async def get_tick_index(tenant_id: uuid.UUID, db: AsyncSession) -> TriggerIndex:
+    return await _get_index(_tick_cache, UpsellTick, tenant_id, db)
+
+
+def invalidate_upsell_index(db: AsyncSession, tenant_id: uuid.UUID) -> None:
+    """Drop *tenant_id*'s upsell index in every worker once *db* commits."""
+    publish(db, tenant_id, "upsell")
+
+
+def invalidate_tick_index(db: AsyncSession, tenant_id: uuid.UUID) -> None:
+    """Drop *tenant_id*'s upsell-tick index in every worker once *db* commits."""
+    publish(db, tenant_id, "upsell_tick")
+
+
+async def _drop_upsell_index(tenant_id: uuid.UUID, _upsell_id: str | None) -> None:
+    await _upsell_cache.delete(tenant_id)
+
+
+async def _drop_tick_index(tenant_id: uuid.UUID, _tick_id: str | None) -> None:
+    await _tick_cache.delete(tenant_id)
+
+
+subscribe("upsell", _drop_upsell_index)
+subscribe("upsell_tick", _drop_tick_index)
+on_reconnect(_upsell_cache.clear_local)
+on_reconnect(_tick_cache.clear_local)
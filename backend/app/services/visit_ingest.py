@@ -0,0 +1,135 @@
+"""StoreVisit ingestion through an in-memory ring buffer.
+
+Page views arrive at ad-traffic rates, so ``record`` only appends a tuple
+to a bounded per-worker buffer and returns. A background task drains it
+every ``VISIT_FLUSH_INTERVAL`` seconds (sooner once ``VISIT_FLUSH_BATCH``
+rows are waiting) in batches of up to ``VISIT_FLUSH_BATCH`` rows:
+
+    record() ──► [ ring buffer, VISIT_BUFFER_SIZE ] ──► COPY store_visits (...) FROM STDIN
+
+On Postgres a batch is one ``copy_records_to_table`` call on the asyncpg
+connection; elsewhere (the SQLite test suite) it is one executemany INSERT.
+
+When the buffer is full, new visits are dropped and counted rather than
+growing memory or slowing the request. A failed flush puts its batch back
+at the head of the buffer (as far as it fits) for the next attempt. The
+flush loop is app.services.write_behind's.
+Buffered / written / dropped counters are served at ``/api/metrics``.
+"""
+
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.database import engine
+from app.models.store_visit import StoreVisit
+from app.services.write_behind import WriteBehindBuffer
+
+COLUMNS = (
+    "id",
+    "tenant_id",
+    "ip_address",
+    "user_agent",
+    "referrer",
+    "page_path",
+    "utm_source",
+    "utm_medium",
+    "utm_campaign",
+    "created_at",
+)
+
+
+class VisitBuffer(WriteBehindBuffer):
+    def __init__(self, engine: AsyncEngine, capacity: int, batch_size: int, interval: float):
+        super().__init__(interval)
+        self.engine = engine
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self._rows: deque[tuple] = deque()
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    def record(
+        self,
+        tenant_id: uuid.UUID,
+        *,
+        ip_address: str | None = None,
+        user_agent: str | None = None,
+        referrer: str | None = None,
+        page_path: str | None = None,
+        utm_source: str | None = None,
+        utm_medium: str | None = None,
+        utm_campaign: str | None = None,
+    ) -> bool:
+        """Buffer one visit; False if it was dropped because the buffer is full."""
+        if len(self._rows) >= self.capacity:
+            self.dropped += 1
+            return False
+        self._rows.append((
+            uuid.uuid4(),
+            tenant_id,
+            ip_address,
+            user_agent,
+            referrer,
+            page_path,
+            utm_source,
+            utm_medium,
+            utm_campaign,
+            datetime.now(timezone.utc),
+        ))
+        if len(self._rows) >= self.batch_size:
+            self.wake()
+        return True
+
+    async def _flush(self) -> None:
+        """Write everything buffered so far, one batch at a time."""
+        while self._rows:
+            batch = [self._rows.popleft() for _ in range(min(self.batch_size, len(self._rows)))]
+            try:
+                await self._write(batch)
+            except Exception as e:
+                self.failed_flushes += 1
+                print(f"[visits] flush of {len(batch)} rows failed: {e}")
+                self._requeue(batch)
+                return
+            self.written += len(batch)
+
+    def _requeue(self, batch: list[tuple]) -> None:
+        room = self.capacity - len(self._rows)
+        keep = batch[:max(room, 0)]
+        self.dropped += len(batch) - len(keep)
+        self._rows.extendleft(reversed(keep))
+
+    async def _write(self, batch: list[tuple]) -> None:
+        async with self.engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                # Straight to asyncpg, outside SQLAlchemy's transaction: COPY autocommits
+                raw = await conn.get_raw_connection()
+                table = StoreVisit.__table__
+                await raw.driver_connection.copy_records_to_table(
+                    table.name, schema_name=table.schema, columns=COLUMNS, records=batch
+                )
+            else:
+                await conn.execute(insert(StoreVisit.__table__), [dict(zip(COLUMNS, row)) for row in batch])
+                await conn.commit()
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._rows),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+visit_buffer = VisitBuffer(
+    engine,
+    capacity=settings.VISIT_BUFFER_SIZE,
+    batch_size=settings.VISIT_FLUSH_BATCH,
+    interval=settings.VISIT_FLUSH_INTERVAL,
+)
@@ -0,0 +1,58 @@
+"""Periodic flushing for in-process write-behind buffers.
+
+The counter, visit and cart buffers each take writes in memory and return;
+one background task per worker writes them out:
+
+    every ``interval`` seconds, or as soon as ``wake()`` is called ──► _flush()
+
+Subclasses implement ``_flush`` only. A failed write should be kept for the
+next round rather than raised. ``stop()`` (app shutdown) lets a flush that
+is in progress finish instead of cancelling it halfway, ends the loop and
+flushes once more, so everything buffered before shutdown is written.
+"""
+
+import asyncio
+
+
+class WriteBehindBuffer:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    def wake(self) -> None:
+        """Flush now instead of at the end of the interval."""
+        self._wake.set()
+
+    async def flush(self) -> None:
+        """Write out whatever is buffered."""
+        await self._flush()
+
+    async def _flush(self) -> None:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out whatever is buffered."""
+        if self._task:
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[write-behind] {type(self).__name__} flush failed: {e}")
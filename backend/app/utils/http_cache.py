@@ -0,0 +1,63 @@
+"""HTTP validators (ETag / If-None-Match) for public store responses."""
+
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.store_version import get_store_version
+from app.services.tenant_resolver import StoreTenant
+
+
+def etag_for(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header matches *etag*."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def store_cache_control() -> str:
+    return (
+        f"public, max-age=0, s-maxage={settings.STORE_CDN_MAX_AGE}, "
+        f"stale-while-revalidate={settings.STORE_STALE_WHILE_REVALIDATE}"
+    )
+
+
+def store_etag(request: Request, tenant: StoreTenant, version: int, path: str, query: str = "") -> str:
+    """The ETag of the store resource at *path*, for content version *version*."""
+    key = f"{request.app.version}|{tenant.id}|{tenant.store_name}|{version}|{path}?{query}"
+    return etag_for(key.encode())
+
+
+async def store_validators(
+    request: Request, response: Response, tenant: StoreTenant, db: AsyncSession
+) -> Response | None:
+    """Attach ETag / Cache-Control to *response*, or return a 304 to send instead.
+
+    The ETag covers the app version, the tenant (including its name, which
+    store config embeds), the tenant's content version and the full URL, so
+    it is known before any content is loaded. The version is left on
+    ``request.state.store_version`` for version-keyed caches.
+    """
+    version = await get_store_version(db, tenant.id)
+    request.state.store_version = version
+    etag = store_etag(request, tenant, version, request.url.path, request.url.query)
+    headers = {"ETag": etag, "Cache-Control": store_cache_control()}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,19 +1,75 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Callable, TypeVar
 
 import bcrypt
 from jose import JWTError, jwt
 
 from app.config import settings
 
+T = TypeVar("T")
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if *hashed_password* was made with a cost other than BCRYPT_ROUNDS."""
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.BCRYPT_ROUNDS
+
+
+# ── Off-loop hashing ────────────────────────────────────────────────
+#
+# bcrypt holds a CPU for ~250 ms at cost 12. Run on the event loop it
+# stalls every request on the worker, so the async helpers below run it on
+# a small dedicated pool instead. At most PASSWORD_HASH_WORKERS hashes run
+# at once and at most PASSWORD_HASH_QUEUE more wait; beyond that callers
+# get PasswordHashBusy (a 503) rather than an unbounded backlog of logins.
+
+
+class PasswordHashBusy(Exception):
+    """The hashing pool's queue is full."""
+
+
+class PasswordHashPool:
+    def __init__(self, workers: int, queue: int):
+        self.workers = workers
+        self.limit = workers + queue
+        self._pending = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        if self._pending >= self.limit:
+            raise PasswordHashBusy()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, partial(fn, *args))
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hash_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE)
+
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
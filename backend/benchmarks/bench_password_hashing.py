@@ -0,0 +1,80 @@
+"""Event-loop latency during a burst of logins, bcrypt inline vs on the hash pool.
+
+A ticker coroutine asks to wake every 5 ms and records how late it actually
+wakes; that lateness is what every other request on the worker would see.
+The burst fires LOGINS concurrent password checks, first calling
+``verify_password`` directly on the loop (the old login handler), then
+through ``hash_pool`` (the current one).
+
+    cd backend && python -m benchmarks.bench_password_hashing [LOGINS]
+
+Inline, the lag grows to the length of the whole burst; with the pool it
+stays in the low milliseconds, bounded by GIL hand-offs to the bcrypt
+threads rather than by the number of logins.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from app.config import settings
+from app.utils.security import PasswordHashPool, hash_password, verify_password
+
+TICK = 0.005  # seconds
+
+
+async def _ticker(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def _inline_login(password: str, hashed: str) -> bool:
+    await asyncio.sleep(0)  # request arrives
+    return verify_password(password, hashed)
+
+
+async def _burst(logins: int, login) -> tuple[list[float], float]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    await asyncio.sleep(TICK * 4)  # baseline ticks
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return lags, elapsed
+
+
+def _report(label: str, lags: list[float], elapsed: float) -> None:
+    ms = sorted(lag * 1000 for lag in lags)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(
+        f"{label:<8} burst {elapsed * 1000:8.0f} ms | loop lag "
+        f"p50 {statistics.median(ms):7.1f} ms  p99 {p99:7.1f} ms  max {ms[-1]:7.1f} ms  "
+        f"({len(ms)} ticks)"
+    )
+
+
+async def main(logins: int) -> None:
+    password = "correct horse battery staple"
+    hashed = hash_password(password)
+    print(f"{logins} concurrent logins, bcrypt cost {settings.BCRYPT_ROUNDS}, "
+          f"{settings.PASSWORD_HASH_WORKERS} hash workers")
+
+    lags, elapsed = await _burst(logins, lambda: _inline_login(password, hashed))
+    _report("inline", lags, elapsed)
+
+    pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, queue=logins)
+    try:
+        lags, elapsed = await _burst(logins, lambda: pool.run(verify_password, password, hashed))
+        _report("pool", lags, elapsed)
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
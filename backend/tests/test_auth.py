@@ -1,5 +1,14 @@
+import bcrypt
 import pytest
+from fastapi.security import HTTPAuthorizationCredentials
 from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.api.deps import get_token_tenant
+from app.config import settings
+from app.models.tenant import Tenant
+from app.utils.security import decode_token, hash_pool
+from tests.conftest import async_session_test
 
 
 @pytest.mark.asyncio
@@ -85,3 +94,77 @@ async def test_refresh_token(client: AsyncClient):
     assert response.status_code == 200
     data = response.json()
     assert "access_token" in data
+
+
+@pytest.mark.asyncio
+async def test_token_tenant_follows_tenant_writes(client: AsyncClient):
+    response = await client.post("/api/auth/register", json={
+        "email": "claims@test.com",
+        "password": "password123",
+        "store_name": "Tienda Claims",
+    })
+    token = response.json()["access_token"]
+    assert decode_token(token).keys() == {"sub", "exp", "type"}
+
+    headers = {"Authorization": f"Bearer {token}"}
+    assert (await client.get("/api/admin/products", headers=headers)).status_code == 200
+
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    async with async_session_test() as session:
+        tenant = (await session.execute(select(Tenant).where(Tenant.slug == "tienda-claims"))).scalar_one()
+        assert (await get_token_tenant(credentials, session)).email == "claims@test.com"
+
+        tenant.email = "nuevo@test.com"
+        tenant.plan = "pro"
+        await session.commit()
+        # The cached fields are dropped by the write, not left until the token expires
+        current = await get_token_tenant(credentials, session)
+        assert (current.email, current.plan) == ("nuevo@test.com", "pro")
+
+        tenant.is_active = False
+        await session.commit()
+
+    # The lockout applies right away
+    assert (await client.get("/api/admin/products", headers=headers)).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_cost(client: AsyncClient):
+    await client.post("/api/auth/register", json={
+        "email": "rehash@test.com",
+        "password": "mypassword",
+        "store_name": "Rehash Store",
+    })
+    old_cost = max(4, settings.BCRYPT_ROUNDS - 2)
+    async with async_session_test() as session:
+        tenant = (await session.execute(select(Tenant).where(Tenant.email == "rehash@test.com"))).scalar_one()
+        tenant.password_hash = bcrypt.hashpw(b"mypassword", bcrypt.gensalt(rounds=old_cost)).decode()
+        await session.commit()
+
+    response = await client.post("/api/auth/login", json={"email": "rehash@test.com", "password": "mypassword"})
+    assert response.status_code == 200
+
+    async with async_session_test() as session:
+        tenant = (await session.execute(select(Tenant).where(Tenant.email == "rehash@test.com"))).scalar_one()
+    assert tenant.password_hash.split("$")[2] == f"{settings.BCRYPT_ROUNDS:02d}"
+    assert bcrypt.checkpw(b"mypassword", tenant.password_hash.encode())
+
+
+@pytest.mark.asyncio
+async def test_hash_pool_rejects_when_queue_full(client: AsyncClient, monkeypatch):
+    credentials = {"email": "busy@test.com", "password": "mypassword"}
+    response = await client.post("/api/auth/register", json={**credentials, "store_name": "Busy Store"})
+    assert response.status_code == 201
+
+    monkeypatch.setattr(hash_pool, "limit", 0)
+    # Unknown email never reaches the pool
+    response = await client.post("/api/auth/login", json={"email": "nobody@test.com", "password": "x"})
+    assert response.status_code == 401
+
+    response = await client.post("/api/auth/login", json=credentials)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+    monkeypatch.setattr(hash_pool, "limit", 1)
+    response = await client.post("/api/auth/login", json=credentials)
+    assert response.status_code == 200
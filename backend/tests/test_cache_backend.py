@@ -0,0 +1,157 @@
+import uuid
+
+import fakeredis
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product import Product
+from app.models.store_config import StoreConfig
+from app.models.tenant import Tenant
+from app.config import settings
+from app.services.cache import RedisBackend, SharedCache, set_cache_backend
+from app.services.tenant_resolver import clear_tenant_cache
+
+
+@pytest_asyncio.fixture
+async def redis_backend():
+    backend = RedisBackend(fakeredis.FakeAsyncRedis(), prefix=f"test-{uuid.uuid4().hex}")
+    set_cache_backend(backend)
+    yield backend
+    set_cache_backend(None)
+
+
+@pytest.mark.asyncio
+async def test_workers_share_hits_and_invalidations(redis_backend):
+    # Two instances of the same named cache stand in for two uvicorn workers
+    worker_a = SharedCache("tenant", maxsize=10, ttl=60)
+    worker_b = SharedCache("tenant", maxsize=10, ttl=60)
+
+    await worker_a.set("tienda", {"id": 1})
+    assert await worker_b.get("tienda") == {"id": 1}
+    # Stored as JSON, not pickle
+    assert await redis_backend.client.get(f"{redis_backend.prefix}:tenant:tienda") == b'{"id":1}'
+
+    # The bus runs the delete in every worker
+    await worker_b.delete("tienda")
+    await worker_a.delete("tienda")
+    assert await worker_a.get("tienda") is None
+
+    await worker_a.set("a", 1)
+    await worker_a.set("b", 2)
+    await worker_b.clear()
+    worker_a.clear_local()
+    assert await worker_a.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_hot_keys_are_served_from_the_local_tier(redis_backend, monkeypatch):
+    cache = SharedCache("catalog", maxsize=10, ttl=60)
+    await cache.set("t1", {"v": 1})
+    calls = []
+    original_get = redis_backend.get
+
+    async def _counting_get(key):
+        calls.append(key)
+        return await original_get(key)
+
+    monkeypatch.setattr(redis_backend, "get", _counting_get)
+    for _ in range(5):
+        assert await cache.get("t1") == {"v": 1}
+    assert calls == []
+
+    # Past CACHE_LOCAL_TTL the entry is read (and decoded) from Redis again
+    monkeypatch.setattr(settings, "CACHE_LOCAL_TTL", 0)
+    other_worker = SharedCache("catalog", maxsize=10, ttl=60)
+    assert await other_worker.get("t1") == {"v": 1}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_falls_back_to_the_db(redis_backend, client: AsyncClient, test_tenant, db_session: AsyncSession, monkeypatch):
+    db_session.add(StoreConfig(tenant_id=test_tenant.id))
+    await db_session.commit()
+
+    async def _down(*args, **kwargs):
+        raise RedisConnectionError("Connection refused")
+
+    for op in ("get", "set", "delete"):
+        monkeypatch.setattr(redis_backend, op, _down)
+    await clear_tenant_cache()
+
+    response = await client.get(f"/api/store/{test_tenant.slug}/config")
+    assert response.status_code == 200
+    assert response.json()["store_name"] == "Test Store"
+
+
+@pytest.mark.asyncio
+async def test_store_caches_on_redis_follow_writes(redis_backend, auth_client: AsyncClient, client, test_tenant, db_session: AsyncSession):
+    db_session.add(StoreConfig(tenant_id=test_tenant.id))
+    product = Product(tenant_id=test_tenant.id, name="Crema", slug="crema", price=100000, is_active=True)
+    db_session.add(product)
+    await db_session.commit()
+
+    assert (await client.get(f"/api/store/{test_tenant.slug}/config")).json()["store_name"] == "Test Store"
+    offer_url = f"/api/store/{test_tenant.slug}/quantity-offers/{product.id}"
+    assert (await client.get(offer_url)).json() is None
+    keys = {k.decode() async for k in redis_backend.client.scan_iter(match=f"{redis_backend.prefix}:*")}
+    assert f"{redis_backend.prefix}:tenant:{test_tenant.slug}" in keys
+    assert f"{redis_backend.prefix}:offers:{test_tenant.id}" in keys
+
+    await auth_client.post("/api/admin/checkout/offers", json={
+        "name": "Lleva 2",
+        "product_ids": [str(product.id)],
+        "tiers": [{"title": "2", "quantity": 2, "discount_type": "percentage", "discount_value": 10}],
+    })
+    assert (await client.get(offer_url)).json()["name"] == "Lleva 2"
+
+    tenant = (await db_session.execute(select(Tenant).where(Tenant.id == test_tenant.id))).scalar_one()
+    tenant.store_name = "Tienda Redis"
+    await db_session.commit()
+    assert (await client.get(f"/api/store/{test_tenant.slug}/config")).json()["store_name"] == "Tienda Redis"
+
+
+@pytest.mark.asyncio
+async def test_cached_values_round_trip_through_redis(redis_backend, auth_client: AsyncClient, client, test_tenant, db_session: AsyncSession, monkeypatch):
+    # Every read decodes what is in Redis, as a freshly started worker would
+    monkeypatch.setattr(settings, "CACHE_LOCAL_TTL", 0)
+    db_session.add(StoreConfig(tenant_id=test_tenant.id))
+    product = Product(tenant_id=test_tenant.id, name="Crema", slug="crema", price=100000, is_active=True)
+    db_session.add(product)
+    await db_session.commit()
+    await auth_client.post("/api/admin/checkout/offers", json={
+        "name": "Lleva 2",
+        "product_ids": [str(product.id)],
+        "tiers": [{"title": "2", "quantity": 2, "discount_type": "percentage", "discount_value": 10}],
+    })
+    await auth_client.post("/api/admin/upsell-ticks", json={
+        "name": "Garantía", "upsell_price": 9900.5, "link_product": True, "linked_product_id": str(product.id),
+    })
+
+    slug = test_tenant.slug
+    urls = [
+        f"/api/store/{slug}/config",
+        f"/api/store/{slug}/products",
+        f"/api/store/{slug}/products/crema",
+        f"/api/store/{slug}/quantity-offers/{product.id}",
+        f"/api/store/{slug}/upsell-ticks/{product.id}",
+        f"/api/store/{slug}/checkout-bundle/{product.id}",
+    ]
+    first = [(await client.get(url)).json() for url in urls]
+    again = [(await client.get(url)).json() for url in urls]
+    assert again == first
+    assert first[2]["name"] == "Crema" and first[4][0]["linked_product"]["name"] == "Crema"
+
+    # The offer tiers still price orders after the round trip
+    order = await client.post(f"/api/store/{slug}/order", json={
+        "customer_name": "Ana",
+        "customer_phone": "3000000000",
+        "address": "Calle 1",
+        "city": "Cali",
+        "items": [{"product_id": str(product.id), "quantity": 2}],
+    })
+    summary = await client.get(f"/api/store/{slug}/order/{order.json()['order_id']}")
+    assert summary.json()["total"] == 180000
@@ -0,0 +1,65 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models.abandoned_cart import AbandonedCart
+from app.models.tenant import Tenant
+from app.services.cart_capture import cart_buffer
+from tests.conftest import async_session_test
+
+
+@pytest.fixture(autouse=True)
+def test_buffer(monkeypatch):
+    monkeypatch.setattr(cart_buffer, "session_factory", async_session_test)
+    monkeypatch.setattr(cart_buffer, "_pending", {})
+
+
+async def _carts() -> list[AbandonedCart]:
+    async with async_session_test() as session:
+        return (await session.execute(select(AbandonedCart).order_by(AbandonedCart.session_id))).scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_form_fill_is_coalesced_into_one_upsert(client: AsyncClient, test_tenant: Tenant):
+    url = f"/api/store/{test_tenant.slug}/cart/capture"
+    steps = [
+        {"session_id": "s1", "customer_name": "Ana", "last_step": "name"},
+        {"session_id": "s1", "customer_phone": "3001112233", "last_step": "phone"},
+        {"session_id": "s1", "customer_email": "ana@example.com", "last_step": "email"},
+        {"session_id": "s2", "customer_name": "Luis", "last_step": "name"},
+    ]
+    for step in steps:
+        assert (await client.post(url, json=step)).status_code == 200
+    assert await _carts() == []
+    assert len(cart_buffer._pending) == 2
+
+    await cart_buffer.flush()
+    ana, luis = await _carts()
+    assert (ana.customer_name, ana.customer_phone, ana.customer_email, ana.last_step) == (
+        "Ana", "3001112233", "ana@example.com", "email"
+    )
+    assert (luis.customer_name, luis.last_step) == ("Luis", "name")
+
+    # A later window updates the same row; fields it does not send are kept
+    await client.post(url, json={"session_id": "s1", "quantity": 2, "last_step": "quantity"})
+    await cart_buffer.flush()
+    ana, _ = await _carts()
+    assert (ana.customer_name, ana.quantity, ana.last_step) == ("Ana", 2, "quantity")
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_newer_steps(test_tenant: Tenant, monkeypatch):
+    cart_buffer.stage(test_tenant.id, "s1", {"customer_name": "Ana", "last_step": "name"})
+
+    async def _fail(rows):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(cart_buffer, "_write", _fail)
+    await cart_buffer.flush()
+    cart_buffer.stage(test_tenant.id, "s1", {"last_step": "phone"})
+    assert cart_buffer._pending[(test_tenant.id, "s1")] == {"customer_name": "Ana", "last_step": "phone"}
+
+    monkeypatch.delattr(cart_buffer, "_write")
+    await cart_buffer.flush()
+    (cart,) = await _carts()
+    assert (cart.customer_name, cart.last_step) == ("Ana", "phone")
@@ -1,15 +1,22 @@
+import asyncio
+import contextlib
 import uuid
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.main import app
+from app.models.customer import Customer
 from app.models.product import Product
 from app.models.store_config import StoreConfig
 from app.models.tenant import Tenant
+from app.services import catalog_snapshot
+from app.services.single_flight import single_flight
 from app.utils.security import hash_password
+from tests.conftest import engine_test
 
 
 @pytest_asyncio.fixture
@@ -98,3 +105,171 @@ async def test_store_catalog(store_tenant):
     data = response.json()
     assert len(data) >= 1
     assert data[0]["name"] == "Zapatillas"
+
+
+@pytest.mark.asyncio
+async def test_create_order_prices_multiple_items(store_tenant, db_session: AsyncSession):
+    tenant, product = store_tenant
+    extra = Product(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        name="Medias",
+        slug="medias",
+        price=10000,
+        is_active=True,
+    )
+    db_session.add(extra)
+    await db_session.commit()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(f"/api/store/{tenant.slug}/order", json={
+            "customer_name": "Juan Pérez",
+            "customer_phone": "3001234567",
+            "address": "Calle 123 #45-67",
+            "city": "Bogotá",
+            "items": [
+                {"product_id": str(product.id), "quantity": 2},
+                {"product_id": str(extra.id), "quantity": 1},
+                {
+                    "product_id": str(extra.id),
+                    "upsell_tick_id": str(uuid.uuid4()),
+                    "is_upsell_tick": True,
+                    "tick_price": 5000,
+                },
+            ],
+        })
+        assert response.status_code == 200
+        order_id = response.json()["order_id"]
+        summary = await client.get(f"/api/store/{tenant.slug}/order/{order_id}")
+
+    data = summary.json()
+    assert data["total"] == 89900 * 2 + 10000 + 5000
+    assert sorted(i["product_name"] for i in data["items"]) == ["Medias", "Medias", "Zapatillas"]
+
+
+@pytest.mark.asyncio
+async def test_create_order_rejects_unknown_product(store_tenant):
+    tenant, product = store_tenant
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(f"/api/store/{tenant.slug}/order", json={
+            "customer_name": "Juan",
+            "customer_phone": "3001234567",
+            "address": "Calle 1",
+            "city": "Cali",
+            "items": [{"product_id": str(uuid.uuid4()), "quantity": 1}],
+        })
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_order_numbers_are_sequential(store_tenant):
+    tenant, product = store_tenant
+    payload = {
+        "customer_name": "Juan",
+        "customer_phone": "3001234567",
+        "address": "Calle 1",
+        "city": "Cali",
+        "items": [{"product_id": str(product.id), "quantity": 1}],
+    }
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        numbers = [
+            (await client.post(f"/api/store/{tenant.slug}/order", json=payload)).json()["order_number"]
+            for _ in range(3)
+        ]
+    assert numbers == ["ORD-0001", "ORD-0002", "ORD-0003"]
+
+
+@pytest.mark.asyncio
+async def test_orders_upsert_customer_aggregate(store_tenant, db_session: AsyncSession):
+    tenant, product = store_tenant
+    payload = {
+        "customer_name": "Juan",
+        "customer_phone": "3001234567",
+        "address": "Calle 1",
+        "city": "Cali",
+        "items": [{"product_id": str(product.id), "quantity": 1}],
+    }
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post(f"/api/store/{tenant.slug}/order", json=payload)
+        await client.post(f"/api/store/{tenant.slug}/order", json={
+            **payload, "customer_name": "Juan Pérez", "city": "", "items": [{"product_id": str(product.id), "quantity": 2}],
+        })
+
+    customer = (await db_session.execute(select(Customer).where(Customer.tenant_id == tenant.id))).scalar_one()
+    assert customer.total_orders == 2
+    assert float(customer.total_spent) == 89900 * 3
+    assert customer.name == "Juan Pérez"
+    assert customer.city == "Cali"
+    assert customer.last_order_at is not None
+
+
+@pytest.mark.asyncio
+async def test_store_bootstrap(store_tenant):
+    tenant, product = store_tenant
+    transport = ASGITransport(app=app)
+    # A cold bootstrap loads every part on the request's own connection
+    checked_out, peak = 0, 0
+
+    def _checkout(*args):
+        nonlocal checked_out, peak
+        checked_out += 1
+        peak = max(peak, checked_out)
+
+    def _checkin(*args):
+        nonlocal checked_out
+        checked_out -= 1
+
+    event.listen(engine_test.sync_engine, "checkout", _checkout)
+    event.listen(engine_test.sync_engine, "checkin", _checkin)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        try:
+            response = await client.get(f"/api/store/{tenant.slug}/bootstrap")
+        finally:
+            event.remove(engine_test.sync_engine, "checkout", _checkout)
+            event.remove(engine_test.sync_engine, "checkin", _checkin)
+        assert peak == 1
+        assert response.status_code == 200
+        data = response.json()
+        assert data["config"]["store_name"] == "Tienda Checkout"
+        assert [p["name"] for p in data["products"]] == ["Zapatillas"]
+        assert data["checkout_config"] is None
+        assert data["home_page"] is None
+
+        etag = response.headers["etag"]
+        cached = await client.get(f"/api/store/{tenant.slug}/bootstrap", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_concurrent_bootstraps_share_one_rebuild(store_tenant, monkeypatch):
+    tenant, product = store_tenant
+    build = catalog_snapshot._build_snapshot
+    before = single_flight.coalesced["catalog"]
+    builds = 0
+    n = 4  # within the test pool, so no request waits for a connection
+
+    async def _held_build(*args):
+        nonlocal builds
+        builds += 1
+
+        # Hold the rebuild until every other request has joined it
+        async def _all_joined():
+            while single_flight.coalesced["catalog"] - before < n - 1:
+                await asyncio.sleep(0.001)
+
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(_all_joined(), timeout=2)
+        return await build(*args)
+
+    monkeypatch.setattr(catalog_snapshot, "_build_snapshot", _held_build)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        responses = await asyncio.gather(
+            *(client.get(f"/api/store/{tenant.slug}/bootstrap") for _ in range(n))
+        )
+    assert all(r.status_code == 200 for r in responses)
+    assert all(r.json()["products"][0]["name"] == "Zapatillas" for r in responses)
+    assert builds == 1
@@ -0,0 +1,97 @@
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, text
+
+from app.models.checkout_offer import QuantityOffer
+from app.models.tenant import Tenant
+from app.models.upsell import Upsell
+from app.services.counters import CounterBuffer, counter_buffer
+from tests.conftest import async_session_test
+
+
+@pytest.fixture(autouse=True)
+def test_buffer(monkeypatch):
+    monkeypatch.setattr(counter_buffer, "session_factory", async_session_test)
+    monkeypatch.setattr(counter_buffer, "_pending", type(counter_buffer._pending)())
+
+
+@pytest.mark.asyncio
+async def test_impressions_are_buffered_and_flushed_in_batches(client: AsyncClient, test_tenant: Tenant):
+    async with async_session_test() as session:
+        offer = QuantityOffer(tenant_id=test_tenant.id, name="3x2")
+        upsell = Upsell(tenant_id=test_tenant.id, name="Upsell")
+        session.add_all([offer, upsell])
+        await session.commit()
+
+    slug = test_tenant.slug
+    await asyncio.gather(*(
+        client.post(f"/api/store/{slug}/quantity-offers/{offer.id}/impression") for _ in range(25)
+    ))
+    await client.post(f"/api/store/{slug}/upsells/{upsell.id}/impression")
+    await client.post(f"/api/store/{slug}/upsells/{uuid.uuid4()}/impression")  # unknown: ignored
+
+    async with async_session_test() as session:
+        assert (await session.get(QuantityOffer, offer.id)).impressions == 0
+
+    await counter_buffer.flush()
+
+    async with async_session_test() as session:
+        assert (await session.get(QuantityOffer, offer.id)).impressions == 25
+        assert (await session.get(Upsell, upsell.id)).impressions == 1
+
+
+@pytest.mark.asyncio
+async def test_increments_on_commit_only(test_tenant: Tenant):
+    async with async_session_test() as session:
+        offer = QuantityOffer(tenant_id=test_tenant.id, name="2x1")
+        session.add(offer)
+        await session.commit()
+
+    async with async_session_test() as session:
+        await session.execute(text("SELECT 1"))
+        counter_buffer.incr_on_commit(session, "offer_orders", test_tenant.id, offer.id)
+        await session.rollback()
+    async with async_session_test() as session:
+        counter_buffer.incr_on_commit(session, "offer_orders", test_tenant.id, offer.id)
+        await session.commit()
+    # Another tenant's id does not touch this tenant's row
+    counter_buffer.incr("offer_orders", uuid.uuid4(), offer.id)
+    await counter_buffer.flush()
+
+    async with async_session_test() as session:
+        count = await session.scalar(select(QuantityOffer.orders_count).where(QuantityOffer.id == offer.id))
+    assert count == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_flushes_keep_counts_up_to_the_cap(test_tenant: Tenant):
+    async with async_session_test() as session:
+        offer = QuantityOffer(tenant_id=test_tenant.id, name="3x2")
+        session.add(offer)
+        await session.commit()
+
+    def _unavailable():
+        raise ConnectionError("database unavailable")
+
+    buffer = CounterBuffer(_unavailable, interval=60, max_keys=100, capacity=2)
+    buffer.incr("offer_impressions", test_tenant.id, offer.id, 3)
+    await buffer.flush()
+    buffer.incr("offer_impressions", test_tenant.id, offer.id)  # existing key: still counted
+    buffer.incr("offer_orders", test_tenant.id, offer.id)
+    buffer.incr("upsell_impressions", test_tenant.id, uuid.uuid4(), 5)  # past the cap
+    assert buffer.stats() == {"buffered": 2, "dropped": 5, "failed_flushes": 1}
+
+    buffer.session_factory = async_session_test
+    await buffer.flush()
+    async with async_session_test() as session:
+        saved = await session.get(QuantityOffer, offer.id)
+        assert (saved.impressions, saved.orders_count) == (4, 1)
+
+
+@pytest.mark.asyncio
+async def test_malformed_offer_id_is_rejected(client: AsyncClient, test_tenant: Tenant):
+    response = await client.post(f"/api/store/{test_tenant.slug}/quantity-offers/not-a-uuid/impression")
+    assert response.status_code == 422
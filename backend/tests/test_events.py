@@ -0,0 +1,80 @@
+import json
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.models.abandoned_cart import AbandonedCart
+from app.models.checkout_offer import QuantityOffer
+from app.models.store_visit import StoreVisit
+from app.models.tenant import Tenant
+from app.models.upsell_tick import UpsellTick
+from app.services.cart_capture import cart_buffer
+from app.services.counters import counter_buffer
+from app.services.visit_ingest import visit_buffer
+from tests.conftest import async_session_test, engine_test
+
+
+@pytest.fixture(autouse=True)
+def test_buffer(monkeypatch):
+    monkeypatch.setattr(counter_buffer, "session_factory", async_session_test)
+    monkeypatch.setattr(counter_buffer, "_pending", type(counter_buffer._pending)())
+    monkeypatch.setattr(visit_buffer, "engine", engine_test)
+    monkeypatch.setattr(visit_buffer, "_rows", type(visit_buffer._rows)())
+    monkeypatch.setattr(cart_buffer, "session_factory", async_session_test)
+    monkeypatch.setattr(cart_buffer, "_pending", {})
+
+
+@pytest.mark.asyncio
+async def test_beacon_batch_is_recorded(client: AsyncClient, test_tenant: Tenant):
+    async with async_session_test() as session:
+        offer = QuantityOffer(tenant_id=test_tenant.id, name="3x2")
+        tick = UpsellTick(tenant_id=test_tenant.id, name="Garantía")
+        session.add_all([offer, tick])
+        await session.commit()
+
+    events = [
+        {"type": "view", "path": "/producto/zapatillas", "utm_source": "facebook"},
+        {"type": "impression", "target": "quantity_offer", "id": str(offer.id)},
+        {"type": "impression", "target": "quantity_offer", "id": str(offer.id)},
+        {"type": "tick_shown", "id": str(tick.id)},
+        {"type": "cart_step", "session_id": "s1", "customer_name": "Ana", "last_step": "name"},
+        {"type": "cart_step", "session_id": "s1", "customer_phone": "3001112233", "last_step": "phone"},
+    ]
+    # sendBeacon posts a text/plain body
+    response = await client.post(
+        f"/api/store/{test_tenant.slug}/events",
+        content=json.dumps(events),
+        headers={"Content-Type": "text/plain;charset=UTF-8"},
+    )
+    assert response.status_code == 204
+
+    await counter_buffer.flush()
+    await visit_buffer.flush()
+    await cart_buffer.flush()
+    async with async_session_test() as session:
+        assert (await session.get(QuantityOffer, offer.id)).impressions == 2
+        assert (await session.get(UpsellTick, tick.id)).impressions == 1
+        visit = (await session.execute(select(StoreVisit))).scalar_one()
+        assert (visit.page_path, visit.utm_source) == ("/producto/zapatillas", "facebook")
+        cart = (await session.execute(select(AbandonedCart))).scalar_one()
+        assert (cart.customer_name, cart.customer_phone, cart.last_step) == ("Ana", "3001112233", "phone")
+
+
+@pytest.mark.asyncio
+async def test_beacon_rejects_invalid_batches(client: AsyncClient, test_tenant: Tenant):
+    url = f"/api/store/{test_tenant.slug}/events"
+    response = await client.post(url, content=json.dumps([{"type": "teleport"}]))
+    assert response.status_code == 422
+    response = await client.post(url, content="not json")
+    assert response.status_code == 422
+    too_many = [{"type": "tick_shown", "id": str(uuid.uuid4())}] * 51
+    response = await client.post(url, content=json.dumps(too_many))
+    assert response.status_code == 413
+
+    async with async_session_test() as session:
+        assert await session.scalar(select(func.count()).select_from(StoreVisit)) == 0
+    assert not counter_buffer._pending
+    assert not visit_buffer._rows
+    assert not cart_buffer._pending
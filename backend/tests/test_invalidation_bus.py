@@ -0,0 +1,70 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+from app.services import invalidation_bus
+from app.services.invalidation_bus import InvalidationEvent, InvalidationListener, publish, subscribe
+
+received: list[InvalidationEvent] = []
+
+
+async def _record(tenant_id: uuid.UUID, entity_id: str | None) -> None:
+    received.append(InvalidationEvent(tenant_id, "test_entity", entity_id))
+
+
+subscribe("test_entity", _record)
+
+
+@pytest.mark.asyncio
+async def test_publish_dispatches_after_commit_only(db_session: AsyncSession):
+    received.clear()
+    tenant_id = uuid.uuid4()
+
+    await db_session.execute(text("SELECT 1"))
+    publish(db_session, tenant_id, "test_entity", "a")
+    publish(db_session, tenant_id, "test_entity", "a")
+    assert received == []
+    await db_session.commit()
+    assert received == [InvalidationEvent(tenant_id, "test_entity", "a")]
+
+    await db_session.execute(text("SELECT 1"))
+    publish(db_session, tenant_id, "test_entity", "b")
+    await db_session.rollback()
+    await db_session.commit()
+    assert len(received) == 1
+
+
+@pytest.mark.asyncio
+async def test_listener_dispatches_notifications():
+    received.clear()
+    tenant_id = uuid.uuid4()
+    listener = InvalidationListener("postgresql://unused", "minishop_cache")
+
+    listener._on_notify(None, 1, "minishop_cache", InvalidationEvent(tenant_id, "test_entity", "x").to_payload())
+    listener._on_notify(None, 1, "minishop_cache", "not json")
+    await asyncio.sleep(0)
+
+    assert received == [InvalidationEvent(tenant_id, "test_entity", "x")]
+
+
+@pytest.mark.asyncio
+async def test_listener_uses_the_direct_listen_url(monkeypatch):
+    dsns = []
+    monkeypatch.setattr(invalidation_bus.InvalidationListener, "start", lambda self: dsns.append(self.dsn))
+    pooled = create_async_engine("postgresql+asyncpg://shop:pw@pgbouncer:6432/minishop")
+    try:
+        await invalidation_bus.start_listener(pooled)
+        monkeypatch.setattr(settings, "CACHE_LISTEN_DATABASE_URL", "postgresql+asyncpg://shop:pw@postgres:5432/minishop")
+        await invalidation_bus.start_listener(pooled)
+    finally:
+        invalidation_bus._listener = None
+        await pooled.dispose()
+
+    assert dsns == [
+        "postgresql://shop:pw@pgbouncer:6432/minishop",
+        "postgresql://shop:pw@postgres:5432/minishop",
+    ]
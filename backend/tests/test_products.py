@@ -1,6 +1,13 @@
+import io
+
 import pytest
 from httpx import AsyncClient
 
+from app.services import image_upload
+from app.services import storage as storage_module
+from app.services.image_derivatives import render_derivatives
+from app.services.storage import LocalStorage
+
 
 @pytest.mark.asyncio
 async def test_create_product(auth_client: AsyncClient):
@@ -64,3 +71,52 @@ async def test_create_variant(auth_client: AsyncClient):
 async def test_unauthorized_access(client: AsyncClient):
     response = await client.get("/api/admin/products")
     assert response.status_code in (401, 403)
+
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+@pytest.mark.asyncio
+async def test_product_image_srcset(auth_client: AsyncClient, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module, "_storage", LocalStorage(str(tmp_path)))
+
+    async def fake_derivatives(source_path: str, key: str) -> list[dict]:
+        with open(source_path, "rb") as source:
+            assert source.read() == PNG_HEADER + bytes(64)
+        stem = key.rsplit(".", 1)[0]
+        return [
+            {"width": w, "format": fmt, "url": f"/uploads/{stem}_{w}w.{ext}"}
+            for w in (160, 480)
+            for fmt, ext in (("webp", "webp"), ("png", "png"))
+        ]
+
+    monkeypatch.setattr(image_upload, "create_derivatives", fake_derivatives)
+    product = (await auth_client.post("/api/admin/products", json={"name": "Foto", "price": 1000})).json()
+
+    response = await auth_client.post(
+        f"/api/admin/products/{product['id']}/images",
+        files={"file": ("foto.png", PNG_HEADER + bytes(64), "image/png")},
+    )
+    assert response.status_code == 201
+    image = response.json()
+    stem = image["image_url"].rsplit(".", 1)[0]
+    assert image["srcset"] == f"{stem}_160w.png 160w, {stem}_480w.png 480w"
+    assert image["srcset_webp"] == f"{stem}_160w.webp 160w, {stem}_480w.webp 480w"
+
+    listed = (await auth_client.get(f"/api/admin/products/{product['id']}")).json()
+    assert listed["images"][0]["srcset_webp"] == image["srcset_webp"]
+
+
+def test_render_derivatives_resizes_and_encodes_webp(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    source = tmp_path / "red.jpg"
+    Image.new("RGB", (1000, 500), "red").save(source, "JPEG")
+
+    rendered = render_derivatives(str(source), (160, 480, 960, 1600), 80)
+
+    assert [(w, fmt) for w, fmt, _ in rendered] == [
+        (160, "webp"), (160, "jpeg"), (480, "webp"), (480, "jpeg"), (960, "webp"), (960, "jpeg"),
+    ]
+    with Image.open(io.BytesIO(rendered[0][2])) as thumb:
+        assert thumb.format == "WEBP"
+        assert thumb.size == (160, 80)
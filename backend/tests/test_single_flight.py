@@ -0,0 +1,111 @@
+import asyncio
+import contextlib
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.services import catalog_snapshot
+from app.services.single_flight import SingleFlight, single_flight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.run(("t1", "products"), load) for _ in range(20)))
+    assert results == [1] * 20
+    assert calls == 1
+    assert flight.stats() == {"products": {"leader": 1, "coalesced": 19}}
+
+    # Finished flights are not reused
+    assert await flight.run(("t1", "products"), load) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter_and_cancelled_leader_keeps_load_alive():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    results = await asyncio.gather(*(flight.run(("t1", "config"), boom) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "ok"
+
+    leader = asyncio.create_task(flight.run(("t1", "home_page"), slow))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.run(("t1", "home_page"), slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+    assert await follower == "ok"
+
+
+@pytest.mark.asyncio
+async def test_session_flight_leader_loads_on_callers_session_and_hands_over():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    sessions = []
+
+    async def load(session):
+        sessions.append(session)
+        await release.wait()
+        return session
+
+    leader = asyncio.create_task(flight.run_on_session(("t1", "config"), "leader-db", load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.run_on_session(("t1", "config"), "follower-db", load))
+    await asyncio.sleep(0)
+    assert sessions == ["leader-db"]
+
+    # The leader's request goes away: the waiter reloads on its own session
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await follower == "follower-db"
+    assert sessions == ["leader-db", "follower-db"]
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_storefront_flights(client: AsyncClient, test_tenant, monkeypatch):
+    before = single_flight.stats().get("catalog", {"leader": 0, "coalesced": 0})
+    build = catalog_snapshot._build_snapshot
+    n = 10
+
+    async def _held_build(*args):
+        # Hold the leader's rebuild until every other request has joined it
+        async def _all_joined():
+            while single_flight.coalesced["catalog"] - before["coalesced"] < n - 1:
+                await asyncio.sleep(0.001)
+
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(_all_joined(), timeout=2)
+        return await build(*args)
+
+    monkeypatch.setattr(catalog_snapshot, "_build_snapshot", _held_build)
+    responses = await asyncio.gather(*(client.get(f"/api/store/{test_tenant.slug}/products") for _ in range(n)))
+    assert all(r.status_code == 200 for r in responses)
+
+    assert (await client.get("/api/metrics")).status_code == 404
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    assert (await client.get("/api/metrics")).status_code == 403
+    assert (await client.get("/api/metrics", headers={"X-Metrics-Token": "nope"})).status_code == 403
+
+    metrics = await client.get("/api/metrics", headers={"X-Metrics-Token": "s3cret"})
+    after = metrics.json()["single_flight"]["catalog"]
+    assert after["leader"] - before["leader"] == 1
+    assert after["coalesced"] - before["coalesced"] == n - 1
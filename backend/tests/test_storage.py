@@ -0,0 +1,237 @@
+import asyncio
+import os
+import threading
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.api.admin import media
+from app.config import settings
+from app.models.media_object import MediaObject
+from app.models.store_config import StoreConfig
+from app.services.media_library import release_media
+from app.services import storage as storage_module
+from app.services.storage import LocalStorage, R2Storage
+from tests.conftest import async_session_test
+
+
+class FakeS3:
+    """Records S3 calls; upload_part blocks until several parts are in flight."""
+
+    def __init__(self, fail_part: int | None = None):
+        self.fail_part = fail_part
+        self.parts: dict[int, bytes] = {}
+        self.completed = None
+        self.aborted = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def create_multipart_upload(self, **kwargs):
+        return {"UploadId": "up-1"}
+
+    def upload_part(self, PartNumber, Body, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        threading.Event().wait(0.05)
+        with self._lock:
+            self.in_flight -= 1
+        if PartNumber == self.fail_part:
+            raise RuntimeError("part failed")
+        self.parts[PartNumber] = Body
+        return {"ETag": f'"etag-{PartNumber}"'}
+
+    def complete_multipart_upload(self, MultipartUpload, **kwargs):
+        self.completed = MultipartUpload["Parts"]
+
+    def abort_multipart_upload(self, **kwargs):
+        self.aborted = True
+
+
+async def _chunks(content: bytes, size: int = 7):
+    for offset in range(0, len(content), size):
+        yield content[offset:offset + size]
+
+
+def _r2(client: FakeS3) -> R2Storage:
+    storage = R2Storage.__new__(R2Storage)
+    storage.bucket = "bucket"
+    storage.public_url = "https://cdn.example"
+    storage.client = client
+    return storage
+
+
+@pytest.mark.asyncio
+async def test_local_storage_roundtrip(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    url = await storage.upload_stream(_chunks(b"img"), "t1/products/a.jpg", "image/jpeg")
+    assert url == "/uploads/t1/products/a.jpg"
+    assert (tmp_path / "t1/products/a.jpg").read_bytes() == b"img"
+
+    await storage.delete("t1/products/a.jpg")
+    assert not os.path.exists(tmp_path / "t1/products/a.jpg")
+    await storage.delete("t1/products/a.jpg")  # already gone
+
+
+@pytest.mark.asyncio
+async def test_r2_multipart_uploads_parts_concurrently(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_MULTIPART_CHUNK_SIZE", 10)
+    monkeypatch.setattr(settings, "STORAGE_MULTIPART_CONCURRENCY", 3)
+    client = FakeS3()
+    content = bytes(range(45))
+
+    url = await _r2(client).upload_stream(_chunks(content), "media/t1/big.png", "image/png")
+
+    assert url == "https://cdn.example/media/t1/big.png"
+    assert [p["PartNumber"] for p in client.completed] == [1, 2, 3, 4, 5]
+    assert b"".join(client.parts[n] for n in sorted(client.parts)) == content
+    assert 1 < client.max_in_flight <= 3
+
+
+@pytest.mark.asyncio
+async def test_r2_multipart_aborts_on_failed_part(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_MULTIPART_CHUNK_SIZE", 10)
+    client = FakeS3(fail_part=2)
+
+    with pytest.raises(RuntimeError):
+        await _r2(client).upload_stream(_chunks(bytes(30)), "media/t1/big.png", "image/png")
+    await asyncio.sleep(0)
+    assert client.aborted
+    assert client.completed is None
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(100)
+
+
+@pytest.mark.asyncio
+async def test_media_upload_streams_and_sniffs(auth_client: AsyncClient, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module, "_storage", LocalStorage(str(tmp_path)))
+    monkeypatch.setattr(media, "MAX_FILE_SIZE", 150 * 1024)
+
+    response = await auth_client.post(
+        "/api/admin/media/upload", files={"file": ("a.png", PNG + bytes(100 * 1024), "image/png")}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["size"] == len(PNG) + 100 * 1024
+    assert os.path.getsize(tmp_path / data["url"].removeprefix("/uploads/")) == data["size"]
+
+    # Declared as PNG, but the bytes are not an image
+    response = await auth_client.post(
+        "/api/admin/media/upload", files={"file": ("b.png", b"<html>hi</html>", "image/png")}
+    )
+    assert response.status_code == 400
+
+    # Over the limit: rejected mid-stream, nothing left on disk
+    response = await auth_client.post(
+        "/api/admin/media/upload", files={"file": ("c.png", PNG + bytes(200 * 1024), "image/png")}
+    )
+    assert response.status_code == 400
+    stored = [p for p in tmp_path.rglob("*") if p.is_file()]
+    assert [p.name for p in stored] == [data["filename"]]
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_refcounted_object(auth_client: AsyncClient, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module, "_storage", LocalStorage(str(tmp_path)))
+    product = (await auth_client.post("/api/admin/products", json={"name": "Dup", "price": 1000})).json()
+
+    media_url = (await auth_client.post(
+        "/api/admin/media/upload", files={"file": ("banner.png", PNG, "image/png")}
+    )).json()["url"]
+    images = []
+    for name in ("a.png", "b.png"):
+        response = await auth_client.post(
+            f"/api/admin/products/{product['id']}/images", files={"file": (name, PNG, "image/png")}
+        )
+        images.append(response.json())
+
+    assert images[0]["image_url"] == images[1]["image_url"] == media_url
+    stored = [p for p in tmp_path.rglob("*") if p.is_file()]
+    assert len(stored) == 1
+    async with async_session_test() as session:
+        media_row = (await session.execute(select(MediaObject))).scalar_one()
+    assert media_row.ref_count == 3
+
+    for image in images:
+        response = await auth_client.delete(f"/api/admin/products/{product['id']}/images/{image['id']}")
+        assert response.status_code == 204
+    # The media upload still references it
+    assert stored[0].exists()
+
+    async with async_session_test() as session:
+        await release_media(session, media_row.tenant_id, media_url)
+        assert stored[0].exists()  # only once committed
+        await session.commit()
+        assert (await session.execute(select(MediaObject))).first() is None
+    assert not stored[0].exists()
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_product_releases_its_images(auth_client: AsyncClient, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module, "_storage", LocalStorage(str(tmp_path)))
+    product = (await auth_client.post("/api/admin/products", json={"name": "Temporal", "price": 1000})).json()
+    for name in ("a.png", "b.png"):
+        await auth_client.post(f"/api/admin/products/{product['id']}/images", files={"file": (name, PNG, "image/png")})
+    first = [p for p in tmp_path.rglob("*") if p.is_file()]
+    assert len(first) == 1
+
+    assert (await auth_client.delete(f"/api/admin/products/{product['id']}")).status_code == 204
+    async with async_session_test() as session:
+        assert (await session.execute(select(MediaObject))).first() is None
+    assert not first[0].exists()
+
+    # Uploading the same content again gets a new object of its own, so a
+    # release still finishing for the old one cannot delete it
+    other = (await auth_client.post("/api/admin/products", json={"name": "Otro", "price": 1000})).json()
+    image = (await auth_client.post(
+        f"/api/admin/products/{other['id']}/images", files={"file": ("a.png", PNG, "image/png")}
+    )).json()
+    (second,) = [p for p in tmp_path.rglob("*") if p.is_file()]
+    assert second != first[0]
+    assert image["image_url"].endswith(second.name)
+
+
+@pytest.mark.asyncio
+async def test_replacing_the_logo_releases_the_old_one(auth_client: AsyncClient, test_tenant, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module, "_storage", LocalStorage(str(tmp_path)))
+    async with async_session_test() as session:
+        session.add(StoreConfig(tenant_id=test_tenant.id))
+        await session.commit()
+
+    first = (await auth_client.post("/api/admin/config/logo", files={"file": ("a.png", PNG, "image/png")})).json()
+    (old_blob,) = [p for p in tmp_path.rglob("*") if p.is_file()]
+
+    second = (await auth_client.post(
+        "/api/admin/config/logo", files={"file": ("b.png", PNG + b"new", "image/png")}
+    )).json()
+    assert second["logo_url"] != first["logo_url"]
+    assert not old_blob.exists()
+    async with async_session_test() as session:
+        keys = (await session.execute(select(MediaObject.key))).scalars().all()
+    assert [second["logo_url"].endswith(key) for key in keys] == [True]
+
+    # Clearing the logo through the config form releases it too
+    assert (await auth_client.put("/api/admin/config", json={"logo_url": None})).status_code == 200
+    assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
+
+
+@pytest.mark.asyncio
+async def test_page_design_releases_dropped_and_deleted_media(auth_client: AsyncClient, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module, "_storage", LocalStorage(str(tmp_path)))
+    urls = [
+        (await auth_client.post("/api/admin/media/upload", files={"file": (name, PNG + name.encode(), "image/png")})).json()["url"]
+        for name in ("hero.png", "banner.png")
+    ]
+    design = (await auth_client.post("/api/admin/page-designs", json={"title": "Promo", "page_type": "custom"})).json()
+    html = "".join(f'<img src="{url}">' for url in urls)
+    await auth_client.put(f"/api/admin/page-designs/{design['id']}", json={"html_content": html})
+
+    # Dropping one image from the page releases it; the other stays
+    await auth_client.put(f"/api/admin/page-designs/{design['id']}", json={"html_content": f'<img src="{urls[1]}">'})
+    assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == [urls[1].rsplit("/", 1)[-1]]
+
+    assert (await auth_client.delete(f"/api/admin/page-designs/{design['id']}")).status_code == 204
+    assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
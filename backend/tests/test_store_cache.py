@@ -0,0 +1,287 @@
+import uuid
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.store import bootstrap, catalog
+from app.main import app
+from app.models.product import Product
+from app.models.store_config import StoreConfig
+from app.models.tenant import Tenant
+from app.services.tenant_resolver import clear_tenant_cache
+from tests.conftest import engine_test
+
+
+@pytest_asyncio.fixture
+async def cached_store(db_session: AsyncSession):
+    await clear_tenant_cache()
+    tenant = Tenant(
+        id=uuid.uuid4(),
+        email="cache@test.com",
+        password_hash="x",
+        store_name="Tienda Cache",
+        slug="tienda-cache",
+        country="CO",
+    )
+    db_session.add(tenant)
+    await db_session.flush()
+    db_session.add(StoreConfig(tenant_id=tenant.id))
+    await db_session.commit()
+    return tenant
+
+
+@pytest_asyncio.fixture
+async def store_client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_tenant_rename_invalidates_cache(cached_store, store_client, db_session: AsyncSession):
+    response = await store_client.get(f"/api/store/{cached_store.slug}/config")
+    assert response.status_code == 200
+    assert response.json()["store_name"] == "Tienda Cache"
+
+    tenant = (await db_session.execute(select(Tenant).where(Tenant.id == cached_store.id))).scalar_one()
+    tenant.store_name = "Tienda Renombrada"
+    await db_session.commit()
+
+    response = await store_client.get(f"/api/store/{cached_store.slug}/config")
+    assert response.json()["store_name"] == "Tienda Renombrada"
+
+
+@pytest.mark.asyncio
+async def test_deactivated_tenant_is_not_served(cached_store, store_client, db_session: AsyncSession):
+    assert (await store_client.get(f"/api/store/{cached_store.slug}/products")).status_code == 200
+
+    tenant = (await db_session.execute(select(Tenant).where(Tenant.id == cached_store.id))).scalar_one()
+    tenant.is_active = False
+    await db_session.commit()
+
+    assert (await store_client.get(f"/api/store/{cached_store.slug}/products")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_unknown_slug_becomes_visible_after_register(store_client, db_session: AsyncSession):
+    await clear_tenant_cache()
+    assert (await store_client.get("/api/store/nueva-tienda/products")).status_code == 404
+
+    db_session.add(Tenant(
+        email="nueva@test.com",
+        password_hash="x",
+        store_name="Nueva Tienda",
+        slug="nueva-tienda",
+    ))
+    await db_session.commit()
+
+    assert (await store_client.get("/api/store/nueva-tienda/products")).status_code == 200
+
+
+@pytest_asyncio.fixture
+async def offer_product(db_session: AsyncSession, test_tenant: Tenant):
+    product = Product(
+        id=uuid.uuid4(),
+        tenant_id=test_tenant.id,
+        name="Crema",
+        slug="crema",
+        price=100000,
+        is_active=True,
+    )
+    db_session.add(product)
+    await db_session.commit()
+    return product
+
+
+@pytest.mark.asyncio
+async def test_offer_index_follows_admin_writes(auth_client: AsyncClient, store_client, test_tenant, offer_product):
+    url = f"/api/store/{test_tenant.slug}/quantity-offers/{offer_product.id}"
+    assert (await store_client.get(url)).json() is None
+
+    created = await auth_client.post("/api/admin/checkout/offers", json={
+        "name": "Lleva 2",
+        "product_ids": [str(offer_product.id)],
+        "tiers": [
+            {"title": "1", "quantity": 1},
+            {"title": "2", "quantity": 2, "discount_type": "percentage", "discount_value": 10},
+            {"title": "3", "quantity": 3, "discount_type": "fixed", "discount_value": 30000},
+        ],
+    })
+    assert created.status_code == 201
+    offer_id = created.json()["id"]
+    offer = (await store_client.get(url)).json()
+    assert offer["id"] == offer_id
+    assert "impressions" not in offer and "orders_count" not in offer
+
+    order = await store_client.post(f"/api/store/{test_tenant.slug}/order", json={
+        "customer_name": "Ana",
+        "customer_phone": "3000000000",
+        "address": "Calle 1",
+        "city": "Cali",
+        "items": [{"product_id": str(offer_product.id), "quantity": 2}],
+    })
+    summary = await store_client.get(f"/api/store/{test_tenant.slug}/order/{order.json()['order_id']}")
+    assert summary.json()["total"] == 180000
+
+    await auth_client.patch(f"/api/admin/checkout/offers/{offer_id}/toggle")
+    assert (await store_client.get(url)).json() is None
+
+
+@pytest.mark.asyncio
+async def test_upsell_tick_index_matches_by_trigger(auth_client: AsyncClient, store_client, test_tenant, offer_product):
+    other_id = str(uuid.uuid4())
+    await auth_client.post("/api/admin/upsell-ticks", json={"name": "Todos", "priority": 1})
+    await auth_client.post("/api/admin/upsell-ticks", json={
+        "name": "Especifico",
+        "priority": 5,
+        "trigger_type": "specific",
+        "trigger_product_ids": [str(offer_product.id)],
+    })
+    hidden = await auth_client.post("/api/admin/upsell-ticks", json={
+        "name": "Otro producto",
+        "trigger_type": "specific",
+        "trigger_product_ids": [other_id],
+    })
+
+    url = f"/api/store/{test_tenant.slug}/upsell-ticks/{offer_product.id}"
+    assert [t["name"] for t in (await store_client.get(url)).json()] == ["Especifico", "Todos"]
+
+    other_url = f"/api/store/{test_tenant.slug}/upsell-ticks/{other_id}"
+    assert [t["name"] for t in (await store_client.get(other_url)).json()] == ["Todos", "Otro producto"]
+
+    await auth_client.delete(f"/api/admin/upsell-ticks/{hidden.json()['id']}")
+    assert [t["name"] for t in (await store_client.get(other_url)).json()] == ["Todos"]
+
+
+@pytest.mark.asyncio
+async def test_upsell_index_follows_toggle(auth_client: AsyncClient, store_client, test_tenant, offer_product):
+    await auth_client.get("/api/admin/upsells/config")
+    created = await auth_client.post("/api/admin/upsells", json={
+        "name": "Upsell Crema",
+        "upsell_product_id": str(offer_product.id),
+    })
+
+    url = f"/api/store/{test_tenant.slug}/upsells/{uuid.uuid4()}"
+    upsells = (await store_client.get(url)).json()["upsells"]
+    assert [u["name"] for u in upsells] == ["Upsell Crema"]
+    assert upsells[0]["upsell_product"]["name"] == "Crema"
+
+    await auth_client.patch(f"/api/admin/upsells/{created.json()['id']}/toggle")
+    assert (await store_client.get(url)).json()["upsells"] == []
+
+
+@pytest.mark.asyncio
+async def test_upsell_tick_lists_are_enriched_in_batch(auth_client: AsyncClient, store_client, test_tenant, offer_product):
+    for i in range(3):
+        await auth_client.post("/api/admin/upsell-ticks", json={
+            "name": f"Tick {i}",
+            "link_product": True,
+            "linked_product_id": str(offer_product.id),
+        })
+    await auth_client.post("/api/admin/upsell-ticks", json={"name": "Sin producto"})
+
+    admin_ticks = (await auth_client.get("/api/admin/upsell-ticks")).json()
+    linked = {t["name"]: t["linked_product"] for t in admin_ticks}
+    assert linked["Sin producto"] is None
+    assert all(linked[f"Tick {i}"]["name"] == "Crema" for i in range(3))
+
+    store_ticks = (await store_client.get(f"/api/store/{test_tenant.slug}/upsell-ticks/{offer_product.id}")).json()
+    assert sum(1 for t in store_ticks if t["linked_product"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_checkout_bundle_follows_admin_writes(auth_client: AsyncClient, store_client, test_tenant, offer_product):
+    url = f"/api/store/{test_tenant.slug}/checkout-bundle/{offer_product.id}"
+    bundle = (await store_client.get(url)).json()
+    assert bundle["product"]["name"] == "Crema"
+    assert bundle["quantity_offer"] is None
+    assert bundle["upsell_ticks"] == []
+
+    await auth_client.post("/api/admin/checkout/offers", json={
+        "name": "Lleva 2",
+        "product_ids": [str(offer_product.id)],
+        "tiers": [{"title": "2", "quantity": 2, "discount_type": "percentage", "discount_value": 10}],
+    })
+    await auth_client.post("/api/admin/upsell-ticks", json={"name": "Todos"})
+    await auth_client.put(f"/api/admin/products/{offer_product.id}", json={"price": 90000})
+
+    response = await store_client.get(url)
+    bundle = response.json()
+    assert bundle["product"]["price"] == 90000
+    assert bundle["quantity_offer"]["name"] == "Lleva 2"
+    assert [t["name"] for t in bundle["upsell_ticks"]] == ["Todos"]
+
+    cached = await store_client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+    assert (await store_client.get(f"/api/store/{test_tenant.slug}/checkout-bundle/{uuid.uuid4()}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_store_etag_changes_on_admin_write(auth_client: AsyncClient, store_client, test_tenant, offer_product):
+    url = f"/api/store/{test_tenant.slug}/products"
+    first = await store_client.get(url)
+    assert "stale-while-revalidate" in first.headers["cache-control"]
+    etag = first.headers["etag"]
+
+    # Tenant and content version are both cached: the 304 costs no query
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine_test.sync_engine, "before_cursor_execute", _count)
+    try:
+        assert (await store_client.get(url, headers={"If-None-Match": etag})).status_code == 304
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", _count)
+    assert statements == []
+
+    await auth_client.put(f"/api/admin/products/{offer_product.id}", json={"name": "Crema Nueva"})
+
+    fresh = await store_client.get(url, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert fresh.json()[0]["name"] == "Crema Nueva"
+
+
+@pytest.mark.asyncio
+async def test_catalog_snapshot_rebuilds_after_product_write(auth_client: AsyncClient, store_client, test_tenant, offer_product):
+    base = f"/api/store/{test_tenant.slug}/products"
+    assert [p["slug"] for p in (await store_client.get(base)).json()] == ["crema"]
+    assert (await store_client.get(f"{base}/crema")).json()["price"] == 100000
+
+    await auth_client.put(f"/api/admin/products/{offer_product.id}", json={"name": "Crema Facial", "price": 95000})
+
+    products = (await store_client.get(base)).json()
+    assert [p["slug"] for p in products] == ["crema-facial"]
+    assert (await store_client.get(f"{base}/crema")).status_code == 404
+    product = await store_client.get(f"{base}/crema-facial")
+    assert product.json()["price"] == 95000
+    assert product.headers["content-type"] == "application/json"
+
+
+@pytest.mark.asyncio
+async def test_missing_checkout_config_is_cached(cached_store, store_client, monkeypatch):
+    load = catalog.load_checkout_config_payload
+    calls = 0
+
+    async def _counting_load(tenant, db):
+        nonlocal calls
+        calls += 1
+        return await load(tenant, db)
+
+    monkeypatch.setattr(catalog, "load_checkout_config_payload", _counting_load)
+    monkeypatch.setattr(bootstrap, "load_checkout_config_payload", _counting_load)
+
+    for _ in range(2):
+        response = await store_client.get(f"/api/store/{cached_store.slug}/checkout-config")
+        assert response.status_code == 200
+        assert response.json() is None
+    response = await store_client.get(f"/api/store/{cached_store.slug}/bootstrap")
+    assert response.json()["checkout_config"] is None
+    # The empty result is cached under the route's ETag, which bootstrap shares
+    assert calls == 1
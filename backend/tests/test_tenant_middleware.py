@@ -0,0 +1,75 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.middleware.tenant import TenantMiddleware
+from app.models.tenant import Tenant, TenantDomain
+from app.services.host_resolver import HostMap
+from tests.conftest import async_session_test
+
+
+async def _whoami(request: Request):
+    tenant_id = request.state.tenant_id
+    return JSONResponse({"tenant_id": str(tenant_id) if tenant_id else None})
+
+
+def _client(host_map: HostMap) -> AsyncClient:
+    app = TenantMiddleware(Starlette(routes=[Route("/", _whoami)]), host_map=host_map)
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_resolves_slug_subdomain_and_verified_domain(db_session: AsyncSession, test_tenant: Tenant):
+    db_session.add(TenantDomain(tenant_id=test_tenant.id, domain="tienda.com", is_verified=True))
+    db_session.add(TenantDomain(tenant_id=test_tenant.id, domain="pending.com", is_verified=False))
+    await db_session.commit()
+
+    host_map = HostMap(async_session_test, ttl=60)
+    expected = {"tenant_id": str(test_tenant.id)}
+    async with _client(host_map) as client:
+        assert (await client.get("/", headers={"X-Store-Slug": "test-store"})).json() == expected
+        assert (await client.get("/", headers={"Host": "test-store.minishop.co"})).json() == expected
+        assert (await client.get("/", headers={"Host": "Tienda.com:443"})).json() == expected
+        assert (await client.get("/", headers={"Host": "pending.com"})).json() == {"tenant_id": None}
+        assert (await client.get("/", headers={"Host": "localhost:8000"})).json() == {"tenant_id": None}
+        # An unknown header slug falls back to the Host header
+        headers = {"X-Store-Slug": "gone", "Host": "tienda.com"}
+        assert (await client.get("/", headers=headers)).json() == expected
+
+
+@pytest.mark.asyncio
+async def test_host_change_refreshes_only_that_tenant(db_session: AsyncSession, test_tenant: Tenant, monkeypatch):
+    domain = TenantDomain(tenant_id=test_tenant.id, domain="nueva.com", is_verified=False)
+    db_session.add(domain)
+    await db_session.commit()
+
+    host_map = HostMap(async_session_test, ttl=3600)
+    async with _client(host_map) as client:
+        assert (await client.get("/", headers={"Host": "nueva.com"})).json() == {"tenant_id": None}
+
+        async def _no_full_reload():
+            raise AssertionError("full reload")
+
+        monkeypatch.setattr(host_map, "_load", _no_full_reload)
+        expected = {"tenant_id": str(test_tenant.id)}
+
+        domain.is_verified = True
+        await db_session.commit()
+        # The shared map hears this on the bus; a private one is told by hand
+        await host_map.refresh_tenant(test_tenant.id)
+        assert (await client.get("/", headers={"Host": "nueva.com"})).json() == expected
+
+        test_tenant.slug = "renamed-store"
+        await db_session.commit()
+        await host_map.refresh_tenant(test_tenant.id)
+        assert (await client.get("/", headers={"Host": "renamed-store.minishop.co"})).json() == expected
+        assert (await client.get("/", headers={"Host": "test-store.minishop.co"})).json() == {"tenant_id": None}
+
+        test_tenant.is_active = False
+        await db_session.commit()
+        await host_map.refresh_tenant(test_tenant.id)
+        assert (await client.get("/", headers={"Host": "nueva.com"})).json() == {"tenant_id": None}
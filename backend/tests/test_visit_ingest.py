@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.store_visit import StoreVisit
+from app.models.tenant import Tenant
+from app.services.visit_ingest import VisitBuffer
+from tests.conftest import async_session_test, engine_test
+
+
+async def _visit_count() -> int:
+    async with async_session_test() as session:
+        return await session.scalar(select(func.count()).select_from(StoreVisit))
+
+
+@pytest.mark.asyncio
+async def test_visits_are_buffered_and_written_in_batches(test_tenant: Tenant):
+    buffer = VisitBuffer(engine_test, capacity=100, batch_size=4, interval=60)
+    for i in range(10):
+        assert buffer.record(test_tenant.id, page_path=f"/p/{i}", utm_source="tiktok")
+    assert await _visit_count() == 0
+
+    await buffer.flush()
+    assert await _visit_count() == 10
+    assert buffer.stats() == {"buffered": 0, "written": 10, "dropped": 0, "failed_flushes": 0}
+    async with async_session_test() as session:
+        paths = (await session.execute(select(StoreVisit.page_path))).scalars().all()
+    assert sorted(paths) == sorted(f"/p/{i}" for i in range(10))
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_drops_and_failed_flush_requeues(test_tenant: Tenant, monkeypatch):
+    buffer = VisitBuffer(engine_test, capacity=3, batch_size=10, interval=60)
+    results = [buffer.record(test_tenant.id, page_path=f"/p/{i}") for i in range(5)]
+    assert results == [True, True, True, False, False]
+
+    async def _fail(batch):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(buffer, "_write", _fail)
+    await buffer.flush()
+    assert buffer.stats() == {"buffered": 3, "written": 0, "dropped": 2, "failed_flushes": 1}
+
+    monkeypatch.undo()
+    await buffer.flush()
+    assert await _visit_count() == 3
+    assert buffer.stats()["written"] == 3
+
+
+@pytest.mark.asyncio
+async def test_stop_finishes_the_running_flush_and_writes_the_rest(test_tenant: Tenant, monkeypatch):
+    buffer = VisitBuffer(engine_test, capacity=100, batch_size=2, interval=60)
+    write = buffer._write
+    writing = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _slow_write(batch):
+        writing.set()
+        await release.wait()
+        await write(batch)
+
+    monkeypatch.setattr(buffer, "_write", _slow_write)
+    buffer.start()
+    buffer.record(test_tenant.id, page_path="/a")
+    buffer.record(test_tenant.id, page_path="/b")  # a full batch wakes the loop
+    await writing.wait()
+    buffer.record(test_tenant.id, page_path="/c")
+
+    stopping = asyncio.create_task(buffer.stop())
+    await asyncio.sleep(0.01)
+    assert not stopping.done()  # the batch in progress is not cancelled halfway
+    release.set()
+    await stopping
+    assert await _visit_count() == 3
+    assert buffer.stats() == {"buffered": 0, "written": 3, "dropped": 0, "failed_flushes": 0}
@@ -1,6 +1,7 @@
 import { useEffect } from 'react';
-import { Routes, Route } from 'react-router-dom';
+import { Routes, Route, useLocation } from 'react-router-dom';
 import useStore from './hooks/useStore';
+import { trackStoreEvent } from './lib/storeEvents';
 import PixelProvider from './components/PixelProvider';
 import WhatsAppButton from './components/WhatsAppButton';
 import Home from './pages/Home';
@@ -11,7 +12,21 @@ import Page from './pages/Page';
 import LandingPage from './pages/LandingPage';
 
 function AppShell() {
-  const { config, isLoading } = useStore();
+  const { config, isLoading, slug } = useStore();
+  const location = useLocation();
+
+  // Page view, sent with the next batch of storefront events
+  useEffect(() => {
+    const params = new URLSearchParams(location.search);
+    trackStoreEvent(slug, {
+      type: 'view',
+      path: location.pathname.slice(0, 500),
+      referrer: document.referrer ? document.referrer.slice(0, 500) : undefined,
+      utm_source: params.get('utm_source') || undefined,
+      utm_medium: params.get('utm_medium') || undefined,
+      utm_campaign: params.get('utm_campaign') || undefined,
+    });
+  }, [slug, location.pathname, location.search]);
 
   // Apply dynamic CSS variables from store config
   useEffect(() => {
@@ -8,6 +8,15 @@ const getImageUrl = (imgUrl) => {
   return imgUrl.replace(/^\/uploads/, '/api/uploads');
 };
 
+// srcset from the server-side derivatives of one format ('webp', 'jpeg', 'png')
+const buildSrcSet = (variants, formats) =>
+  (variants || [])
+    .filter((v) => formats.includes(v.format))
+    .map((v) => `${getImageUrl(v.url)} ${v.width}w`)
+    .join(', ');
+
+const CARD_SIZES = '(min-width: 1024px) 25vw, (min-width: 640px) 33vw, 50vw';
+
 function formatPrice(price, currency = 'COP', country = 'CO') {
   if (price == null) return '';
   const localeMap = {
@@ -39,6 +48,9 @@ export default function ProductCard({ product, currency, country }) {
       : 'https://placehold.co/400x400/e2e8f0/94a3b8?text=Sin+imagen';
   const rawUrl = typeof image === 'string' ? image : image.image_url || image.url || image.src;
   const imageUrl = getImageUrl(rawUrl);
+  const variants = typeof image === 'string' ? [] : image.variants;
+  const webpSrcSet = buildSrcSet(variants, ['webp']);
+  const fallbackSrcSet = buildSrcSet(variants, ['jpeg', 'png']);
 
   const discount = getDiscountPercent(product.price, product.compare_at_price);
 
@@ -49,12 +61,17 @@ export default function ProductCard({ product, currency, country }) {
     >
       {/* Image */}
       <div className="relative aspect-square overflow-hidden bg-gray-50">
-        <img
-          src={imageUrl}
-          alt={product.name}
-          loading="lazy"
-          className="h-full w-full object-cover transition-transform duration-300 group-hover:scale-105"
-        />
+        <picture>
+          {webpSrcSet && <source type="image/webp" srcSet={webpSrcSet} sizes={CARD_SIZES} />}
+          <img
+            src={imageUrl}
+            srcSet={fallbackSrcSet || undefined}
+            sizes={fallbackSrcSet ? CARD_SIZES : undefined}
+            alt={product.name}
+            loading="lazy"
+            className="h-full w-full object-cover transition-transform duration-300 group-hover:scale-105"
+          />
+        </picture>
         {discount > 0 && (
           <span className="absolute left-3 top-3 rounded-full bg-red-500 px-2.5 py-1 text-xs font-bold text-white">
             -{discount}%
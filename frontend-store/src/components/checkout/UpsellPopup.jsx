@@ -1,4 +1,5 @@
 import { useState, useEffect, useCallback } from 'react';
+import { trackStoreEvent } from '../../lib/storeEvents';
 
 const getImageUrl = (imgUrl) => {
   if (!imgUrl) return '';
@@ -328,9 +329,9 @@ export default function UpsellPopup({
   useEffect(() => {
     const u = upsells[currentIndex];
     if (u && slug) {
-      fetch(`${API_BASE}/api/store/${slug}/upsells/${u.id}/impression`, { method: 'POST' }).catch(() => {});
+      trackStoreEvent(slug, { type: 'impression', target: 'upsell', id: u.id });
     }
-  }, [currentIndex, upsells, slug, API_BASE]);
+  }, [currentIndex, upsells, slug]);
 
   if (upsells.length === 0 || currentIndex >= upsells.length) return null;
 
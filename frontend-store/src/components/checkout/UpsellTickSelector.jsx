@@ -1,5 +1,7 @@
 import { useState, useEffect, useRef } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { trackStoreEvent } from '../../lib/storeEvents';
+
+const NO_TICKS = [];
 
 const getImageUrl = (imgUrl) => {
   if (!imgUrl) return null;
@@ -11,28 +13,12 @@ const getImageUrl = (imgUrl) => {
 
 export default function UpsellTickSelector({
   slug,
-  productId,
+  ticks = NO_TICKS,
   currency,
   country,
   formatPriceFn,
   onTicksChange,
 }) {
-  const API_BASE = import.meta.env.VITE_API_URL || '';
-
-  const { data: ticks = [] } = useQuery({
-    queryKey: ['upsell-ticks', slug, productId],
-    queryFn: async () => {
-      if (!slug || !productId) return [];
-      const res = await fetch(
-        `${API_BASE}/api/store/${slug}/upsell-ticks/${productId}`
-      );
-      if (!res.ok) return [];
-      return res.json();
-    },
-    enabled: !!slug && !!productId,
-    staleTime: 5 * 60 * 1000,
-  });
-
   const [selected, setSelected] = useState({});
   const initialized = useRef(false);
 
@@ -45,8 +31,11 @@ export default function UpsellTickSelector({
       }
       setSelected(initial);
       initialized.current = true;
+      for (const tick of ticks) {
+        trackStoreEvent(slug, { type: 'tick_shown', id: tick.id });
+      }
     }
-  }, [ticks]);
+  }, [ticks, slug]);
 
   // Notify parent when selection changes
   useEffect(() => {
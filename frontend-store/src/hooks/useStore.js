@@ -29,49 +29,39 @@ function getSlug() {
 const API_URL = import.meta.env.VITE_API_URL || "";
 const API_BASE = `${API_URL}/api/store`;
 
-async function fetchConfig(slug) {
-  const res = await fetch(`${API_BASE}/${slug}/config`);
-  if (!res.ok) throw new Error('Error al cargar la configuración de la tienda');
+async function fetchBootstrap(slug) {
+  // config + products + checkout config + home page in a single request
+  const res = await fetch(`${API_BASE}/${slug}/bootstrap`);
+  if (!res.ok) throw new Error('Error al cargar la tienda');
   return res.json();
 }
 
-async function fetchProducts(slug) {
-  const res = await fetch(`${API_BASE}/${slug}/products`);
-  if (!res.ok) throw new Error('Error al cargar los productos');
-  return res.json();
-}
-
-export function useStore() {
+export function useStoreBootstrap() {
   const slug = getSlug();
 
-  const {
-    data: config,
-    isLoading: configLoading,
-    error: configError,
-  } = useQuery({
-    queryKey: ['storeConfig', slug],
-    queryFn: () => fetchConfig(slug),
+  return useQuery({
+    queryKey: ['storeBootstrap', slug],
+    queryFn: () => fetchBootstrap(slug),
     staleTime: 5 * 60 * 1000,
     retry: 2,
   });
+}
 
-  const {
-    data: products,
-    isLoading: productsLoading,
-    error: productsError,
-  } = useQuery({
-    queryKey: ['storeProducts', slug],
-    queryFn: () => fetchProducts(slug),
-    staleTime: 5 * 60 * 1000,
-    retry: 2,
-  });
+export function useStore() {
+  const slug = getSlug();
+  const { data, isLoading, error } = useStoreBootstrap();
+
+  const configError = data && !data.config
+    ? new Error('Error al cargar la configuración de la tienda')
+    : null;
 
   return {
-    config: config || null,
-    products: products || [],
+    config: data?.config || null,
+    products: data?.products || [],
+    homePage: data?.home_page || null,
     slug,
-    isLoading: configLoading || productsLoading,
-    error: configError || productsError,
+    isLoading,
+    error: error || configError,
   };
 }
 
@@ -0,0 +1,57 @@
+// Batched storefront events (impressions, page views, cart steps).
+//
+// Events are queued and sent together to /api/store/{slug}/events, with
+// navigator.sendBeacon when available so a batch still goes out while the
+// page is being hidden or unloaded. The body is sent as text/plain, which
+// needs no CORS preflight; the server parses it as JSON regardless.
+
+const API_URL = import.meta.env.VITE_API_URL || '';
+const FLUSH_DELAY_MS = 2000;
+const MAX_BATCH = 50; // matches STORE_EVENTS_MAX_BATCH on the server
+
+const queues = new Map(); // slug -> events
+let timer = null;
+
+function send(slug, events) {
+  const url = `${API_URL}/api/store/${slug}/events`;
+  const body = JSON.stringify(events);
+  if (navigator.sendBeacon && navigator.sendBeacon(url, new Blob([body], { type: 'text/plain' }))) {
+    return;
+  }
+  fetch(url, { method: 'POST', body, keepalive: true, headers: { 'Content-Type': 'text/plain' } }).catch(() => {});
+}
+
+export function flushStoreEvents() {
+  clearTimeout(timer);
+  timer = null;
+  for (const [slug, events] of queues) {
+    for (let i = 0; i < events.length; i += MAX_BATCH) {
+      send(slug, events.slice(i, i + MAX_BATCH));
+    }
+  }
+  queues.clear();
+}
+
+export function trackStoreEvent(slug, event) {
+  if (!slug) return;
+  if (!queues.has(slug)) queues.set(slug, []);
+  queues.get(slug).push(event);
+  if (!timer) timer = setTimeout(flushStoreEvents, FLUSH_DELAY_MS);
+}
+
+// One id per browser tab, used to merge cart steps into one abandoned cart
+export function getCartSessionId() {
+  let id = sessionStorage.getItem('minishop_cart_session');
+  if (!id) {
+    id = crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    sessionStorage.setItem('minishop_cart_session', id);
+  }
+  return id;
+}
+
+if (typeof window !== 'undefined') {
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flushStoreEvents();
+  });
+  window.addEventListener('pagehide', flushStoreEvents);
+}
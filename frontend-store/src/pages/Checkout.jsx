@@ -11,6 +11,7 @@ import CheckoutBlockRenderer from '../components/checkout/CheckoutBlockRenderer'
 import CheckoutStickyButton from '../components/checkout/CheckoutStickyButton';
 import UpsellPopup from '../components/checkout/UpsellPopup';
 import UpsellTickSelector from '../components/checkout/UpsellTickSelector';
+import { getCartSessionId, trackStoreEvent } from '../lib/storeEvents';
 
 const getImageUrl = (imgUrl) => {
   if (!imgUrl) return '';
@@ -56,33 +57,22 @@ export default function Checkout() {
   // Merge fetched checkout config with defaults
   const cfg = mergeConfig(checkoutConfig);
 
-  // Fetch quantity offer for this product
+  // Quantity offer, upsells and upsell ticks for this product in one request
+  // (product and checkout config already came with the store bootstrap)
   const API_BASE = import.meta.env.VITE_API_URL || '';
-  const { data: quantityOffer } = useQuery({
-    queryKey: ['quantity-offer', slug, product?.id],
+  const { data: bundle } = useQuery({
+    queryKey: ['checkout-bundle', slug, product?.id],
     queryFn: async () => {
       if (!slug || !product?.id) return null;
-      const res = await fetch(`${API_BASE}/api/store/${slug}/quantity-offers/${product.id}`);
-      if (!res.ok) return null;
-      const data = await res.json();
-      return data;
-    },
-    enabled: !!slug && !!product?.id,
-    staleTime: 5 * 60 * 1000,
-  });
-
-  // Fetch upsells for this product
-  const { data: upsellData } = useQuery({
-    queryKey: ['upsells', slug, product?.id],
-    queryFn: async () => {
-      if (!slug || !product?.id) return null;
-      const res = await fetch(`${API_BASE}/api/store/${slug}/upsells/${product.id}`);
+      const res = await fetch(`${API_BASE}/api/store/${slug}/checkout-bundle/${product.id}`);
       if (!res.ok) return null;
       return res.json();
     },
     enabled: !!slug && !!product?.id,
     staleTime: 5 * 60 * 1000,
   });
+  const quantityOffer = bundle?.quantity_offer || null;
+  const upsellData = bundle?.upsells || null;
 
   const upsellsAvailable = upsellData?.upsells?.length > 0;
   const upsellType = upsellData?.config?.upsell_type || 'post_purchase';
@@ -129,9 +119,7 @@ export default function Checkout() {
   // Register impression when quantity offer loads
   useEffect(() => {
     if (quantityOffer?.id && slug) {
-      fetch(`${API_BASE}/api/store/${slug}/quantity-offers/${quantityOffer.id}/impression`, {
-        method: 'POST',
-      }).catch(() => {});
+      trackStoreEvent(slug, { type: 'impression', target: 'quantity_offer', id: quantityOffer.id });
     }
   }, [quantityOffer?.id, slug]);
 
@@ -148,30 +136,27 @@ export default function Checkout() {
     }
   };
 
-  // Progressive capture on blur
+  // Progressive capture on blur (batched with the other storefront events)
   const handleBlur = useCallback(
-    async (e) => {
+    (e) => {
       const { name, value } = e.target;
       if (!value.trim() || !slug || !product) return;
 
-      try {
-        const API_URL = import.meta.env.VITE_API_URL || "";
-        await fetch(`${API_URL}/api/store/${slug}/cart/capture`, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({
-            product_id: product.id,
-            product_slug: product.slug,
-            customer_name: `${form.customer_first_name} ${form.customer_last_name}`.trim(),
-            [name]: value.trim(),
-            ...form,
-          }),
-        });
-      } catch {
-        // Silently fail on capture
-      }
+      const customerName = `${form.customer_first_name || ''} ${form.customer_last_name || ''}`.trim();
+      trackStoreEvent(slug, {
+        type: 'cart_step',
+        session_id: getCartSessionId(),
+        product_id: product.id,
+        product_name: product.name,
+        customer_name: customerName || undefined,
+        customer_phone: form.customer_phone || undefined,
+        customer_email: form.email || undefined,
+        quantity,
+        total_value: totalPrice,
+        last_step: name,
+      });
     },
-    [slug, product, form]
+    [slug, product, form, quantity, totalPrice]
   );
 
   const validate = () => {
@@ -337,12 +322,18 @@ export default function Checkout() {
     );
   }
 
-  const productImage =
-    product.images && product.images.length > 0
-      ? getImageUrl(typeof product.images[0] === 'string'
-        ? product.images[0]
-        : product.images[0].image_url || product.images[0].url || product.images[0].src)
-      : 'https://placehold.co/200x200/e2e8f0/94a3b8?text=Sin+imagen';
+  // Checkout shows a small thumbnail: use the 480px derivative when there is one
+  const firstImage = product.images && product.images.length > 0 ? product.images[0] : null;
+  const thumbnail = firstImage && typeof firstImage !== 'string'
+    ? (firstImage.variants || []).find((v) => v.format === 'webp' && v.width >= 480)
+    : null;
+  const productImage = firstImage
+    ? getImageUrl(thumbnail
+      ? thumbnail.url
+      : typeof firstImage === 'string'
+        ? firstImage
+        : firstImage.image_url || firstImage.url || firstImage.src)
+    : 'https://placehold.co/200x200/e2e8f0/94a3b8?text=Sin+imagen';
 
   // Get sorted enabled blocks
   const blocks = [...(cfg.form_blocks || [])]
@@ -465,7 +456,7 @@ export default function Checkout() {
                 <UpsellTickSelector
                   key="upsell-ticks"
                   slug={slug}
-                  productId={product?.id}
+                  ticks={bundle?.upsell_ticks}
                   currency={currency}
                   country={country}
                   formatPriceFn={formatPrice}
@@ -1,6 +1,6 @@
-import { useEffect, useState, useCallback } from 'react';
+import { useEffect, useCallback } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
-import useStore, { getSlug } from '../hooks/useStore';
+import useStore from '../hooks/useStore';
 import ProductCard from '../components/ProductCard';
 import { usePixel } from '../components/PixelProvider';
 
@@ -111,28 +111,16 @@ function CustomLanding({ page }) {
 }
 
 export default function Home() {
-  const { config, products, isLoading, error } = useStore();
+  const { config, products, homePage, isLoading, error } = useStore();
   const { trackEvent } = usePixel();
-  const [customPage, setCustomPage] = useState(null);
-  const [loadingPage, setLoadingPage] = useState(true);
 
   useEffect(() => {
     trackEvent('PageView');
   }, [trackEvent]);
 
-  useEffect(() => {
-    const slug = getSlug();
-    const apiBase = import.meta.env.VITE_API_URL || '';
-    fetch(`${apiBase}/api/store/${slug}/pages/home`)
-      .then((res) => res.ok ? res.json() : null)
-      .then((data) => { if (data?.html_content) setCustomPage(data); })
-      .catch(() => {})
-      .finally(() => setLoadingPage(false));
-  }, []);
-
-  if (customPage) return <CustomLanding page={customPage} />;
+  if (homePage?.html_content) return <CustomLanding page={homePage} />;
 
-  if (isLoading || loadingPage) {
+  if (isLoading) {
     return (
       <div className="flex min-h-screen items-center justify-center bg-gray-50">
         <div className="h-10 w-10 animate-spin rounded-full border-4 border-gray-200 border-t-[var(--color-primary)]" />